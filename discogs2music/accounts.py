@@ -0,0 +1,195 @@
+# -*- coding: UTF-8 -*-
+#
+# copyright: 2020-2022, Frederico Martins
+# author: Frederico Martins <http://github.com/fscm>
+# license: SPDX-License-Identifier: MIT
+
+"""Discogs accounts module.
+
+This module fetches the ratings of several Discogs accounts and merges
+them.
+
+The following is a simple usage example::
+  from .accounts import Accounts
+  a = Accounts(['my_token', 'other_token'], policy='max')
+  r = a.get_ratings()
+  print(r)
+
+The module contains the following public classes:
+  - Accounts -- The main entry point. As the example above shows, the
+    Accounts() class can be used to load the merged ratings of several
+    Discogs accounts.
+
+All other classes in this module are considered implementation details.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from time import time
+from .discogs import Discogs
+from .model import Model
+
+
+class Accounts:
+  """Discogs accounts.
+
+  This class fetches the ratings of several Discogs accounts at the
+  same time. Each account has its own requests scheduler, so that each
+  one of them uses its own rate limit.
+
+  When the same release is found on more than one account, the rating
+  to keep is chosen by the conflict policy (see model.Model.prefer()):
+    - 'priority' -- the rating of the first account, in the keys order;
+    - 'max' -- the highest rating;
+    - 'latest' -- the rating of the most recently added release.
+  Each record keeps the priority of its account so that the stored
+  records of the accounts that were not fully fetched (on incremental
+  mode) are also compared, and so that the names index applies the same
+  policy to different releases with the same names.
+
+  The state of the incremental fetches is kept per account. With a
+  single account it is kept as Discogs.get_ratings() does, so that the
+  data is the same as with the Discogs class alone.
+
+  Args:
+    keys (list[str]): Discogs API keys, by priority.
+    folders (tuple[int, ...], optional): Collection folders to read, on
+      every account. Defaults to (0,) (all the releases).
+    policy (str, optional): Conflict policy, one of POLICIES. Defaults
+      to 'priority'.
+    logger (logger.Logger, optional): Logger to use. Defaults to None.
+    cache (cache.Cache, optional): Response cache to use. Defaults to
+      None.
+    workers (int, optional): Number of concurrent requests, per account.
+      Defaults to Discogs.API_WORKERS.
+    low_memory (bool, optional): Only keep the needed fields when
+      decoding the collection pages. Defaults to False.
+    metrics (metrics.Metrics, optional): Metrics to record the requests
+      to. Defaults to None.
+    base_url (str, optional): Discogs API URL. Defaults to
+      Discogs.API_BASEURL.
+    journal (journal.Journal, optional): Run journal, shared by every
+      account. Defaults to None.
+  """
+
+  POLICIES = Model.POLICIES
+
+  def __init__(
+          self, keys, folders=(0,), policy='priority', logger=None,
+          cache=None, workers=Discogs.API_WORKERS, low_memory=False,
+          metrics=None, base_url=Discogs.API_BASEURL, journal=None):
+    if policy not in self.POLICIES:
+      raise ValueError(f'unknown conflict policy: {policy}')
+    self.__logger = logger
+    self.__policy = policy
+    with ThreadPoolExecutor(max_workers=len(keys)) as executor:
+      self.__accounts = list(executor.map(
+          lambda key: Discogs(
+              key=key,
+              logger=logger,
+              cache=cache,
+              workers=workers,
+              low_memory=low_memory,
+              metrics=metrics,
+              folders=folders,
+              progress=len(keys) == 1,
+              base_url=base_url,
+              journal=journal),
+          keys))
+
+  @property
+  def clients(self):
+    """list[discogs.Discogs]: Discogs clients, by priority."""
+    return list(self.__accounts)
+
+  def __merge(self, releases, fetched, refreshed):
+    """Private method to merge the records fetched from every account.
+
+    A stored record wins over the fetched ones when its account did not
+    fetch it again, unless that account was fully fetched (and no longer
+    has the release).
+
+    Args:
+      releases (dict[str, dict[str, Any]]): Stored records.
+      fetched (list[dict[str, dict[str, Any]]]): Fetched records, by
+        account priority.
+      refreshed (set[int]): Priorities of the fully fetched accounts.
+
+    Returns:
+      dict[str, dict[str, Any]]: Merged records, without the ones that
+        lost to a stored record.
+    """
+    merged = {}
+    for records in fetched:
+      for key, record in records.items():
+        current = merged.get(key)
+        if current is None or Model.prefer(record, current, self.__policy):
+          merged[key] = record
+    for key in list(merged):
+      stored = releases.get(key)
+      priority = None if stored is None else stored['priority']
+      if priority is None or priority in refreshed or (
+          priority >= len(fetched)) or key in fetched[priority]:
+        continue
+      if Model.prefer(stored, merged[key], self.__policy):
+        del merged[key]
+    return merged
+
+  def get_ratings(self, ratings=None, incremental=False, full_interval=None):
+    """Fetch the Discogs ratings from the collections of every account.
+
+    See Discogs.fetch_ratings().
+
+    Args:
+      ratings (dict[str, Any], optional): Ratings. If provided this
+        ratings will be updated. Defaults to None.
+      incremental (bool, optional): Only fetch the newly added releases.
+        Defaults to False.
+      full_interval (int, optional): Maximum time, in seconds, between
+        full fetches on incremental mode. Defaults to None (never).
+
+    Returns:
+      dict[str, Any]: Ratings data (see model.Model), with the names
+        index as 'ratings'.
+    """
+    ratings = Model.upgrade(ratings or {})
+    if len(self.__accounts) == 1:
+      return self.__accounts[0].get_ratings(
+          ratings=ratings,
+          incremental=incremental,
+          full_interval=full_interval)
+    states = ratings.get('accounts', {})
+    with ThreadPoolExecutor(max_workers=len(self.__accounts)) as executor:
+      results = list(executor.map(
+          lambda account: account.fetch_ratings(
+              state=states.get(account.username),
+              incremental=incremental,
+              full_interval=full_interval),
+          self.__accounts))
+    refreshed = set()
+    for priority, (fetched, state) in enumerate(results):
+      for record in fetched.values():
+        record['priority'] = priority
+      # Full fetches start a new full interval.
+      if state['last_full'] == state['last_updated']:
+        refreshed.add(priority)
+    if self.__logger:
+      self.__logger.info(
+          'Merging the ratings of %d accounts (conflict policy: %s).',
+          len(results),
+          self.__policy)
+    releases = Model.merge(
+        ratings['releases'],
+        self.__merge(
+            ratings['releases'],
+            [fetched for fetched, _ in results],
+            refreshed))
+    return {
+        'accounts': {
+            **states,
+            **{
+                account.username: state
+                for account, (_, state) in zip(self.__accounts, results)}},
+        'last_updated': int(time()),
+        'version': Model.VERSION,
+        'releases': releases,
+        'ratings': Model.index(releases, self.__policy)}
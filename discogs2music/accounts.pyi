@@ -0,0 +1,13 @@
+from typing import Any, Final, Optional
+from .cache import Cache
+from .discogs import Discogs
+from .journal import Journal
+from .logger import Logger
+from .metrics import Metrics
+
+class Accounts:
+    POLICIES: Final[tuple[str, ...]] = ...
+    def __init__(self, keys: list[str], folders: tuple[int, ...] = ..., policy: str = ..., logger: Optional[Logger] = ..., cache: Optional[Cache] = ..., workers: int = ..., low_memory: bool = ..., metrics: Optional[Metrics] = ..., base_url: str = ..., journal: Optional[Journal] = ...) -> None: ...
+    @property
+    def clients(self) -> list[Discogs]: ...
+    def get_ratings(self, ratings: Optional[dict[str, Any]] = ..., incremental: bool = ..., full_interval: Optional[int] = ...) -> dict[str, Any]: ...
@@ -0,0 +1,435 @@
+# -*- coding: UTF-8 -*-
+#
+# copyright: 2020-2022, Frederico Martins
+# author: Frederico Martins <http://github.com/fscm>
+# license: SPDX-License-Identifier: MIT
+
+"""Music library backends module.
+
+This module provides the backends used by the Music class to read and
+write the Music app library.
+
+The following is a simple usage example::
+  from .backends import MemoryBackend
+  b = MemoryBackend([{'artist': 'Artist', 'album': 'Album'}])
+  for track in b.get_tracks():
+    b.set_album_rating(track.ref, 80)
+  print(b.calls)
+
+The module contains the following public classes:
+  - Track -- Snapshot of the properties of a library track.
+  - MusicBackend -- Base class of the backends.
+  - AppscriptBackend -- Backend for the Music app (macOS only).
+  - MemoryBackend -- In-memory library, that counts the calls made to
+    it as if it were the Music app.
+  - SimulatorBackend -- In-memory synthetic library, with simulated
+    Apple Events latency, for benchmarking.
+
+All other classes in this module are considered implementation details.
+"""
+
+import abc
+import random
+from collections import namedtuple
+from time import sleep
+
+
+Track = namedtuple(
+    'Track',
+    ['ref', 'persistent_id', 'artist', 'album', 'name', 'album_rating',
+     'rating', 'track_number'])
+
+
+class MusicBackend(abc.ABC):
+  """Music library backend.
+
+  Reads are done in bulk: one call per track property, for all the
+  tracks at once. Writes are done one track at a time or, for all the
+  tracks of an album, at once.
+  """
+
+  PROPERTIES = (
+      'persistent_id', 'artist', 'album', 'name', 'album_rating', 'rating',
+      'track_number')
+
+  @property
+  @abc.abstractmethod
+  def calls(self):
+    """int: calls made to the library."""
+
+  @abc.abstractmethod
+  def get_tracks(self):
+    """Reads the library tracks.
+
+    Returns:
+      list[Track]: Library tracks.
+    """
+
+  @abc.abstractmethod
+  def set_album_rating(self, ref, rating):
+    """Sets the album rating of a track.
+
+    Args:
+      ref (Any): Track reference (as in Track.ref).
+      rating (int): Album rating (0 to 100).
+    """
+
+  @abc.abstractmethod
+  def set_album_rating_for(self, artist, album, rating):
+    """Sets the album rating of all the tracks of an album.
+
+    Args:
+      artist (str): Artist name (as in Track.artist).
+      album (str): Album title (as in Track.album).
+      rating (int): Album rating (0 to 100).
+    """
+
+  @abc.abstractmethod
+  def set_rating(self, ref, rating):
+    """Sets the rating of a track.
+
+    Args:
+      ref (Any): Track reference (as in Track.ref).
+      rating (int): Rating (0 to 100).
+    """
+
+  @abc.abstractmethod
+  def set_rating_for(self, artist, album, rating):
+    """Sets the rating of all the tracks of an album.
+
+    Args:
+      artist (str): Artist name (as in Track.artist).
+      album (str): Album title (as in Track.album).
+      rating (int): Rating (0 to 100).
+    """
+
+
+class AppscriptBackend(MusicBackend):
+  """Music app backend.
+
+  This class uses appscript to send Apple Events to the Music app.
+  """
+
+  def __init__(self):
+    # appscript is only available on macOS.
+    from appscript import app, its  # pylint: disable=import-outside-toplevel
+    self.__calls = 0
+    self.__its = its
+    self.__tracks = app('Music').library_playlists['Library'].tracks
+
+  @property
+  def calls(self):
+    """int: Apple Events sent to the Music app."""
+    return self.__calls
+
+  def __get_album(self, artist, album):
+    """Private method to reference all the tracks of an album.
+
+    Args:
+      artist (str): Artist name.
+      album (str): Album title.
+
+    Returns:
+      appscript.Reference: Album tracks reference.
+    """
+    return self.__tracks[
+        (self.__its.artist == artist).AND(self.__its.album == album)]
+
+  def get_tracks(self):
+    """Reads the library tracks.
+
+    Returns:
+      list[Track]: Library tracks.
+    """
+    refs = self.__tracks.get()
+    values = [
+        getattr(
+            self.__tracks,
+            'persistent_ID' if prop == 'persistent_id' else prop).get()
+        for prop in self.PROPERTIES]
+    self.__calls += 1 + len(self.PROPERTIES)
+    return [Track(*track) for track in zip(refs, *values)]
+
+  def set_album_rating(self, ref, rating):
+    """Sets the album rating of a track.
+
+    Args:
+      ref (appscript.Reference): Track reference.
+      rating (int): Album rating (0 to 100).
+    """
+    self.__calls += 1
+    ref.album_rating.set(rating)
+
+  def set_album_rating_for(self, artist, album, rating):
+    """Sets the album rating of all the tracks of an album.
+
+    Args:
+      artist (str): Artist name.
+      album (str): Album title.
+      rating (int): Album rating (0 to 100).
+    """
+    self.__calls += 1
+    self.__get_album(artist, album).album_rating.set(rating)
+
+  def set_rating(self, ref, rating):
+    """Sets the rating of a track.
+
+    Args:
+      ref (appscript.Reference): Track reference.
+      rating (int): Rating (0 to 100).
+    """
+    self.__calls += 1
+    ref.rating.set(rating)
+
+  def set_rating_for(self, artist, album, rating):
+    """Sets the rating of all the tracks of an album.
+
+    Args:
+      artist (str): Artist name.
+      album (str): Album title.
+      rating (int): Rating (0 to 100).
+    """
+    self.__calls += 1
+    self.__get_album(artist, album).rating.set(rating)
+
+
+class MemoryBackend(MusicBackend):
+  """In-memory backend.
+
+  This class keeps the library in memory and counts the calls made to
+  it as the Music app backend would send them. As on the Music app, the
+  album writes match the artist and album names ignoring the case.
+
+  Args:
+    tracks (list[dict[str, Any]]): Library tracks, with the
+      MusicBackend.PROPERTIES as keys. Missing properties default to an
+      empty string (or 0 for ratings and track numbers).
+  """
+
+  def __init__(self, tracks):
+    self.__calls = 0
+    self.__tracks = [
+        {
+            'persistent_id': f'{index:016X}',
+            'artist': '',
+            'album': '',
+            'name': '',
+            'album_rating': 0,
+            'rating': 0,
+            'track_number': 0,
+            **track}
+        for index, track in enumerate(tracks)]
+    self.__albums = {}
+    for track in self.__tracks:
+      self.__albums.setdefault(
+          (track['artist'].casefold(), track['album'].casefold()),
+          []).append(track)
+
+  @property
+  def calls(self):
+    """int: calls made to the library."""
+    return self.__calls
+
+  @property
+  def tracks(self):
+    """list[dict[str, Any]]: library tracks."""
+    return self.__tracks
+
+  def __get_album(self, artist, album):
+    """Private method to get all the tracks of an album.
+
+    Args:
+      artist (str): Artist name.
+      album (str): Album title.
+
+    Returns:
+      list[dict[str, Any]]: Album tracks.
+    """
+    return self.__albums.get((artist.casefold(), album.casefold()), [])
+
+  def get_tracks(self):
+    """Reads the library tracks.
+
+    Returns:
+      list[Track]: Library tracks.
+    """
+    self.__calls += 1 + len(self.PROPERTIES)
+    return [
+        Track(index, *(track[prop] for prop in self.PROPERTIES))
+        for index, track in enumerate(self.__tracks)]
+
+  def set_album_rating(self, ref, rating):
+    """Sets the album rating of a track.
+
+    Args:
+      ref (int): Track index.
+      rating (int): Album rating (0 to 100).
+    """
+    self.__calls += 1
+    self.__tracks[ref]['album_rating'] = rating
+
+  def set_album_rating_for(self, artist, album, rating):
+    """Sets the album rating of all the tracks of an album.
+
+    Args:
+      artist (str): Artist name.
+      album (str): Album title.
+      rating (int): Album rating (0 to 100).
+    """
+    self.__calls += 1
+    for track in self.__get_album(artist, album):
+      track['album_rating'] = rating
+
+  def set_rating(self, ref, rating):
+    """Sets the rating of a track.
+
+    Args:
+      ref (int): Track index.
+      rating (int): Rating (0 to 100).
+    """
+    self.__calls += 1
+    self.__tracks[ref]['rating'] = rating
+
+  def set_rating_for(self, artist, album, rating):
+    """Sets the rating of all the tracks of an album.
+
+    Args:
+      artist (str): Artist name.
+      album (str): Album title.
+      rating (int): Rating (0 to 100).
+    """
+    self.__calls += 1
+    for track in self.__get_album(artist, album):
+      track['rating'] = rating
+
+
+class SimulatorBackend(MemoryBackend):
+  """Simulator backend.
+
+  This class generates a deterministic synthetic library and simulates
+  the cost of the Apple Events sent to the Music app: a fixed latency
+  per call plus, for the bulk reads, a latency per track.
+
+  Some of the generated names differ from the Discogs names returned by
+  discogs_ratings() the same way real libraries do (articles, edition
+  suffixes, letter case), so that matching is also exercised.
+
+  Args:
+    size (int): Number of tracks.
+    seed (int, optional): Random seed. Defaults to 0.
+    latency (float, optional): Latency, in seconds, per call. Defaults
+      to 0.
+    track_latency (float, optional): Latency, in seconds, per track on
+      bulk reads. Defaults to 0.
+    tracks_per_album (int, optional): Tracks per album. Defaults to 10.
+    albums_per_artist (int, optional): Albums per artist. Defaults to
+      5.
+    sleep (Callable[[float], None], optional): Sleep function. Defaults
+      to time.sleep.
+  """
+
+  def __init__(
+          self, size, seed=0, latency=0.0, track_latency=0.0,
+          tracks_per_album=10, albums_per_artist=5, sleep=sleep):
+    self.__latency = latency
+    self.__rng = random.Random(seed)
+    self.__sleep = sleep
+    self.__track_latency = track_latency
+    self.__albums = []
+    tracks = []
+    album_count = -(-size // tracks_per_album)
+    for album_index in range(album_count):
+      artist = f'Artist {album_index // albums_per_artist:06d}'
+      album = f'Album {album_index:07d}'
+      local_artist, local_album = artist, album
+      variation = self.__rng.random()
+      if variation < 0.1:
+        local_artist = f'{artist}, The'
+        artist = f'The {artist}'
+      elif variation < 0.2:
+        local_album = f'{album} (Remastered)'
+      elif variation < 0.3:
+        local_album = album.upper()
+      self.__albums.append((artist, album))
+      rating = self.__rng.choice((0, 0, 20, 40, 60, 80, 100))
+      for track_index in range(
+              min(tracks_per_album, size - len(tracks))):
+        tracks.append({
+            'artist': local_artist,
+            'album': local_album,
+            'name': f'Track {track_index:02d}',
+            'album_rating': rating,
+            'rating': rating,
+            'track_number': track_index + 1})
+    super().__init__(tracks)
+
+  def discogs_ratings(self, coverage=0.8):
+    """Generates Discogs ratings for some of the library albums.
+
+    Args:
+      coverage (float, optional): Share of the albums, between 0 and 1,
+        found on Discogs. Defaults to 0.8.
+
+    Returns:
+      dict[str, Any]: Discogs ratings.
+    """
+    rng = random.Random(len(self.__albums))
+    ratings = {}
+    for artist, album in self.__albums:
+      if rng.random() < coverage:
+        ratings.setdefault(artist, {})[album] = {'rating': rng.randint(1, 5)}
+    return ratings
+
+  def get_tracks(self):
+    """Reads the library tracks.
+
+    Returns:
+      list[Track]: Library tracks.
+    """
+    tracks = super().get_tracks()
+    self.__sleep(
+        (1 + len(self.PROPERTIES)) *
+        (self.__latency + self.__track_latency * len(tracks)))
+    return tracks
+
+  def set_album_rating(self, ref, rating):
+    """Sets the album rating of a track.
+
+    Args:
+      ref (int): Track index.
+      rating (int): Album rating (0 to 100).
+    """
+    super().set_album_rating(ref, rating)
+    self.__sleep(self.__latency)
+
+  def set_album_rating_for(self, artist, album, rating):
+    """Sets the album rating of all the tracks of an album.
+
+    Args:
+      artist (str): Artist name.
+      album (str): Album title.
+      rating (int): Album rating (0 to 100).
+    """
+    super().set_album_rating_for(artist, album, rating)
+    self.__sleep(self.__latency)
+
+  def set_rating(self, ref, rating):
+    """Sets the rating of a track.
+
+    Args:
+      ref (int): Track index.
+      rating (int): Rating (0 to 100).
+    """
+    super().set_rating(ref, rating)
+    self.__sleep(self.__latency)
+
+  def set_rating_for(self, artist, album, rating):
+    """Sets the rating of all the tracks of an album.
+
+    Args:
+      artist (str): Artist name.
+      album (str): Album title.
+      rating (int): Rating (0 to 100).
+    """
+    super().set_rating_for(artist, album, rating)
+    self.__sleep(self.__latency)
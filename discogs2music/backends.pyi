@@ -0,0 +1,40 @@
+import abc
+from typing import Any, Callable, Final, NamedTuple
+
+class Track(NamedTuple):
+    ref: Any
+    persistent_id: str
+    artist: str
+    album: str
+    name: str
+    album_rating: int
+    rating: int
+    track_number: int
+
+class MusicBackend(abc.ABC):
+    PROPERTIES: Final[tuple[str, ...]] = ...
+    @property
+    @abc.abstractmethod
+    def calls(self) -> int: ...
+    @abc.abstractmethod
+    def get_tracks(self) -> list[Track]: ...
+    @abc.abstractmethod
+    def set_album_rating(self, ref: Any, rating: int) -> None: ...
+    @abc.abstractmethod
+    def set_album_rating_for(self, artist: str, album: str, rating: int) -> None: ...
+    @abc.abstractmethod
+    def set_rating(self, ref: Any, rating: int) -> None: ...
+    @abc.abstractmethod
+    def set_rating_for(self, artist: str, album: str, rating: int) -> None: ...
+
+class AppscriptBackend(MusicBackend):
+    def __init__(self) -> None: ...
+
+class MemoryBackend(MusicBackend):
+    def __init__(self, tracks: list[dict[str, Any]]) -> None: ...
+    @property
+    def tracks(self) -> list[dict[str, Any]]: ...
+
+class SimulatorBackend(MemoryBackend):
+    def __init__(self, size: int, seed: int = ..., latency: float = ..., track_latency: float = ..., tracks_per_album: int = ..., albums_per_artist: int = ..., sleep: Callable[[float], None] = ...) -> None: ...
+    def discogs_ratings(self, coverage: float = ...) -> dict[str, Any]: ...
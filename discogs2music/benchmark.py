@@ -0,0 +1,994 @@
+# -*- coding: UTF-8 -*-
+#
+# copyright: 2020-2022, Frederico Martins
+# author: Frederico Martins <http://github.com/fscm>
+# license: SPDX-License-Identifier: MIT
+
+"""Benchmark module.
+
+This module measures the Music ratings update throughput against a
+simulated library, so that it can be run anywhere (no Music app
+required).
+
+The following is a simple usage example::
+  from .benchmark import Benchmark
+  b = Benchmark(size=10000, latency=0.001)
+  print(b.run())
+
+Or, from the command-line::
+  python3 -m discogs2music.benchmark --size 10000 --latency 0.001
+
+The import time of the command-line entry point can also be measured
+(and checked against a budget, in milliseconds)::
+  python3 -m discogs2music.benchmark --import-time --import-budget 50
+
+As can the overhead of the per track logging, at every logging level::
+  python3 -m discogs2music.benchmark --logging --size 100000
+
+Or the time to fetch a collection from a mock Discogs server::
+  python3 -m discogs2music.benchmark --fetch --size 2000
+
+Or the peak memory used to fetch collections of 10k, 100k and 1M
+releases::
+  python3 -m discogs2music.benchmark --rss
+
+Or the data file load and save times, and size, of 100k releases::
+  python3 -m discogs2music.benchmark --storage --size 100000
+
+Or the accuracy and throughput of the matching, on 200k tracks::
+  python3 -m discogs2music.benchmark --matching --size 200000
+
+The module contains the following public classes:
+  - Benchmark -- The main entry point. As the example above shows, the
+    Benchmark() class can be used to time a simulated sync.
+  - FetchBenchmark -- Measures the time to fetch a collection from a
+    mock Discogs server, with and without concurrent requests.
+  - ImportBenchmark -- Measures the import time of a module, on a fresh
+    interpreter.
+  - LoggingBenchmark -- Measures the overhead of a per track logging
+    loop.
+  - MatchBenchmark -- Measures the accuracy and throughput of the
+    matching of library names to Discogs ones.
+  - MemoryBenchmark -- Measures the peak memory used to fetch large
+    collections, on a fresh interpreter.
+  - StorageBenchmark -- Measures the data file load and save times, and
+    size, of every storage backend and format.
+
+All other classes in this module are considered implementation details.
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tracemalloc
+from contextlib import redirect_stdout
+from time import perf_counter
+from .backends import SimulatorBackend
+from .logger import Logger
+from .music import Music
+
+
+class _CollectionSession:
+  """Stubbed Discogs API session, serving a simulated collection.
+
+  Collection pages are built on request, with the fields of the Discogs
+  API, so that only the memory used by the client is measured.
+
+  Args:
+    size (int): Number of collection releases.
+  """
+
+  USERNAME = 'benchmark'
+
+  def __init__(self, size):
+    self.__size = size
+
+  @staticmethod
+  def __release(index):
+    """Private method to build a collection release.
+
+    Args:
+      index (int): Release index.
+
+    Returns:
+      dict[str, Any]: Discogs collection release.
+    """
+    url = 'https://api.discogs.com'
+    return {
+        'id': index,
+        'instance_id': 1000000 + index,
+        'folder_id': 1,
+        'rating': index % 6,
+        'date_added': '2020-01-01T00:00:00-07:00',
+        'basic_information': {
+            'id': index,
+            'master_id': index,
+            'master_url': f'{url}/masters/{index}',
+            'resource_url': f'{url}/releases/{index}',
+            'thumb': f'https://i.discogs.com/{index}-150.jpg',
+            'cover_image': f'https://i.discogs.com/{index}-600.jpg',
+            'title': f'Album {index}',
+            'year': 2000 + index % 20,
+            'formats': [{
+                'name': 'Vinyl',
+                'qty': '1',
+                'descriptions': ['LP', 'Album']}],
+            'labels': [{
+                'name': f'Label {index % 100}',
+                'catno': f'CAT-{index}',
+                'entity_type': '1',
+                'entity_type_name': 'Label',
+                'id': index % 100,
+                'resource_url': f'{url}/labels/{index % 100}'}],
+            'artists': [{
+                'name': f'Artist {index // 10}',
+                'anv': '',
+                'join': '',
+                'role': '',
+                'tracks': '',
+                'id': index // 10,
+                'resource_url': f'{url}/artists/{index // 10}'}],
+            'genres': ['Rock'],
+            'styles': ['Indie Rock']}}
+
+  def request(self, method, url, params=None, **kwargs):
+    """Answers a Discogs API request.
+
+    Args:
+      method (str): HTTP method.
+      url (str): Request URL.
+      params (dict[str, Any], optional): Request params. Defaults to
+        None.
+      **kwargs (Any): Other requests.Session.request() arguments
+        (ignored).
+
+    Returns:
+      requests.Response: Response.
+    """
+    # pylint: disable=unused-argument
+    from requests import Response  # pylint: disable=import-outside-toplevel
+    params = params or {}
+    user = f'https://api.discogs.com/users/{self.USERNAME}'
+    if url.endswith('/oauth/identity'):
+      content = {'username': self.USERNAME, 'resource_url': user}
+    elif url.endswith('/releases'):
+      per_page = int(params.get('per_page', 50))
+      start = (int(params.get('page', 1)) - 1) * per_page
+      content = {
+          'pagination': {'pages': -(-self.__size // per_page)},
+          'releases': [
+              self.__release(index) for index in
+              range(start, min(start + per_page, self.__size))]}
+    else:
+      content = {'id': 0, 'count': self.__size}
+    response = Response()
+    response.status_code = 200
+    response.url = url
+    # pylint: disable-next=protected-access
+    response._content = json.dumps(content).encode('utf-8')
+    return response
+
+
+class Benchmark:
+  """Simulated sync benchmark.
+
+  Args:
+    size (int): Number of library tracks.
+    seed (int, optional): Random seed. Defaults to 0.
+    latency (float, optional): Latency, in seconds, per Music app call.
+      Defaults to 0.
+    track_latency (float, optional): Latency, in seconds, per track on
+      bulk reads. Defaults to 0.
+    coverage (float, optional): Share of the albums found on Discogs.
+      Defaults to 0.8.
+    songs (bool, optional): Update songs rating instead of album rating.
+      Defaults to False.
+    override (bool, optional): Override existing ratings. Defaults to
+      False.
+    fuzzy (bool, optional): Enable fuzzy matching. Defaults to False.
+    memory (bool, optional): Also measure the peak memory allocated
+      during the sync (slows it down). Defaults to False.
+  """
+
+  def __init__(
+          self, size, seed=0, latency=0.0, track_latency=0.0, coverage=0.8,
+          songs=False, override=False, fuzzy=False, memory=False):
+    self.__coverage = coverage
+    self.__fuzzy = fuzzy
+    self.__latency = latency
+    self.__memory = memory
+    self.__override = override
+    self.__seed = seed
+    self.__size = size
+    self.__songs = songs
+    self.__track_latency = track_latency
+
+  def run(self):
+    """Runs the benchmark.
+
+    Returns:
+      dict[str, Any]: Benchmark results.
+    """
+    backend = SimulatorBackend(
+        size=self.__size,
+        seed=self.__seed,
+        latency=self.__latency,
+        track_latency=self.__track_latency)
+    ratings = backend.discogs_ratings(coverage=self.__coverage)
+    if self.__memory:
+      tracemalloc.start()
+    start = perf_counter()
+    music = Music(logger=Logger(level=Logger.Level.NONE), backend=backend)
+    music.set_ratings_from_discogs(
+        ratings=ratings,
+        songs=self.__songs,
+        override=self.__override,
+        fuzzy=self.__fuzzy)
+    seconds = perf_counter() - start
+    results = {
+        'tracks': self.__size,
+        'calls': backend.calls,
+        'seconds': round(seconds, 6),
+        'tracks_per_second': round(self.__size / seconds, 2)}
+    if self.__memory:
+      results['peak_memory'] = tracemalloc.get_traced_memory()[1]
+      tracemalloc.stop()
+    return results
+
+
+class FetchBenchmark:
+  """Collection fetch benchmark.
+
+  A simulated collection is fetched from a mock Discogs server (see
+  mockserver.MockDiscogs) that enforces a rate limit and delays every
+  answer, once with a single worker and once with `workers` concurrent
+  requests. The quota time is the shortest time that the requests can
+  take within the rate limit: with enough workers the fetch takes about
+  the quota time, while a single worker also waits for every answer.
+
+  Args:
+    size (int, optional): Number of collection releases. Defaults to
+      2000.
+    workers (int, optional): Number of concurrent requests. Defaults to
+      4 (discogs.Discogs.API_WORKERS).
+    limit (int, optional): Requests allowed per window. Defaults to 60.
+    window (float, optional): Rate limit window, in seconds. Defaults to
+      6 (ten times the Discogs pace, for a shorter run).
+    latency (float, optional): Delay, in seconds, of every answer.
+      Defaults to 0.25.
+  """
+
+  def __init__(self, size=2000, workers=4, limit=60, window=6, latency=0.25):
+    self.__latency = latency
+    self.__limit = limit
+    self.__size = size
+    self.__window = window
+    self.__workers = max(1, workers)
+
+  def __fetch(self, workers):
+    """Private method to time the fetch of the collection.
+
+    Args:
+      workers (int): Number of concurrent requests.
+
+    Returns:
+      tuple[float, int, int]: Fetch time, in seconds, number of requests
+        and number of releases fetched.
+    """
+    # pylint: disable=import-outside-toplevel
+    from .discogs import Discogs
+    from .mockserver import MockDiscogs
+    from .ratelimit import RateLimiter
+    releases = [{
+        'id': index,
+        'instance_id': 1000000 + index,
+        'folder_id': 1,
+        'artist': f'Artist {index}',
+        'title': f'Album {index}',
+        'rating': index % 6,
+        'added': 1500000000 + index * 60} for index in range(self.__size)]
+    with MockDiscogs(
+        releases,
+        limit=self.__limit,
+        window=self.__window,
+        latency=self.__latency) as mock:
+      start = perf_counter()
+      client = Discogs(
+          'token',
+          workers=workers,
+          limiter=RateLimiter(limit=self.__limit, window=self.__window),
+          progress=False,
+          base_url=mock.url)
+      fetched = client.get_ratings()['releases']
+      return perf_counter() - start, mock.requests, len(fetched)
+
+  def run(self):
+    """Runs the benchmark.
+
+    Returns:
+      dict[str, Any]: Benchmark results.
+    """
+    results = {}
+    for workers in sorted({1, self.__workers}):
+      seconds, requests, fetched = self.__fetch(workers)
+      results[f'workers_{workers}'] = {
+          'seconds': round(seconds, 3),
+          'quota_seconds': round(
+              (requests - 1) * self.__window / self.__limit, 3),
+          'requests': requests,
+          'releases': fetched}
+    return {
+        'releases': self.__size,
+        'latency': self.__latency,
+        'requests_per_second': round(self.__limit / self.__window, 3),
+        'fetch': results}
+
+
+class ImportBenchmark:
+  """Import time benchmark.
+
+  The module is imported on a fresh interpreter (python -X importtime)
+  several times and the fastest run is kept.
+
+  Args:
+    module (str, optional): Module to import. Defaults to MODULE (the
+      command-line entry point).
+    runs (int, optional): Number of runs. Defaults to 5.
+    top (int, optional): Number of slowest imports to report. Defaults
+      to 10.
+  """
+
+  HEAVY_MODULES = ('appscript', 'progress', 'requests')
+  MODULE = f'{__package__}.{__package__}'
+
+  def __init__(self, module=MODULE, runs=5, top=10):
+    self.__module = module
+    self.__runs = max(1, runs)
+    self.__top = top
+
+  def __measure(self):
+    """Private method to import the module on a fresh interpreter.
+
+    Only the imports made by the module are kept (the ones made by the
+    interpreter startup are not).
+
+    Returns:
+      dict[str, int]: Cumulative import time, in microseconds, by
+        module.
+    """
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c',
+         f'import {self.__module}'],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True)
+    timings = {}
+    for line in process.stderr.splitlines():
+      if not line.startswith('import time:'):
+        continue
+      _, cumulative, name = line[len('import time:'):].split('|')
+      if not cumulative.strip().isdigit():
+        continue
+      timings[name.strip()] = int(cumulative)
+      # Imports are listed after the modules that they trigger.
+      if name == f' {self.__module}':
+        return timings
+      if not name.startswith('  '):
+        timings = {}
+    return timings
+
+  def run(self):
+    """Runs the benchmark.
+
+    Returns:
+      dict[str, Any]: Benchmark results.
+    """
+    timings = min(
+        (self.__measure() for _ in range(self.__runs)),
+        key=lambda timings: timings.get(self.__module, 0))
+    return {
+        'module': self.__module,
+        'milliseconds': round(timings.get(self.__module, 0) / 1000, 3),
+        'heavy_modules': [
+            name for name in self.HEAVY_MODULES if name in timings],
+        'slowest': {
+            name: round(microseconds / 1000, 3)
+            for name, microseconds in sorted(
+                timings.items(), key=lambda item: -item[1])[:self.__top]}}
+
+
+class LoggingBenchmark:
+  """Logging overhead benchmark.
+
+  Times a per track debug message loop at every logging level, with the
+  messages formatted eagerly (f-strings) or lazily ('msg % args' behind
+  an is_enabled() guard) and written directly, from a background thread
+  (queued) or sampled (queued, keeping one every SAMPLE repeated
+  messages). Messages are written to the null device and only the time
+  spent on the loop is counted.
+
+  Args:
+    size (int, optional): Number of loop iterations. Defaults to 100000.
+  """
+
+  LEVELS = ('WARNING', 'INFO', 'DEBUG')
+  SAMPLE = 100
+  WRITERS = ('direct', 'queued', 'sampled')
+
+  def __init__(self, size=100000):
+    self.__size = max(1, size)
+
+  def __loop(self, logger, lazy):
+    """Private method to time the logging loop.
+
+    Args:
+      logger (logger.Logger): Logger to use.
+      lazy (bool): Format the messages lazily.
+
+    Returns:
+      float: Loop time, in seconds.
+    """
+    names = [f'Song {index}' for index in range(self.__size)]
+    start = perf_counter()
+    if lazy:
+      debug = None
+      if logger.is_enabled(logger.Level.DEBUG):
+        debug = logger.debug
+      for name in names:
+        if debug:
+          debug('Song "%s" not updated.', name)
+    else:
+      for name in names:
+        logger.debug(f'Song "{name}" not updated.')
+    return perf_counter() - start
+
+  def run(self):
+    """Runs the benchmark.
+
+    Returns:
+      dict[str, Any]: Benchmark results (nanoseconds per iteration, by
+        level, writer and formatting).
+    """
+    results = {}
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, \
+        redirect_stdout(devnull):
+      for level in self.LEVELS:
+        for writer in self.WRITERS:
+          for lazy in (False, True):
+            logger = Logger(
+                level=Logger.Level[level],
+                queued=writer != 'direct',
+                sample=self.SAMPLE if writer == 'sampled' else None)
+            seconds = self.__loop(logger, lazy)
+            logger.close()
+            results[
+                f'{level.lower()}_{writer}_{"lazy" if lazy else "eager"}'
+            ] = round(seconds / self.__size * 1e9, 1)
+    return {'iterations': self.__size, 'ns_per_iteration': results}
+
+
+class MatchBenchmark:
+  """Matching benchmark.
+
+  A fixture library is generated along with the Discogs ratings it
+  should match, one album per artist, and every library track is looked
+  up on the matching index (see matcher.Matcher), with and without the
+  fuzzy fallback. Each album name differs from the Discogs one by one of
+  VARIATIONS:
+    - 'exact' -- the same names;
+    - 'case' -- an upper case album title;
+    - 'article' -- 'Name, The' for the Discogs 'The Name';
+    - 'diacritics' -- an artist name without the Discogs diacritics;
+    - 'edition' -- an album title with an edition suffix;
+    - 'numbering' -- an artist name without the Discogs numbering
+      (e.g.: 'Name (2)');
+    - 'multi_artist' -- the artists of a multi-artist release in another
+      order and with another separator;
+    - 'typo' -- a character missing from the album title (only found by
+      the fuzzy fallback);
+    - 'missing' -- an album that is not on Discogs (not to be found).
+  Every Discogs artist has a second album that is not on the library.
+
+  The accuracy is the share of tracks matched to the right album (or,
+  for the missing albums, not matched), overall and by variation. False
+  matches are tracks matched to the wrong album.
+
+  Args:
+    size (int, optional): Number of library tracks. Defaults to 200000.
+    seed (int, optional): Random seed. Defaults to 0.
+    tracks_per_album (int, optional): Tracks per album. Defaults to 10.
+  """
+
+  VARIATIONS = (
+      'exact', 'case', 'article', 'diacritics', 'edition', 'numbering',
+      'multi_artist', 'typo', 'missing')
+  WORDS = (
+      'Black', 'Blue', 'Cold', 'Dream', 'Echo', 'Fire', 'Golden', 'Heart',
+      'Lonely', 'Moon', 'Night', 'Ocean', 'River', 'Rose', 'Silver',
+      'Stone', 'Storm', 'Velvet', 'Wild', 'Wolves')
+
+  def __init__(self, size=200000, seed=0, tracks_per_album=10):
+    self.__seed = seed
+    self.__size = size
+    self.__tracks_per_album = max(1, tracks_per_album)
+
+  def __vary(self, rng, variation, artist, album):
+    """Private method to vary the library names of an album.
+
+    Args:
+      rng (random.Random): Random generator.
+      variation (str): Variation, one of VARIATIONS.
+      artist (str): Discogs artist name.
+      album (str): Discogs album title.
+
+    Returns:
+      tuple[str, str, str]: Discogs artist name, library artist name and
+        library album title.
+    """
+    discogs_artist, local_artist, local_album = artist, artist, album
+    if variation == 'case':
+      local_album = album.upper()
+    elif variation == 'article':
+      discogs_artist, local_artist = f'The {artist}', f'{artist}, The'
+    elif variation == 'diacritics':
+      discogs_artist = artist.replace('e', 'é').replace('o', 'ö')
+    elif variation == 'edition':
+      local_album = rng.choice((
+          f'{album} (Remastered {rng.randint(1990, 2020)})',
+          f'{album} - Deluxe Edition'))
+    elif variation == 'numbering':
+      discogs_artist = f'{artist} ({rng.randint(2, 9)})'
+    elif variation == 'multi_artist':
+      other = f'{rng.choice(self.WORDS)} {rng.choice(self.WORDS)}'
+      discogs_artist = f'{artist} & {other}'
+      local_artist = f'{other} feat. {artist}'
+    elif variation == 'typo':
+      position = rng.randrange(1, len(album) - 1)
+      local_album = album[:position] + album[position + 1:]
+    elif variation == 'missing':
+      local_album = f'{album} Live'
+    return discogs_artist, local_artist, local_album
+
+  def __fixture(self):
+    """Private method to generate the library and the Discogs ratings.
+
+    Returns:
+      tuple[dict[str, Any], list[tuple[str, str, str, int, Any]]]:
+        Discogs ratings and library albums (artist, album, variation,
+        number of tracks and the Discogs artist and album to match, or
+        None).
+    """
+    rng = random.Random(self.__seed)
+    ratings = {}
+    albums = []
+    for index in range(-(-self.__size // self.__tracks_per_album)):
+      artist = f'{rng.choice(self.WORDS)} {rng.choice(self.WORDS)} {index}'
+      album = f'{rng.choice(self.WORDS)} {rng.choice(self.WORDS)}'
+      variation = rng.choice(self.VARIATIONS)
+      discogs_artist, local_artist, local_album = self.__vary(
+          rng, variation, artist, album)
+      artist_albums = ratings.setdefault(discogs_artist, {})
+      artist_albums[f'{album} {index}'] = {'rating': rng.randint(1, 5)}
+      expected = None
+      if variation != 'missing':
+        artist_albums[album] = {'rating': rng.randint(1, 5)}
+        expected = (discogs_artist, album)
+      albums.append((
+          local_artist,
+          local_album,
+          variation,
+          min(
+              self.__tracks_per_album,
+              self.__size - index * self.__tracks_per_album),
+          expected))
+    return ratings, albums
+
+  @staticmethod
+  def __find(matcher, artist, album):
+    """Private method to find an album on the matching index.
+
+    Args:
+      matcher (matcher.Matcher): Matching index.
+      artist (str): Artist name.
+      album (str): Album title.
+
+    Returns:
+      tuple[str, str]: Artist and album keys or None if not found.
+    """
+    artist_key = matcher.find_artist(artist)
+    if artist_key is None:
+      return None
+    album_key = matcher.find_album_key(artist_key, album)
+    if album_key is None:
+      return None
+    return artist_key, album_key
+
+  def __match(self, ratings, albums, fuzzy):
+    """Private method to match every library track.
+
+    Args:
+      ratings (dict[str, Any]): Discogs ratings.
+      albums (list[tuple[str, str, str, int, Any]]): Library albums.
+      fuzzy (bool): Enable the fuzzy matching fallback.
+
+    Returns:
+      dict[str, Any]: Results.
+    """
+    from .matcher import Matcher  # pylint: disable=import-outside-toplevel
+    start = perf_counter()
+    matcher = Matcher(ratings, fuzzy=fuzzy)
+    build_seconds = perf_counter() - start
+    found = []
+    start = perf_counter()
+    for artist, album, _, tracks, _ in albums:
+      for _ in range(tracks):
+        result = self.__find(matcher, artist, album)
+      found.append(result)
+    seconds = perf_counter() - start
+    return {
+        'build_seconds': round(build_seconds, 4),
+        'seconds': round(seconds, 4),
+        'tracks_per_second': round(self.__size / seconds, 2),
+        **self.__score(matcher, albums, found)}
+
+  def __score(self, matcher, albums, found):
+    """Private method to score the matches.
+
+    Args:
+      matcher (matcher.Matcher): Matching index.
+      albums (list[tuple[str, str, str, int, Any]]): Library albums.
+      found (list[tuple[str, str]]): Artist and album keys found, by
+        library album.
+
+    Returns:
+      dict[str, Any]: Accuracy, overall and by variation, and number of
+        false matches.
+    """
+    correct = {variation: 0 for variation in self.VARIATIONS}
+    totals = {variation: 0 for variation in self.VARIATIONS}
+    false_matches = 0
+    for (_, _, variation, tracks, expected), result in zip(albums, found):
+      totals[variation] += tracks
+      if expected is not None:
+        expected = self.__find(matcher, *expected)
+      if result == expected:
+        correct[variation] += tracks
+      elif result is not None:
+        false_matches += tracks
+    return {
+        'accuracy': round(sum(correct.values()) / self.__size, 4),
+        'false_matches': false_matches,
+        'accuracy_by_variation': {
+            variation: round(correct[variation] / totals[variation], 4)
+            for variation in self.VARIATIONS if totals[variation]}}
+
+  def run(self):
+    """Runs the benchmark.
+
+    Returns:
+      dict[str, Any]: Benchmark results.
+    """
+    ratings, albums = self.__fixture()
+    return {
+        'tracks': self.__size,
+        'albums': len(albums),
+        'exact': self.__match(ratings, albums, fuzzy=False),
+        'fuzzy': self.__match(ratings, albums, fuzzy=True)}
+
+
+class MemoryBenchmark:
+  """Collection fetch memory benchmark.
+
+  Simulated collections are fetched from a stubbed Discogs API (no
+  network), each one on a fresh interpreter, and the peak resident
+  memory (RSS) of the interpreter is reported, in MiB. The modes are:
+    - 'ratings' -- the ratings are fetched (Discogs.get_ratings());
+    - 'ratings_low_memory' -- the same, with the low memory mode;
+    - 'stream' -- the releases are only iterated over, with the low
+      memory mode (Discogs.iter_releases()).
+  The peak memory of the interpreter without a fetch is also reported,
+  as 'baseline'.
+
+  Args:
+    sizes (tuple[int, ...], optional): Numbers of collection releases.
+      Defaults to SIZES.
+  """
+
+  MODES = ('ratings', 'ratings_low_memory', 'stream')
+  SIZES = (10000, 100000, 1000000)
+
+  def __init__(self, sizes=SIZES):
+    self.__sizes = sizes
+
+  @staticmethod
+  def __spawn(size, mode):
+    """Private method to measure a fetch on a fresh interpreter.
+
+    Args:
+      size (int): Number of collection releases.
+      mode (str): Fetch mode, one of MODES.
+
+    Returns:
+      float: Peak RSS, in MiB.
+    """
+    process = subprocess.run(
+        [sys.executable, '-c',
+         f'from {__package__}.benchmark import MemoryBenchmark; '
+         f'print(MemoryBenchmark.measure({size}, {mode!r}))'],
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+        check=True)
+    return round(int(process.stdout) / 1024 / 1024, 1)
+
+  @classmethod
+  def measure(cls, size, mode):
+    """Fetches a simulated collection and measures the peak RSS.
+
+    The peak RSS is the one of the whole interpreter, so this is meant
+    to be run on a fresh one (as run() does).
+
+    Args:
+      size (int): Number of collection releases (0 to skip the fetch).
+      mode (str): Fetch mode, one of MODES.
+
+    Returns:
+      int: Peak RSS, in bytes.
+    """
+    # pylint: disable=import-outside-toplevel
+    import resource
+    from .discogs import Discogs
+    from .ratelimit import RateLimiter
+    if mode not in cls.MODES:
+      raise ValueError(f'unknown mode: {mode}')
+    client = Discogs(
+        'token',
+        limiter=RateLimiter(limit=10 ** 9, window=1),
+        session=_CollectionSession(size),
+        low_memory=mode != 'ratings',
+        progress=False)
+    if size and mode == 'stream':
+      for _ in client.iter_releases():
+        pass
+    elif size:
+      client.get_ratings()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports the peak RSS in KiB, macOS in bytes.
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+  def run(self):
+    """Runs the benchmark.
+
+    Returns:
+      dict[str, Any]: Benchmark results (peak RSS, in MiB, by collection
+        size and mode).
+    """
+    return {
+        'baseline': self.__spawn(0, self.MODES[0]),
+        'peak_rss_mib': {
+            str(size): {mode: self.__spawn(size, mode) for mode in self.MODES}
+            for size in self.__sizes}}
+
+
+class StorageBenchmark:
+  """Data file benchmark.
+
+  The records of a simulated collection are saved to a data file (see
+  data.Data) and loaded back, on every storage backend and json format,
+  and the fastest save and load times of some runs and the file size
+  are reported. The json serializer in use (orjson, when installed) is
+  also reported. The zstd format is skipped when the zstandard module
+  is not installed.
+
+  Args:
+    size (int, optional): Number of releases. Defaults to 100000.
+    runs (int, optional): Number of runs. Defaults to 3.
+  """
+
+  FORMATS = (
+      ('json', 'json', False, None),
+      ('json_compact', 'json', True, None),
+      ('json_gzip', 'json', True, 'gzip'),
+      ('json_zstd', 'json', True, 'zstd'),
+      ('sqlite', 'sqlite', False, None))
+
+  def __init__(self, size=100000, runs=3):
+    self.__runs = max(1, runs)
+    self.__size = size
+
+  def __data(self):
+    """Private method to build the data of a simulated collection.
+
+    Returns:
+      dict[str, Any]: Data (see model.Model).
+    """
+    from .model import Model  # pylint: disable=import-outside-toplevel
+    releases = {
+        Model.key(index): {
+            'id': index,
+            'instance_id': 1000000 + index,
+            'artist': f'Artist {index // 10}',
+            'title': f'Album {index}',
+            'rating': index % 6,
+            'added': 1500000000 + index * 60,
+            'priority': 0} for index in range(1, self.__size + 1)}
+    return {
+        'version': Model.VERSION,
+        'last_added': 1500000000 + self.__size * 60,
+        'last_full': 1600000000,
+        'last_updated': 1600000000,
+        'releases': releases}
+
+  def __time(self, store, data):
+    """Private method to time the save and the load of the data.
+
+    Args:
+      store (data.Data): Data file.
+      data (dict[str, Any]): Data to save.
+
+    Returns:
+      tuple[float, float, int]: Fastest save and load times, in seconds,
+        and number of releases loaded.
+    """
+    saves, loads = [], []
+    for _ in range(self.__runs):
+      start = perf_counter()
+      store.save(data)
+      saves.append(perf_counter() - start)
+      start = perf_counter()
+      loaded = store.load()
+      loads.append(perf_counter() - start)
+    return min(saves), min(loads), len(loaded['releases'])
+
+  def run(self):
+    """Runs the benchmark.
+
+    Returns:
+      dict[str, Any]: Benchmark results.
+    """
+    # pylint: disable=import-outside-toplevel
+    import tempfile
+    from . import storage
+    from .data import Data
+    data = self.__data()
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+      for name, backend, compact, compression in self.FORMATS:
+        if compression == 'zstd' and storage.zstandard is None:
+          continue
+        file = os.path.join(directory, name)
+        save, load, releases = self.__time(
+            Data(
+                file=file,
+                backend=backend,
+                compact=compact,
+                compression=compression),
+            data)
+        results[name] = {
+            'save_seconds': round(save, 4),
+            'load_seconds': round(load, 4),
+            'bytes': os.path.getsize(file),
+            'releases': releases}
+    return {
+        'releases': self.__size,
+        'serializer': 'orjson' if storage.orjson else 'json',
+        'formats': results}
+
+
+def main():
+  """Runs the benchmark from the command-line."""
+  parser = argparse.ArgumentParser(
+      prog=f'{__package__}.benchmark',
+      formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+  parser.add_argument(
+      '--size',
+      action='store',
+      default=10000,
+      type=int,
+      help='number of library tracks')
+  parser.add_argument(
+      '--seed',
+      action='store',
+      default=0,
+      type=int,
+      help='random seed')
+  parser.add_argument(
+      '--latency',
+      action='store',
+      default=0.0,
+      type=float,
+      help='latency per Music app call, in seconds')
+  parser.add_argument(
+      '--track-latency',
+      action='store',
+      default=0.0,
+      type=float,
+      help='latency per track on bulk reads, in seconds')
+  parser.add_argument(
+      '--coverage',
+      action='store',
+      default=0.8,
+      type=float,
+      help='share of the albums found on Discogs')
+  parser.add_argument(
+      '--songs',
+      action='store_true',
+      help='update songs rating instead of album rating')
+  parser.add_argument(
+      '--override',
+      action='store_true',
+      help='override existing ratings')
+  parser.add_argument(
+      '--fuzzy',
+      action='store_true',
+      help='enable fuzzy matching')
+  parser.add_argument(
+      '--memory',
+      action='store_true',
+      help='measure the peak memory allocated (slower)')
+  parser.add_argument(
+      '--import-time',
+      action='store_true',
+      help='measure the import time of the command-line entry point instead')
+  parser.add_argument(
+      '--fetch',
+      action='store_true',
+      help='measure the fetch time of a collection of --size releases '
+           'from a mock discogs server instead')
+  parser.add_argument(
+      '--logging',
+      action='store_true',
+      help='measure the overhead of the per track logging (uses --size)')
+  parser.add_argument(
+      '--matching',
+      action='store_true',
+      help='measure the matching accuracy and throughput on a fixture '
+           'library of --size tracks instead')
+  parser.add_argument(
+      '--rss',
+      action='store_true',
+      help='measure the peak memory used to fetch collections of 10k, '
+           '100k and 1M releases instead')
+  parser.add_argument(
+      '--storage',
+      action='store_true',
+      help='measure the data file load and save times, and size, of '
+           '--size releases instead')
+  parser.add_argument(
+      '--import-budget',
+      action='store',
+      default=None,
+      metavar='MS',
+      type=float,
+      help='with --import-time, fail when over MS milliseconds or when a '
+           'heavy dependency is imported')
+  options = vars(parser.parse_args())
+  import_time = options.pop('import_time')
+  import_budget = options.pop('import_budget')
+  size = options['size']
+  benchmarks = {
+      'fetch': lambda: FetchBenchmark(size=size),
+      'logging': lambda: LoggingBenchmark(size=size),
+      'matching': lambda: MatchBenchmark(size=size, seed=options['seed']),
+      'rss': MemoryBenchmark,
+      'storage': lambda: StorageBenchmark(size=size)}
+  chosen = [name for name in benchmarks if options.pop(name)]
+  if chosen:
+    print(json.dumps(benchmarks[chosen[0]]().run()))
+    return 0
+  if not import_time:
+    print(json.dumps(Benchmark(**options).run()))
+    return 0
+  results = ImportBenchmark().run()
+  print(json.dumps(results))
+  if import_budget is not None and (
+      results['milliseconds'] > import_budget or results['heavy_modules']):
+    return 1
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,43 @@
+from typing import Any, Final, Optional
+
+class Benchmark:
+    def __init__(self, size: int, seed: int = ..., latency: float = ..., track_latency: float = ..., coverage: float = ..., songs: bool = ..., override: bool = ..., fuzzy: bool = ..., memory: bool = ...) -> None: ...
+    def run(self) -> dict[str, Any]: ...
+
+class FetchBenchmark:
+    def __init__(self, size: int = ..., workers: int = ..., limit: int = ..., window: float = ..., latency: float = ...) -> None: ...
+    def run(self) -> dict[str, Any]: ...
+
+class ImportBenchmark:
+    HEAVY_MODULES: Final[tuple[str, ...]] = ...
+    MODULE: Final[str] = ...
+    def __init__(self, module: str = ..., runs: int = ..., top: int = ...) -> None: ...
+    def run(self) -> dict[str, Any]: ...
+
+class LoggingBenchmark:
+    LEVELS: Final[tuple[str, ...]] = ...
+    SAMPLE: Final[int] = ...
+    WRITERS: Final[tuple[str, ...]] = ...
+    def __init__(self, size: int = ...) -> None: ...
+    def run(self) -> dict[str, Any]: ...
+
+class MatchBenchmark:
+    VARIATIONS: Final[tuple[str, ...]] = ...
+    WORDS: Final[tuple[str, ...]] = ...
+    def __init__(self, size: int = ..., seed: int = ..., tracks_per_album: int = ...) -> None: ...
+    def run(self) -> dict[str, Any]: ...
+
+class MemoryBenchmark:
+    MODES: Final[tuple[str, ...]] = ...
+    SIZES: Final[tuple[int, ...]] = ...
+    def __init__(self, sizes: tuple[int, ...] = ...) -> None: ...
+    @classmethod
+    def measure(cls, size: int, mode: str) -> int: ...
+    def run(self) -> dict[str, Any]: ...
+
+class StorageBenchmark:
+    FORMATS: Final[tuple[tuple[str, str, bool, Optional[str]], ...]] = ...
+    def __init__(self, size: int = ..., runs: int = ...) -> None: ...
+    def run(self) -> dict[str, Any]: ...
+
+def main() -> int: ...
@@ -0,0 +1,213 @@
+# -*- coding: UTF-8 -*-
+#
+# copyright: 2020-2022, Frederico Martins
+# author: Frederico Martins <http://github.com/fscm>
+# license: SPDX-License-Identifier: MIT
+
+"""Response cache module.
+
+This module keeps the Discogs API responses on disk so that they can be
+reused, or revalidated, on the following runs.
+
+The following is a simple usage example::
+  from .cache import Cache
+  c = Cache('my_cache.db', ttl=3600)
+  key = c.key('https://api.discogs.com/oauth/identity', {'token': 'x'})
+  entry = c.get(key)
+  if entry is None:
+    c.put(key, b'{}', etag='"abc"')
+  c.close()
+
+The module contains the following public classes:
+  - Cache -- The main entry point. As the example above shows, the
+    Cache() class can be used to store and retrieve responses.
+
+All other classes in this module are considered implementation details.
+"""
+
+import sqlite3
+from collections import namedtuple
+from hashlib import sha256
+from threading import Lock
+from time import time
+from urllib.parse import urlencode
+
+
+CacheEntry = namedtuple(
+    'CacheEntry',
+    ['content', 'etag', 'last_modified', 'fresh'])
+
+
+class Cache:
+  """Response cache.
+
+  This class stores responses on a SQLite database. Entries younger
+  than `ttl` are fresh and can be used as they are, older entries have
+  to be revalidated with the server. When the stored responses exceed
+  `max_size` the least recently used ones are evicted.
+
+  Args:
+    file (str): Cache file.
+    ttl (int, optional): Time, in seconds, an entry is fresh. Defaults
+      to 3600.
+    max_size (int, optional): Maximum size, in bytes, of the stored
+      responses. Defaults to 64 MiB.
+    logger (logger.Logger, optional): Logger to use. Defaults to None.
+    clock (Callable[[], float], optional): Clock. Defaults to
+      time.time.
+  """
+
+  def __init__(
+          self, file, ttl=3600, max_size=64 * 1024 * 1024, logger=None,
+          clock=time):
+    self.__clock = clock
+    self.__file = file
+    self.__lock = Lock()
+    self.__logger = logger
+    self.__max_size = max_size
+    self.__stats = {'hits': 0, 'misses': 0, 'revalidations': 0}
+    self.__ttl = ttl
+    self.__connection = sqlite3.connect(file, check_same_thread=False)
+    self.__connection.execute(
+        'CREATE TABLE IF NOT EXISTS responses ('
+        'key TEXT PRIMARY KEY, '
+        'etag TEXT, '
+        'last_modified TEXT, '
+        'stored REAL NOT NULL, '
+        'accessed REAL NOT NULL, '
+        'size INTEGER NOT NULL, '
+        'content BLOB NOT NULL)')
+    self.__connection.execute(
+        'CREATE INDEX IF NOT EXISTS responses_accessed '
+        'ON responses (accessed)')
+    self.__connection.commit()
+
+  @property
+  def file(self):
+    """str: cache file."""
+    return self.__file
+
+  @property
+  def stats(self):
+    """dict[str, int]: cache hits, misses and revalidations."""
+    with self.__lock:
+      return dict(self.__stats)
+
+  @staticmethod
+  def key(url, params=None):
+    """Builds the cache key of a request.
+
+    The params (that include the API token) are hashed together with
+    the URL so that no secrets are stored on the cache file.
+
+    Args:
+      url (str): Request URL.
+      params (dict[str, Any], optional): Request params. Defaults to
+        None.
+
+    Returns:
+      str: Cache key.
+    """
+    query = urlencode(sorted((params or {}).items()))
+    return sha256(f'{url}?{query}'.encode('utf-8')).hexdigest()
+
+  def __evict(self):
+    """Private method to evict the least recently used entries.
+
+    Must be called with the lock held.
+    """
+    total = self.__connection.execute(
+        'SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+    if total <= self.__max_size:
+      return
+    rows = self.__connection.execute(
+        'SELECT key, size FROM responses ORDER BY accessed').fetchall()
+    for key, size in rows:
+      if total <= self.__max_size:
+        break
+      self.__connection.execute('DELETE FROM responses WHERE key = ?', (key,))
+      total -= size
+    if self.__logger:
+      self.__logger.debug('Cache evicted down to %d bytes.', total)
+
+  def close(self):
+    """Closes the cache file."""
+    with self.__lock:
+      self.__connection.close()
+
+  def expire(self, keys):
+    """Marks some entries as stale, so that they are revalidated with
+    the server the next time they are used.
+
+    Args:
+      keys (Iterable[str]): Cache keys.
+    """
+    with self.__lock:
+      self.__connection.executemany(
+          'UPDATE responses SET stored = 0 WHERE key = ?',
+          ((key,) for key in keys))
+      self.__connection.commit()
+
+  def get(self, key):
+    """Retrieves an entry from the cache.
+
+    Args:
+      key (str): Cache key.
+
+    Returns:
+      CacheEntry: The entry or None if not found.
+    """
+    now = self.__clock()
+    with self.__lock:
+      row = self.__connection.execute(
+          'SELECT content, etag, last_modified, stored FROM responses '
+          'WHERE key = ?', (key,)).fetchone()
+      if row is None:
+        return None
+      self.__connection.execute(
+          'UPDATE responses SET accessed = ? WHERE key = ?', (now, key))
+      self.__connection.commit()
+      fresh = (now - row[3]) < self.__ttl
+      if fresh:
+        self.__stats['hits'] += 1
+    return CacheEntry(
+        content=row[0],
+        etag=row[1],
+        last_modified=row[2],
+        fresh=fresh)
+
+  def put(self, key, content, etag=None, last_modified=None):
+    """Stores a response fetched from the server.
+
+    Args:
+      key (str): Cache key.
+      content (bytes): Response content.
+      etag (str, optional): Response ETag. Defaults to None.
+      last_modified (str, optional): Response Last-Modified date.
+        Defaults to None.
+    """
+    now = self.__clock()
+    with self.__lock:
+      self.__stats['misses'] += 1
+      self.__connection.execute(
+          'INSERT OR REPLACE INTO responses '
+          '(key, etag, last_modified, stored, accessed, size, content) '
+          'VALUES (?, ?, ?, ?, ?, ?, ?)',
+          (key, etag, last_modified, now, now, len(content), content))
+      self.__evict()
+      self.__connection.commit()
+
+  def revalidate(self, key):
+    """Marks an entry as fresh after the server confirmed that it has
+    not changed.
+
+    Args:
+      key (str): Cache key.
+    """
+    now = self.__clock()
+    with self.__lock:
+      self.__stats['revalidations'] += 1
+      self.__connection.execute(
+          'UPDATE responses SET stored = ?, accessed = ? WHERE key = ?',
+          (now, now, key))
+      self.__connection.commit()
@@ -0,0 +1,22 @@
+from typing import Any, Callable, Iterable, NamedTuple, Optional
+from .logger import Logger
+
+class CacheEntry(NamedTuple):
+    content: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fresh: bool
+
+class Cache:
+    def __init__(self, file: str, ttl: int = ..., max_size: int = ..., logger: Optional[Logger] = ..., clock: Callable[[], float] = ...) -> None: ...
+    @property
+    def file(self) -> str: ...
+    @property
+    def stats(self) -> dict[str, int]: ...
+    @staticmethod
+    def key(url: str, params: Optional[dict[str, Any]] = ...) -> str: ...
+    def close(self) -> None: ...
+    def expire(self, keys: Iterable[str]) -> None: ...
+    def get(self, key: str) -> Optional[CacheEntry]: ...
+    def put(self, key: str, content: bytes, etag: Optional[str] = ..., last_modified: Optional[str] = ...) -> None: ...
+    def revalidate(self, key: str) -> None: ...
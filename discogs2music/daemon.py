@@ -0,0 +1,188 @@
+# -*- coding: UTF-8 -*-
+#
+# copyright: 2020-2022, Frederico Martins
+# author: Frederico Martins <http://github.com/fscm>
+# license: SPDX-License-Identifier: MIT
+
+"""Daemon module.
+
+This module runs syncs on a schedule, for as long as the process runs,
+and reports their status on a local HTTP endpoint.
+
+The following is a simple usage example::
+  from .daemon import Daemon
+  d = Daemon(sync, interval=3600, port=8765)
+  d.run()
+
+Then, from another terminal::
+  curl http://127.0.0.1:8765/status
+  curl http://127.0.0.1:8765/metrics
+
+The module contains the following public classes:
+  - Daemon -- The main entry point. As the example above shows, the
+    Daemon() class can be used to run scheduled syncs.
+
+All other classes in this module are considered implementation details.
+"""
+
+import json
+import signal
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from time import monotonic, time
+
+
+class _StatusServer(ThreadingMixIn, HTTPServer):
+  """Status HTTP server."""
+
+  daemon_threads = True
+
+
+class Daemon:
+  """Scheduled syncs runner.
+
+  The first sync is run at once and the following ones every `interval`
+  seconds (counted from the start of the previous one). Syncs are only
+  incremental with the incremental option, so that, without it, rating
+  changes on older releases are still picked up. A failed sync is logged
+  and does not stop the daemon. SIGINT and SIGTERM stop the daemon after
+  the current sync.
+
+  When a port is given, a status server listens on the loopback
+  interface:
+    - GET /status -- state of the daemon and of the last sync (json);
+    - GET /metrics -- metrics of all the syncs (Prometheus text format).
+
+  Args:
+    sync (sync.Sync): Sync runner.
+    interval (int): Time, in seconds, between syncs.
+    port (int, optional): Status server port. Defaults to None (no
+      status server).
+    logger (logger.Logger, optional): Logger to use. Defaults to None.
+  """
+
+  HOST = '127.0.0.1'
+
+  def __init__(self, sync, interval, port=None, logger=None):
+    self.__interval = max(1, interval)
+    self.__lock = threading.Lock()
+    self.__logger = logger
+    self.__port = port
+    self.__server = None
+    self.__status = {
+        'started': int(time()),
+        'runs': 0,
+        'failures': 0,
+        'running': False,
+        'next_run': None,
+        'last_run': None}
+    self.__stopping = threading.Event()
+    self.__sync = sync
+
+  @property
+  def status(self):
+    """dict[str, Any]: daemon status."""
+    with self.__lock:
+      return dict(self.__status)
+
+  def __serve(self):
+    """Private method to start the status server on its own thread."""
+    daemon = self
+
+    class Handler(BaseHTTPRequestHandler):
+      """Status request handler."""
+
+      def do_GET(self):  # pylint: disable=invalid-name
+        """Answers a status or metrics request."""
+        if self.path == '/status':
+          content_type = 'application/json'
+          body = json.dumps(daemon.status)
+        elif self.path == '/metrics':
+          content_type = 'text/plain; version=0.0.4'
+          body = daemon.metrics.render('prometheus')
+        else:
+          self.send_error(404)
+          return
+        body = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+      # pylint: disable-next=redefined-builtin
+      def log_message(self, format, *args):
+        """Logs the requests in debug mode."""
+        if daemon.logger:
+          daemon.logger.debug('Status server: ' + format, *args)
+
+    self.__server = _StatusServer((self.HOST, self.__port), Handler)
+    threading.Thread(
+        target=self.__server.serve_forever,
+        name='status-server',
+        daemon=True).start()
+    if self.__logger:
+      self.__logger.info(
+          'Status server listening on http://%s:%d/', self.HOST, self.__port)
+
+  @property
+  def logger(self):
+    """logger.Logger: logger in use."""
+    return self.__logger
+
+  @property
+  def metrics(self):
+    """metrics.Metrics: syncs metrics."""
+    return self.__sync.metrics
+
+  def __run_sync(self):
+    """Private method to run a sync and record its outcome."""
+    started = time()
+    start = monotonic()
+    with self.__lock:
+      self.__status['running'] = True
+    error = None
+    try:
+      self.__sync.run()
+    except Exception as err:  # pylint: disable=broad-except
+      error = str(err) or type(err).__name__
+      if self.__logger:
+        self.__logger.error('Sync failed: %s', error)
+    with self.__lock:
+      self.__status['running'] = False
+      self.__status['runs'] += 1
+      if error:
+        self.__status['failures'] += 1
+      self.__status['last_run'] = {
+          'started': int(started),
+          'seconds': round(monotonic() - start, 3),
+          'error': error}
+
+  def run(self):
+    """Runs the syncs until stopped."""
+    if threading.current_thread() is threading.main_thread():
+      for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: self.stop())
+    if self.__port:
+      self.__serve()
+    try:
+      while not self.__stopping.is_set():
+        start = monotonic()
+        self.__run_sync()
+        wait = max(0, self.__interval - (monotonic() - start))
+        with self.__lock:
+          self.__status['next_run'] = int(time() + wait)
+        if self.__logger:
+          self.__logger.info('Next sync in %d seconds.', wait)
+        self.__stopping.wait(wait)
+    finally:
+      if self.__server:
+        self.__server.shutdown()
+        self.__server.server_close()
+      if self.__logger:
+        self.__logger.info('Daemon stopped.')
+
+  def stop(self):
+    """Stops the daemon, after the current sync."""
+    self.__stopping.set()
@@ -0,0 +1,16 @@
+from typing import Any, Final, Optional
+from .logger import Logger
+from .metrics import Metrics
+from .sync import Sync
+
+class Daemon:
+    HOST: Final[str] = ...
+    def __init__(self, sync: Sync, interval: int, port: Optional[int] = ..., logger: Optional[Logger] = ...) -> None: ...
+    @property
+    def status(self) -> dict[str, Any]: ...
+    @property
+    def logger(self) -> Optional[Logger]: ...
+    @property
+    def metrics(self) -> Metrics: ...
+    def run(self) -> None: ...
+    def stop(self) -> None: ...
@@ -6,81 +6,197 @@
 
 """Data parsing module.
 
-This module loads and saves json data from and to a data file.
+This module loads and saves data from and to a data file, and exports
+and imports the ratings to and from records files.
 
 The following is a simple usage example::
   from .data import Data
   d = Data('my_file.json')
   json_data = d.load()
   d.save(json_data)
+  d.export_to('my_ratings.csv', json_data)
 
 The module contains the following public classes:
   - Data -- The main entry point. As the example above shows, the
-    Data() class can be used to load and save json data from a file.
+    Data() class can be used to load and save data from a file.
 
 All other classes in this module are considered implementation details.
 """
 
-import json
-from os import path
+from time import perf_counter
+from .exchange import RecordsFile
+from .model import Model
+from .storage import JsonStorage, SqliteStorage
 
 
 class Data:
   """Data parser.
 
-  This class loads and saves json data from and to a data file.
+  This class loads and saves data from and to a data file, using one of
+  the available storage backends.
+
+  The data is kept as one record per release (see model.Model). Older,
+  names keyed, data is upgraded when loaded. The names index is rebuilt
+  on load, as 'ratings', with the accounts conflict policy, and is not
+  saved.
 
   Args:
     file (str, optional): Data file. Defaults to None.
     logger (logger.Logger, optional): Logger to use.  Defaults to None.
+    backend (str, optional): Storage backend, one of BACKENDS. Defaults
+      to 'json'.
+    compact (bool, optional): Write compact json (json backend only).
+      Defaults to False.
+    compression (str, optional): Compression to use (json backend only),
+      one of JsonStorage.COMPRESSIONS. Defaults to None.
+    metrics (metrics.Metrics, optional): Metrics to record the load and
+      save times to. Defaults to None.
+    policy (str, optional): Accounts conflict policy, one of
+      model.Model.POLICIES. Defaults to 'priority'.
   """
 
-  def __init__(self, file=None, logger=None):
+  BACKENDS = ('json', 'sqlite')
+
+  def __init__(
+          self, file=None, logger=None, backend='json', compact=False,
+          compression=None, metrics=None, policy='priority'):
     self.__file = file
     self.__logger = logger
+    self.__metrics = metrics
+    self.__policy = policy
+    if backend == 'sqlite':
+      self.__storage = SqliteStorage(file=file, logger=logger)
+    else:
+      self.__storage = JsonStorage(
+          file=file,
+          logger=logger,
+          compact=compact,
+          compression=compression)
 
-  def load(self):
-    """Loads json data from a data file.
+  def export_to(self, file, data=None, file_format=None):
+    """Exports the ratings to a records file (see exchange.RecordsFile).
+
+    Args:
+      file (str): Records file.
+      data (dict[str, Any], optional): Data to export. Defaults to None
+        (the data file data).
+      file_format (str, optional): Records file format. Defaults to None
+        (by the file extension).
 
     Returns:
-      dict: The json data.
+      int: Number of records exported.
     """
     if self.__logger:
-      self.__logger.info(f'Loading data from "{self.__file}"')
-    data = None
-    if path.isfile(self.__file):
-      in_file = open(self.__file, 'r')
-      try:
-        data = json.load(in_file)
-      except ValueError as err:
-        if self.__logger:
-          self.__logger.error(f'Error loading data from "{self.__file}"')
-          self.__logger.debug(str(err))
-      in_file.close()
-    else:
+      self.__logger.info('Exporting ratings to "%s"', file)
+    if data is None:
+      data = self.load() or {}
+    start = perf_counter()
+    try:
+      count = RecordsFile(file=file, file_format=file_format).write(
+          data.get('releases', {}).values())
+    except (OSError, ValueError) as err:
       if self.__logger:
-        self.__logger.warning(f'Data file not found ({self.__file})')
-    return data
+        self.__logger.error('Unable to export ratings to "%s"', file)
+        self.__logger.debug(str(err))
+      return 0
+    if self.__metrics:
+      self.__metrics.observe('data_export_seconds', perf_counter() - start)
+    return count
 
-  def save(self, data):
-    """Saves json data to a data file.
+  def import_from(self, file, file_format=None):
+    """Imports the ratings from a records file (see
+    exchange.RecordsFile) into this data file.
+
+    Imported records replace the stored ones with the same key (see
+    model.Model.merge()). Nothing is saved if the records file can not
+    be read.
 
     Args:
-      data (dict): data to save.
+      file (str): Records file.
+      file_format (str, optional): Records file format. Defaults to None
+        (by the file extension).
+
+    Returns:
+      int: Number of records imported.
     """
     if self.__logger:
-      self.__logger.info(f'Writing data to "{self.__file}"')
-    out_file = open(self.__file, 'w')
+      self.__logger.info(
+          'Importing ratings from "%s" to "%s"', file, self.__file)
+    start = perf_counter()
+    data = Model.upgrade(self.__storage.load() or {})
+    releases = data['releases']
+    count = 0
     try:
-      json.dump(
-          data,
-          out_file,
-          check_circular=True,
-          ensure_ascii=False,
-          skipkeys=True)
-    except BaseException as err:
+      for record in RecordsFile(file=file, file_format=file_format).read():
+        Model.merge(releases, {Model.record_key(record): record})
+        count += 1
+    except (OSError, ValueError) as err:
       if self.__logger:
-        self.__logger.error(f'Unable to write to "{self.__file}"')
-        self.__logger.error(str(err))
+        self.__logger.error('Error importing ratings from "%s"', file)
         self.__logger.debug(str(err))
-    out_file.close()
+      return 0
+    self.__storage.save(self.__strip(data))
+    if self.__metrics:
+      self.__metrics.observe('data_import_seconds', perf_counter() - start)
+    return count
+
+  @staticmethod
+  def __strip(data):
+    """Private method to remove the names index from the data.
+
+    Args:
+      data (dict[str, Any]): Data.
+
+    Returns:
+      dict[str, Any]: Data to save.
+    """
+    return {key: value for key, value in data.items() if key != 'ratings'}
+
+  def load(self):
+    """Loads data from a data file.
+
+    Returns:
+      dict: The data or None if there is no data.
+    """
+    if self.__logger:
+      self.__logger.info('Loading data from "%s"', self.__file)
+    start = perf_counter()
+    data = self.__storage.load()
+    if data is not None:
+      data = Model.upgrade(data)
+      data['ratings'] = Model.index(data['releases'], self.__policy)
+    if self.__metrics:
+      self.__metrics.observe('data_load_seconds', perf_counter() - start)
+    return data
+
+  def migrate(self, file):
+    """Migrates the data from a json data file to this data file.
+
+    Args:
+      file (str): Json data file to migrate from.
+
+    Returns:
+      bool: True if the data was migrated.
+    """
+    if self.__logger:
+      self.__logger.info(
+          'Migrating data from "%s" to "%s"', file, self.__file)
+    data = JsonStorage(file=file, logger=self.__logger).load()
+    if data is None:
+      return False
+    self.__storage.load()
+    self.__storage.save(self.__strip(Model.upgrade(data)))
+    return True
+
+  def save(self, data):
+    """Saves data to a data file.
+
+    Args:
+      data (dict): data to save.
+    """
+    if self.__logger:
+      self.__logger.info('Writing data to "%s"', self.__file)
+    start = perf_counter()
+    self.__storage.save(self.__strip(data))
+    if self.__metrics:
+      self.__metrics.observe('data_save_seconds', perf_counter() - start)
@@ -1,7 +1,12 @@
-from typing import Any, Optional
+from typing import Any, Final, Optional
 from .logger import Logger
+from .metrics import Metrics
 
 class Data:
-    def __init__(self, file: Optional[str] = ..., logger: Optional[Logger] = ...) -> None: ...
+    BACKENDS: Final[tuple[str, ...]] = ...
+    def __init__(self, file: Optional[str] = ..., logger: Optional[Logger] = ..., backend: str = ..., compact: bool = ..., compression: Optional[str] = ..., metrics: Optional[Metrics] = ..., policy: str = ...) -> None: ...
+    def export_to(self, file: str, data: Optional[dict[str, Any]] = ..., file_format: Optional[str] = ...) -> int: ...
+    def import_from(self, file: str, file_format: Optional[str] = ...) -> int: ...
     def load(self) -> dict[str, Any]: ...
+    def migrate(self, file: str) -> bool: ...
     def save(self, data: dict[str, Any]) -> None: ...
@@ -17,15 +17,24 @@ The following is a simple usage example::
 The module contains the following public classes:
   - Discogs -- The main entry point. As the example above shows, the
     Discogs() class can be used to load data from Discogs.
+  - Release -- Compact record of a collection release, as yielded by
+    Discogs.iter_releases().
 
 All other classes in this module are considered implementation details.
 """
 
 import json
 import re
-from time import time, sleep
-from progress.bar import Bar
-from requests import sessions
+from collections import deque, namedtuple
+from itertools import islice
+from time import perf_counter, time
+from .model import Model
+from .ratelimit import RateLimiter
+
+
+Release = namedtuple(
+    'Release',
+    ['id', 'instance_id', 'artist', 'title', 'rating', 'added'])
 
 
 class Discogs:
@@ -33,107 +42,704 @@ class Discogs:
 
   This class loads data from Discogs.
 
+  Collection pages are fetched concurrently by a pool of workers, all
+  of them sharing the same request scheduler. Requests are paced to stay
+  within the rate limit and failed requests are retried with backoff.
+  Rating changes (see set_rating()) go through the same scheduler.
+
   Args:
     key (str): Discogs API key.
     logger (logger.Logger, optional): Logger to use. Defaults to None.
+    cache (cache.Cache, optional): Response cache to use. Defaults to
+      None.
+    workers (int, optional): Number of concurrent requests. Defaults to
+      API_WORKERS.
+    limiter (ratelimit.RateLimiter, optional): Request scheduler to use.
+      Defaults to a new one.
+    session (requests.Session, optional): HTTP session to use. Defaults
+      to a new one.
+    low_memory (bool, optional): Only keep the needed fields when
+      decoding the collection pages. Defaults to False.
+    metrics (metrics.Metrics, optional): Metrics to record the requests,
+      latencies and waits to. Defaults to None.
+    folders (tuple[int, ...], optional): Collection folders to read.
+      Defaults to (0,) (all the releases).
+    progress (bool, optional): Show a progress bar. Defaults to True.
+    base_url (str, optional): Discogs API URL (e.g.: of a mock server,
+      see mockserver.MockDiscogs). Defaults to API_BASEURL.
+    journal (journal.Journal, optional): Run journal to checkpoint the
+      collection pages to (and to resume them from). Defaults to None.
   """
 
   API_BASEURL = 'https://api.discogs.com'
+  API_DETAILS_FIELDS = frozenset((
+      'anv', 'artists', 'descriptions', 'formats', 'name', 'position',
+      'title', 'tracklist', 'type_'))
   API_FORMAT = 'application/vnd.discogs.v2.plaintext+json'
   API_LIMIT = 100
+  API_NOT_FOUND_STATUS = 404
+  API_NOT_MODIFIED_STATUS = 304
+  API_RATELIMIT_REQUESTS = 60
+  API_RELEASE_FIELDS = frozenset((
+      'artists', 'basic_information', 'date_added', 'id', 'instance_id',
+      'name', 'pages', 'pagination', 'rating', 'releases', 'title'))
   API_RATELIMIT_STATUS = 429
   API_RATELIMIT_TIME = 61
+  API_REJECTED_STATUS = frozenset((400, 404, 422))
+  API_RETRIES = 5
+  API_WORKERS = 4
 
-  def __init__(self, key, logger=None):
-    self.__api_last_block_time = time()
+  def __init__(
+          self, key, logger=None, cache=None, workers=API_WORKERS,
+          limiter=None, session=None, low_memory=False, metrics=None,
+          folders=(0,), progress=True, base_url=API_BASEURL, journal=None):
+    self.__base_url = base_url.rstrip('/')
+    self.__cache = cache
+    self.__collection_keys = set()
+    self.__folders = tuple(folders)
     self.__headers = {
         'Accept': f'{self.API_FORMAT}',
         'Accept-Encoding': 'gzip',
         'Content-Type': 'application/json',
         'User-Agent': f'{__package__}'}
+    self.__journal = journal
     self.__key = key
+    self.__limiter = limiter or RateLimiter(
+        limit=self.API_RATELIMIT_REQUESTS,
+        window=self.API_RATELIMIT_TIME)
     self.__logger = logger
+    self.__low_memory = low_memory
+    self.__metrics = metrics
     self.__params = {
         'token': f'{self.__key}',
         'per_page': self.API_LIMIT}
-    self.__session = sessions.Session()
-    self.__identity = self.__request(f'{self.API_BASEURL}/oauth/identity')
+    self.__progress = progress
+    # requests is slow to import, only load it when a client is created.
+    # pylint: disable-next=import-outside-toplevel
+    from requests import exceptions, sessions
+    self.__http_error = exceptions.HTTPError
+    self.__retry_errors = (exceptions.ConnectionError, exceptions.Timeout)
+    self.__session = session or sessions.Session()
+    self.__workers = max(1, workers)
+    self.__identity = self.__request(f'{self.__base_url}/oauth/identity')
+
+  @property
+  def username(self):
+    """str: Discogs user name."""
+    return self.__identity.get('username', '')
+
+  def __send(self, url, params, headers, method='GET', payload=None):
+    """Private method to send a request to the Discogs API.
+
+    Requests are paced by the request scheduler. Requests that fail to
+    connect, are rate limited or get a server error are retried, up to
+    API_RETRIES times. Rate limited requests wait for the Retry-After
+    time, when the server sends one.
+
+    Args:
+      url (str): Request URL.
+      params (dict[str, Any]): Request params.
+      headers (dict[str, str]): Request headers.
+      method (str, optional): HTTP method. Defaults to 'GET'.
+      payload (dict[str, Any], optional): JSON body. Defaults to None.
+
+    Returns:
+      requests.Response: Response.
+
+    Raises:
+      requests.HTTPError: When still rate limited after the retries.
+    """
+    attempt = 0
+    while True:
+      waited = self.__limiter.acquire()
+      start = perf_counter()
+      try:
+        response = self.__session.request(
+            method,
+            url,
+            params=params,
+            headers=headers,
+            json=payload)
+      except self.__retry_errors as err:
+        if attempt >= self.API_RETRIES:
+          raise
+        if self.__logger:
+          self.__logger.warning('API request failed, retrying.')
+          self.__logger.debug(str(err))
+        self.__backoff(attempt, waited)
+        attempt += 1
+        continue
+      if self.__metrics:
+        self.__metrics.increment('discogs_requests_total')
+        self.__metrics.increment('discogs_sleep_seconds_total', waited)
+        self.__metrics.observe(
+            'discogs_request_seconds',
+            perf_counter() - start)
+      status_code = response.status_code
+      self.__limiter.update(
+          limit=self.__get_header(response, 'X-Discogs-Ratelimit'),
+          used=self.__get_header(response, 'X-Discogs-Ratelimit-Used'),
+          remaining=self.__get_header(
+              response,
+              'X-Discogs-Ratelimit-Remaining'))
+      if status_code == self.API_RATELIMIT_STATUS:
+        if self.__logger:
+          self.__logger.warning('API rate limit reached.')
+        if self.__metrics:
+          self.__metrics.increment('discogs_ratelimited_total')
+        if attempt >= self.API_RETRIES:
+          response.raise_for_status()
+        retry_after = self.__get_header(response, 'Retry-After')
+        self.__limiter.pause(
+            retry_after if retry_after is not None
+            else self.__limiter.backoff(attempt))
+        attempt += 1
+        continue
+      if status_code >= 500 and attempt < self.API_RETRIES:
+        if self.__logger:
+          self.__logger.warning(
+              'API server error (%d), retrying.', status_code)
+        self.__backoff(attempt)
+        attempt += 1
+        continue
+      return response
 
-  def __request(self, url, params=None):
+  def __request(self, url, params=None, fields=None):
     """Private method to perform a request to the Discogs API.
 
+    When a cache is in use, fresh responses are served from it and stale
+    ones are revalidated with the server.
+
     Args:
       url (str): Request URL.
       params (dict[str, Any], optional): Extra requests params.
         Defaults to None.
+      fields (frozenset[str], optional): Fields to keep from the
+        response, at every level. Defaults to None (all).
 
     Returns:
       dict[str, Any]: Discogs API data.
+
+    Raises:
+      requests.HTTPError: On error statuses (after the retries, see
+        __send()).
     """
-    response = self.__session.get(
-        url,
-        params={**self.__params, **params} if params else self.__params,
-        headers=self.__headers)
-    headers = response.headers
+    params = {**self.__params, **params} if params else self.__params
+    headers = self.__headers
+    entry = None
+    if self.__cache:
+      key = self.__cache.key(url, params)
+      if '/collection/' in url:
+        self.__collection_keys.add(key)
+      entry = self.__cache.get(key)
+      if entry and entry.fresh:
+        if self.__metrics:
+          self.__metrics.increment('discogs_cache_hits_total')
+        return self.__decode(entry.content, fields)
+      if entry:
+        headers = {
+            **headers,
+            **({'If-None-Match': entry.etag} if entry.etag else {}),
+            **({'If-Modified-Since': entry.last_modified}
+               if entry.last_modified else {})}
+    response = self.__send(url, params, headers)
     status_code = response.status_code
-    remaining_queries = int(headers.get('X-Discogs-Ratelimit-Remaining', 60))
-    if (remaining_queries < 2) or (status_code == self.API_RATELIMIT_STATUS):
-      if self.__logger:
-        self.__logger.warning('API rate limit reacehd.')
-      now = time()
-      sleep(max(
-          2,
-          self.API_RATELIMIT_TIME - (now - self.__api_last_block_time)))
-      self.__api_last_block_time = now
-      return self.__request(url=url, params=params)
-    return json.loads(response.content)
-
-  def get_ratings(self, ratings=None):
-    """Fetch Discogs ratings from the user's collection.
+    if entry and status_code == self.API_NOT_MODIFIED_STATUS:
+      if self.__metrics:
+        self.__metrics.increment('discogs_not_modified_total')
+      self.__cache.revalidate(key)
+      return self.__decode(entry.content, fields)
+    response.raise_for_status()
+    if self.__cache:
+      self.__cache.put(
+          key,
+          response.content,
+          etag=response.headers.get('ETag'),
+          last_modified=response.headers.get('Last-Modified'))
+    return self.__decode(response.content, fields)
+
+  def __backoff(self, attempt, waited=0):
+    """Private method to wait before retrying a failed request.
 
     Args:
-      ratings (dict[str, Any], optional): Ratings. If provided this
-        ratings will be updated. Defaults to None.
+      attempt (int): Number of previous attempts (starting at 0).
+      waited (float, optional): Time, in seconds, already spent waiting
+        for the failed request slot. Defaults to 0.
+    """
+    delay = self.__limiter.backoff(attempt)
+    if self.__metrics:
+      self.__metrics.increment('discogs_retries_total')
+      self.__metrics.increment('discogs_sleep_seconds_total', waited + delay)
+    self.__limiter.wait(delay)
+
+  @staticmethod
+  def __decode(content, fields=None):
+    """Private method to decode a Discogs API response.
+
+    Args:
+      content (bytes): Response content.
+      fields (frozenset[str], optional): Fields to keep, at every level.
+        Defaults to None (all).
+
+    Returns:
+      dict[str, Any]: Discogs API data.
+    """
+    if fields is None:
+      return json.loads(content)
+    # Unwanted objects are dropped as soon as they are decoded.
+    return json.loads(
+        content,
+        object_pairs_hook=lambda pairs: {
+            key: value for key, value in pairs if key in fields})
+
+  @staticmethod
+  def __get_header(response, name):
+    """Private method to read a numeric header from a response.
+
+    Args:
+      response (requests.Response): Response.
+      name (str): Header name.
+
+    Returns:
+      int: Header value or None if missing or invalid.
+    """
+    try:
+      return int(response.headers[name])
+    except (KeyError, ValueError):
+      return None
+
+  def __is_not_found(self, error):
+    """Private method to check if a request failed for a missing
+    resource.
+
+    Args:
+      error (requests.HTTPError): Request error.
 
     Returns:
-      dict[str, Any]: Ratings.
+      bool: True if the resource was not found.
+    """
+    return error.response is not None and (
+        error.response.status_code == self.API_NOT_FOUND_STATUS)
+
+  def __get_page(self, url, page, params=None, fields=None):
+    """Private method to fetch one page of a paginated resource.
+
+    Args:
+      url (str): Resource URL.
+      page (int): Page number.
+      params (dict[str, Any], optional): Extra requests params.
+        Defaults to None.
+      fields (frozenset[str], optional): Fields to keep from the
+        response. Defaults to None (all).
+
+    Returns:
+      dict[str, Any]: Discogs API data.
     """
     if self.__logger:
-      self.__logger.info('Fetching ratings from Discogs.')
-    last_updated = int(time())
+      self.__logger.debug('Fetching page %d', page)
+    return self.__request(
+        url=url,
+        params={**(params or {}), 'page': page},
+        fields=fields)
+
+  def __get_releases(self, url, page, params=None):
+    """Private method to fetch one page of releases.
+
+    Args:
+      url (str): Resource URL.
+      page (int): Page number.
+      params (dict[str, Any], optional): Extra requests params.
+        Defaults to None.
+
+    Returns:
+      tuple[int, list[Release]]: Total number of pages and the releases
+        of the page.
+    """
+    content = self.__get_page(
+        url=url,
+        page=page,
+        params=params,
+        fields=self.API_RELEASE_FIELDS if self.__low_memory else None)
+    total_pages = int(content.get('pagination', {}).get('pages', 1))
+    return (
+        total_pages,
+        [self.__parse_release(release) for release in content['releases']])
+
+  def __get_checkpointed_releases(
+          self, url, folder, page, params=None, since=None):
+    """Private method to get the releases of a collection page, from the
+    run journal if checkpointed.
+
+    Args:
+      url (str): Resource URL.
+      folder (int): Folder ID.
+      page (int): Page number.
+      params (dict[str, Any], optional): Extra requests params.
+        Defaults to None.
+      since (int, optional): Oldest release timestamp, on incremental
+        fetches. Defaults to None.
+
+    Returns:
+      tuple[int, list[Release]]: Total number of pages and releases of
+        the page.
+    """
+    if self.__journal:
+      checkpoint = self.__journal.get_page(self.username, folder, page, since)
+      if checkpoint is not None:
+        if self.__metrics:
+          self.__metrics.increment('discogs_pages_resumed_total')
+        total_pages, releases = checkpoint
+        return total_pages, [Release(*release) for release in releases]
+    total_pages, releases = self.__get_releases(
+        url=url,
+        page=page,
+        params=params)
+    if self.__journal:
+      self.__journal.add_page(
+          self.username, folder, page, total_pages, releases, since=since)
+    return total_pages, releases
+
+  @staticmethod
+  def __parse_release(release):
+    """Private method to extract a compact record from a release.
+
+    Args:
+      release (dict[str, Any]): Discogs collection release.
+
+    Returns:
+      Release: Release record.
+    """
+    information = release['basic_information']
+    return Release(
+        id=release['id'],
+        instance_id=release.get('instance_id'),
+        artist=' - '.join(map(
+            lambda x: re.sub(r'\(\d+\)', '', x['name']).strip(),
+            information['artists'])).title(),
+        title=information['title'].title(),
+        rating=int(release['rating']),
+        added=Discogs.__get_timestamp(release['date_added']))
+
+  def __prefetch(self, function, items):
+    """Private method to apply a function concurrently to some items.
+
+    Unlike ThreadPoolExecutor.map(), only a few items are processed
+    ahead of the consumer, so the results do not pile up in memory.
+    Results are yielded in the items order.
+
+    Args:
+      function (Callable[[Any], Any]): Function to apply.
+      items (Iterable[Any]): Items.
+
+    Yields:
+      Any: Function results.
+    """
+    # pylint: disable-next=import-outside-toplevel
+    from concurrent.futures import ThreadPoolExecutor
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=self.__workers) as executor:
+      pending = deque(
+          executor.submit(function, item)
+          for item in islice(items, self.__workers * 2))
+      while pending:
+        result = pending.popleft().result()
+        for item in islice(items, 1):
+          pending.append(executor.submit(function, item))
+        yield result
+
+  def __iter_releases(self, folder=0):
+    """Private method to iterate over all the releases of a folder of
+    the user's collection.
+
+    Pages are fetched concurrently but the releases are yielded in the
+    collection order. Only a few pages are fetched ahead of the consumer
+    so that memory usage does not grow with the collection size.
+
+    Args:
+      folder (int, optional): Folder ID. Defaults to 0 (all).
+
+    Yields:
+      Release: Release record.
+    """
     collection_info = self.__request(
-        url=f'{self.__identity["resource_url"]}/collection/folders/0',
+        url=f'{self.__identity["resource_url"]}/collection/folders/{folder}',
         params={'page': 1})
     total_albums = int(collection_info.get('count', 0))
     total_pages = -(-total_albums // self.API_LIMIT)
-    if ratings:
-      ratings = ratings.get('ratings', {})
-    else:
-      ratings = {}
-    show_progress = True
+    show_progress = self.__progress
     if self.__logger and self.__logger.level < self.__logger.Level.INFO:
       show_progress = False
-    for step in Bar('Processing').iter(
-            range(total_pages)) if show_progress else range(total_pages):
-      page = step + 1
-      if self.__logger:
-        self.__logger.debug(f'Fetching page {page}')
-      content = self.__request(
-          f'{self.__identity["resource_url"]}/collection/folders/0/releases',
-          params={'page': page})
-      releases = content['releases']
+    url = (
+        f'{self.__identity["resource_url"]}/collection/folders/{folder}'
+        '/releases')
+    pages = self.__prefetch(
+        lambda page: self.__get_checkpointed_releases(url, folder, page)[1],
+        range(1, total_pages + 1))
+    if show_progress:
+      from progress.bar import Bar  # pylint: disable=import-outside-toplevel
+      pages = Bar('Processing', max=total_pages).iter(pages)
+    for releases in pages:
+      yield from releases
+
+  def __iter_releases_since(self, since, folder=0):
+    """Private method to iterate over the releases added to a folder of
+    the user's collection since a given time.
+
+    Releases are requested newest first and the paging stops as soon as
+    an older release is found.
+
+    Args:
+      since (int): Unix timestamp of the oldest release to yield.
+      folder (int, optional): Folder ID. Defaults to 0 (all).
+
+    Yields:
+      Release: Release record.
+    """
+    url = (
+        f'{self.__identity["resource_url"]}/collection/folders/{folder}'
+        '/releases')
+    params = {'sort': 'added', 'sort_order': 'desc'}
+    page = 1
+    total_pages = 1
+    while page <= total_pages:
+      total_pages, releases = self.__get_checkpointed_releases(
+          url,
+          folder,
+          page,
+          params=params,
+          since=since)
       for release in releases:
-        release_album_rating = int(release['rating'])
-        release_album = release['basic_information']['title'].title()
-        release_artist = ' - '.join(map(
-            lambda x: re.sub(r'\(\d+\)', '', x['name']).strip(),
-            release['basic_information']['artists'])).title()
-        if self.__logger:
-          self.__logger.debug(
-              f'{release_artist} - [{release_album_rating}] {release_album} ')
-        ratings.setdefault(release_artist, {})
-        ratings[release_artist].setdefault(release_album, {})
-        ratings[release_artist][release_album].setdefault(
-            'rating',
-            release_album_rating)
-    return {'last_updated': last_updated, 'ratings': ratings}
+        if release.added < since:
+          return
+        yield release
+      page += 1
+
+  @staticmethod
+  def __get_timestamp(date):
+    """Private method to convert a Discogs date to a Unix timestamp.
+
+    Args:
+      date (str): ISO 8601 date (e.g.: '2017-06-22T01:15:36-07:00').
+
+    Returns:
+      int: Unix timestamp.
+    """
+    # pylint: disable-next=import-outside-toplevel
+    from datetime import datetime
+    # strptime() only accepts offsets with a colon from Python 3.7 on.
+    date = re.sub(r'([+-]\d{2}):(\d{2})$', r'\1\2', date)
+    return int(datetime.strptime(date, '%Y-%m-%dT%H:%M:%S%z').timestamp())
+
+  def get_release_details(self, release_id):
+    """Fetch the details of a release: title, artists (with their name
+    variations), formats and tracklist.
+
+    Only the API_DETAILS_FIELDS are kept.
+
+    Args:
+      release_id (int): Discogs release ID.
+
+    Returns:
+      dict[str, Any]: Release details or None if not found.
+    """
+    if self.__logger:
+      self.__logger.debug('Fetching release %d details', release_id)
+    try:
+      details = self.__request(
+          url=f'{self.__base_url}/releases/{release_id}',
+          fields=self.API_DETAILS_FIELDS)
+    except self.__http_error as err:
+      if self.__is_not_found(err):
+        return None
+      raise
+    return details if 'tracklist' in details else None
+
+  def get_instance_folder(self, release_id, instance_id):
+    """Finds the collection folder of a release instance.
+
+    Args:
+      release_id (int): Discogs release ID.
+      instance_id (int): Collection instance ID.
+
+    Returns:
+      int: Folder ID or None if the instance is not on the collection.
+    """
+    try:
+      content = self.__request(
+          url=(
+              f'{self.__identity["resource_url"]}/collection/releases/'
+              f'{release_id}'))
+    except self.__http_error as err:
+      if self.__is_not_found(err):
+        return None
+      raise
+    for release in content.get('releases', ()):
+      if release.get('instance_id') == instance_id:
+        return release.get('folder_id')
+    return None
+
+  def set_rating(self, release_id, instance_id, rating, folder_id):
+    """Changes the rating of a release instance of the collection.
+
+    Args:
+      release_id (int): Discogs release ID.
+      instance_id (int): Collection instance ID.
+      rating (int): Rating, from 0 (not rated) to 5.
+      folder_id (int): Folder ID of the instance (see
+        get_instance_folder()).
+
+    Returns:
+      bool: True if changed or False if the change was rejected (e.g.:
+        the instance is no longer on the collection, see
+        API_REJECTED_STATUS).
+
+    Raises:
+      requests.HTTPError: On any other error (e.g.: invalid credentials
+        or server errors, after the retries).
+    """
+    if self.__logger:
+      self.__logger.debug(
+          'Setting the rating of release %d to %d', release_id, rating)
+    response = self.__send(
+        url=(
+            f'{self.__identity["resource_url"]}/collection/folders/'
+            f'{folder_id}/releases/{release_id}/instances/{instance_id}'),
+        params=self.__params,
+        headers=self.__headers,
+        method='POST',
+        payload={'rating': rating})
+    if response.status_code in self.API_REJECTED_STATUS:
+      return False
+    response.raise_for_status()
+    return True
+
+  def expire_collection(self):
+    """Forces the revalidation of the cached collection responses (e.g.:
+    after changing some ratings).
+
+    Only the responses requested by this client are expired.
+    """
+    if self.__cache and self.__collection_keys:
+      self.__cache.expire(self.__collection_keys)
+
+  def iter_release_details(self, release_ids):
+    """Iterates over the details of some releases, fetched concurrently
+    (see get_release_details()).
+
+    Args:
+      release_ids (Iterable[int]): Discogs release IDs.
+
+    Yields:
+      tuple[int, dict[str, Any]]: Release ID and details (None if not
+        found).
+    """
+    yield from self.__prefetch(
+        lambda release_id: (release_id, self.get_release_details(release_id)),
+        release_ids)
+
+  def iter_releases(self, since=None):
+    """Iterates over the releases of the user's collection folders.
+
+    Releases are fetched lazily, as they are consumed, one folder after
+    the other. A release found on several folders is yielded once per
+    folder.
+
+    Args:
+      since (int, optional): Unix timestamp of the oldest release to
+        yield. If provided, only the releases added since then are
+        fetched. Defaults to None (all).
+
+    Yields:
+      Release: Release record.
+    """
+    for folder in self.__folders:
+      if since is None:
+        yield from self.__iter_releases(folder)
+      else:
+        yield from self.__iter_releases_since(since, folder)
+
+  def fetch_ratings(self, state=None, incremental=False, full_interval=None):
+    """Fetch the Discogs ratings of the user's collection.
+
+    On incremental mode only the releases added since the last fetch
+    are requested. A full fetch is still done when there is no record
+    of a previous fetch or when the last full fetch is older than
+    `full_interval`, so that rating changes on older releases are also
+    picked up.
+
+    When a release is found more than once (on several folders), the
+    first one is kept.
+
+    Args:
+      state (dict[str, Any], optional): State of the previous fetch
+        ('last_added' and 'last_full' timestamps). Defaults to None.
+      incremental (bool, optional): Only fetch the newly added releases.
+        Defaults to False.
+      full_interval (int, optional): Maximum time, in seconds, between
+        full fetches on incremental mode. Defaults to None (never).
+
+    Returns:
+      tuple[dict[str, Any], dict[str, Any]]: Fetched records, by key
+        (see model.Model), and the state of this fetch.
+    """
+    if self.__logger:
+      self.__logger.info(
+          'Fetching ratings from Discogs (%s).', self.username or 'unknown')
+    last_updated = int(time())
+    state = state or {}
+    last_added = state.get('last_added')
+    last_full = state.get('last_full', 0)
+    full = not incremental or last_added is None or (
+        full_interval is not None and
+        last_updated - last_full >= full_interval)
+    if full:
+      last_full = last_updated
+    elif self.__logger:
+      self.__logger.info('Fetching only the recently added releases.')
+    fetched = {}
+    releases = 0
+    debug = None
+    if self.__logger and self.__logger.is_enabled(self.__logger.Level.DEBUG):
+      debug = self.__logger.debug
+    for release in self.iter_releases(since=None if full else last_added):
+      releases += 1
+      if debug:
+        debug(
+            '%s - [%s] %s ', release.artist, release.rating, release.title)
+      last_added = max(last_added or 0, release.added)
+      fetched.setdefault(Model.key(release.id), Model.record(release))
+    if self.__metrics:
+      self.__metrics.increment('discogs_releases_total', releases)
+    return fetched, {
+        'last_added': last_added,
+        'last_full': last_full,
+        'last_updated': last_updated}
+
+  def get_ratings(self, ratings=None, incremental=False, full_interval=None):
+    """Fetch Discogs ratings from the user's collection.
+
+    See fetch_ratings().
+
+    Args:
+      ratings (dict[str, Any], optional): Ratings. If provided this
+        ratings will be updated. Defaults to None.
+      incremental (bool, optional): Only fetch the newly added releases.
+        Defaults to False.
+      full_interval (int, optional): Maximum time, in seconds, between
+        full fetches on incremental mode. Defaults to None (never).
+
+    Returns:
+      dict[str, Any]: Ratings data (see model.Model), with the names
+        index as 'ratings'.
+    """
+    ratings = Model.upgrade(ratings or {})
+    fetched, state = self.fetch_ratings(
+        state=ratings,
+        incremental=incremental,
+        full_interval=full_interval)
+    releases = Model.merge(ratings['releases'], fetched)
+    return {
+        **state,
+        'version': Model.VERSION,
+        'releases': releases,
+        'ratings': Model.index(releases)}
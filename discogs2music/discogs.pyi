@@ -1,11 +1,41 @@
-from typing import Any, Final, Optional
+from typing import Any, Final, FrozenSet, Iterable, Iterator, NamedTuple, Optional
+from .cache import Cache
+from .journal import Journal
 from .logger import Logger
+from .metrics import Metrics
+from .ratelimit import RateLimiter
+from requests import Session
+
+class Release(NamedTuple):
+    id: int
+    instance_id: Optional[int]
+    artist: str
+    title: str
+    rating: int
+    added: int
 
 class Discogs:
     API_BASEURL: Final[str] = ...
+    API_DETAILS_FIELDS: Final[FrozenSet[str]] = ...
     API_FORMAT: Final[str] = ...
     API_LIMIT: Final[int] = ...
+    API_NOT_FOUND_STATUS: Final[int] = ...
+    API_NOT_MODIFIED_STATUS: Final[int] = ...
+    API_RATELIMIT_REQUESTS: Final[int] = ...
+    API_RELEASE_FIELDS: Final[FrozenSet[str]] = ...
     API_RATELIMIT_STATUS: Final[int] = ...
     API_RATELIMIT_TIME: Final[int] = ...
-    def __init__(self, key: str, logger: Optional[Logger] = ...) -> None: ...
-    def get_ratings(self, ratings: Optional[dict[str, Any]] = ...): ...
+    API_REJECTED_STATUS: Final[FrozenSet[int]] = ...
+    API_RETRIES: Final[int] = ...
+    API_WORKERS: Final[int] = ...
+    def __init__(self, key: str, logger: Optional[Logger] = ..., cache: Optional[Cache] = ..., workers: int = ..., limiter: Optional[RateLimiter] = ..., session: Optional[Session] = ..., low_memory: bool = ..., metrics: Optional[Metrics] = ..., folders: tuple[int, ...] = ..., progress: bool = ..., base_url: str = ..., journal: Optional[Journal] = ...) -> None: ...
+    @property
+    def username(self) -> str: ...
+    def expire_collection(self) -> None: ...
+    def fetch_ratings(self, state: Optional[dict[str, Any]] = ..., incremental: bool = ..., full_interval: Optional[int] = ...) -> tuple[dict[str, Any], dict[str, Any]]: ...
+    def get_ratings(self, ratings: Optional[dict[str, Any]] = ..., incremental: bool = ..., full_interval: Optional[int] = ...) -> dict[str, Any]: ...
+    def get_instance_folder(self, release_id: int, instance_id: int) -> Optional[int]: ...
+    def get_release_details(self, release_id: int) -> Optional[dict[str, Any]]: ...
+    def iter_release_details(self, release_ids: Iterable[int]) -> Iterator[tuple[int, Optional[dict[str, Any]]]]: ...
+    def iter_releases(self, since: Optional[int] = ...) -> Iterator[Release]: ...
+    def set_rating(self, release_id: int, instance_id: int, rating: int, folder_id: int) -> bool: ...
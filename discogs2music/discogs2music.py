@@ -21,9 +21,7 @@ All other classes in this module are considered implementation details.
 """
 
 from . import __author__, __license__, __version__
-from .data import Data
-from .discogs import Discogs
-from .music import Music
+from .metrics import Metrics
 from .options import Options
 from .logger import Logger
 
@@ -41,21 +39,33 @@ class Discogs2Music:
     """main method"""
     options = Options()
     logger = Logger(**({'level': Logger.Level.NONE} if options.quiet else {}),
-                    **({'level': Logger.Level.DEBUG} if options.debug else {}))
+                    **({'level': Logger.Level.DEBUG} if options.debug else {}),
+                    file=options.log_file,
+                    queued=True,
+                    sample=options.log_sample,
+                    rate=options.log_rate)
     if not options.quiet:
       print(self.__header)
-    data = Data(file=options.datafile, logger=logger)
-    ratings = data.load()
-    new_ratings = ratings
-    if not options.local:
-      discogs = Discogs(key=options.apikey, logger=logger)
-      new_ratings = discogs.get_ratings(ratings=ratings)
-    data.save(new_ratings)
-    music = Music(logger=logger)
-    music.set_ratings_from_discogs(
-        ratings=new_ratings['ratings'],
-        songs=options.songs,
-        override=options.override)
+    # Loaded after the options parsing, so that --help and --version do
+    # not pay for them.
+    from .sync import Sync  # pylint: disable=import-outside-toplevel
+    sync = Sync(options=options, logger=logger, metrics=Metrics())
+    try:
+      if options.daemon:
+        from .daemon import Daemon  # pylint: disable=import-outside-toplevel
+        Daemon(
+            sync=sync,
+            interval=options.daemon,
+            port=options.status_port,
+            logger=logger).run()
+      else:
+        sync.run()
+    finally:
+      if options.metrics:
+        logger.info('Writing metrics to "%s"', options.metrics)
+        sync.metrics.write(options.metrics)
+      sync.close()
+      logger.close()
 
 def main() -> None:
   d2m = Discogs2Music()
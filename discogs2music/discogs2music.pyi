@@ -1,8 +1,8 @@
-from .data import Data as Data
-from .discogs import Discogs as Discogs
+from .daemon import Daemon as Daemon
 from .logger import Logger as Logger
-from .music import Music as Music
+from .metrics import Metrics as Metrics
 from .options import Options as Options
+from .sync import Sync as Sync
 
 class Discogs2Music:
     def main(self) -> None: ...
@@ -0,0 +1,259 @@
+# -*- coding: UTF-8 -*-
+#
+# copyright: 2020-2022, Frederico Martins
+# author: Frederico Martins <http://github.com/fscm>
+# license: SPDX-License-Identifier: MIT
+
+"""Records exchange module.
+
+This module reads and writes release records (see model.Model) from and
+to flat files, so that they can be shared with other tools.
+
+The following is a simple usage example::
+  from .exchange import RecordsFile
+  RecordsFile('my_ratings.csv').write(data['releases'].values())
+  for record in RecordsFile('my_ratings.csv').read():
+    print(record)
+
+The module contains the following public classes:
+  - RecordsFile -- The main entry point. As the example above shows, the
+    RecordsFile() class can be used to read and write records files.
+
+All other classes in this module are considered implementation details.
+"""
+
+import csv
+import json
+import os
+import tempfile
+from itertools import islice
+from os import path
+from .model import Model
+
+
+class RecordsFile:
+  """Records file.
+
+  Records are read and written one chunk at a time, so that memory use
+  does not grow with the number of records. Writes go to a temporary
+  file that is renamed over the records file once complete.
+
+  Supported formats:
+    - 'csv' -- one record per row, with a header row;
+    - 'ndjson' -- one json record per line;
+    - 'parquet' -- Parquet file (requires the pyarrow module);
+    - 'arrow' -- Arrow IPC (Feather v2) file (requires the pyarrow
+      module).
+
+  Args:
+    file (str): Records file.
+    file_format (str, optional): Format, one of FORMATS. Defaults to
+      None (by the file extension, see EXTENSIONS).
+    chunk_size (int, optional): Number of records per chunk. Defaults to
+      CHUNK_SIZE.
+  """
+
+  CHUNK_SIZE = 10000
+  EXTENSIONS = {
+      '.arrow': 'arrow',
+      '.csv': 'csv',
+      '.feather': 'arrow',
+      '.jsonl': 'ndjson',
+      '.ndjson': 'ndjson',
+      '.parquet': 'parquet'}
+  FORMATS = ('arrow', 'csv', 'ndjson', 'parquet')
+  INTEGER_FIELDS = ('id', 'instance_id', 'rating', 'added', 'priority')
+
+  def __init__(self, file, file_format=None, chunk_size=CHUNK_SIZE):
+    if file_format is None:
+      file_format = self.EXTENSIONS.get(path.splitext(file)[1].lower())
+    if file_format not in self.FORMATS:
+      raise ValueError(f'unknown records file format: {file}')
+    self.__chunk_size = max(1, chunk_size)
+    self.__file = file
+    self.__format = file_format
+
+  @property
+  def file_format(self):
+    """str: records file format."""
+    return self.__format
+
+  def __arrow(self):
+    """Private method to load the pyarrow module.
+
+    Returns:
+      module: pyarrow module.
+    """
+    try:
+      # pyarrow is optional (and slow to import).
+      import pyarrow  # pylint: disable=import-outside-toplevel
+      # pylint: disable-next=import-outside-toplevel,unused-import
+      import pyarrow.parquet
+    except ImportError as err:
+      raise ValueError(
+          f'pyarrow module required for the {self.__format} format') from err
+    return pyarrow
+
+  def __chunks(self, records):
+    """Private method to split the records into chunks.
+
+    Args:
+      records (Iterable[dict[str, Any]]): Records.
+
+    Yields:
+      list[dict[str, Any]]: Chunk of records.
+    """
+    records = iter(records)
+    while True:
+      chunk = list(islice(records, self.__chunk_size))
+      if not chunk:
+        return
+      yield chunk
+
+  def __record(self, values):
+    """Private method to build a record from the values read.
+
+    Args:
+      values (dict[str, Any]): Values read.
+
+    Returns:
+      dict[str, Any]: Release record.
+    """
+    record = {}
+    for field in Model.FIELDS:
+      value = values.get(field)
+      if value == '':
+        value = None
+      if value is not None and field in self.INTEGER_FIELDS:
+        value = int(value)
+      record[field] = value
+    if None in (record['artist'], record['title'], record['rating']):
+      raise ValueError(f'invalid record: {values}')
+    return record
+
+  def __schema(self, pyarrow):
+    """Private method to build the Arrow schema of the records.
+
+    Args:
+      pyarrow (module): pyarrow module.
+
+    Returns:
+      pyarrow.Schema: Records schema.
+    """
+    return pyarrow.schema([
+        (field, pyarrow.int64() if field in self.INTEGER_FIELDS
+         else pyarrow.string())
+        for field in Model.FIELDS])
+
+  def read(self):
+    """Reads the records.
+
+    Yields:
+      dict[str, Any]: Release record.
+    """
+    if self.__format in ('csv', 'ndjson'):
+      with open(self.__file, 'r', encoding='utf-8', newline='') as in_file:
+        if self.__format == 'csv':
+          rows = csv.DictReader(in_file)
+        else:
+          rows = (json.loads(line) for line in in_file if line.strip())
+        for row in rows:
+          yield self.__record(row)
+      return
+    pyarrow = self.__arrow()
+    if self.__format == 'parquet':
+      batches = pyarrow.parquet.ParquetFile(self.__file).iter_batches(
+          batch_size=self.__chunk_size)
+    else:
+      reader = pyarrow.ipc.open_file(pyarrow.memory_map(self.__file))
+      batches = (
+          reader.get_batch(index)
+          for index in range(reader.num_record_batches))
+    for batch in batches:
+      for row in batch.to_pylist():
+        yield self.__record(row)
+
+  def __write_arrow(self, file, records):
+    """Private method to write the records to an Arrow or Parquet file.
+
+    Args:
+      file (str): File to write to.
+      records (Iterable[dict[str, Any]]): Records.
+
+    Returns:
+      int: Number of records written.
+    """
+    pyarrow = self.__arrow()
+    schema = self.__schema(pyarrow)
+    count = 0
+    if self.__format == 'parquet':
+      writer = pyarrow.parquet.ParquetWriter(file, schema)
+    else:
+      writer = pyarrow.ipc.new_file(file, schema)
+    try:
+      for chunk in self.__chunks(records):
+        writer.write_table(pyarrow.Table.from_pylist(
+            [{field: record.get(field) for field in Model.FIELDS}
+             for record in chunk],
+            schema=schema))
+        count += len(chunk)
+    finally:
+      writer.close()
+    return count
+
+  def __write_text(self, out_file, records):
+    """Private method to write the records to a csv or ndjson file.
+
+    Args:
+      out_file (TextIO): File to write to.
+      records (Iterable[dict[str, Any]]): Records.
+
+    Returns:
+      int: Number of records written.
+    """
+    count = 0
+    if self.__format == 'csv':
+      writer = csv.DictWriter(
+          out_file,
+          fieldnames=Model.FIELDS,
+          extrasaction='ignore')
+      writer.writeheader()
+    for chunk in self.__chunks(records):
+      if self.__format == 'csv':
+        writer.writerows(chunk)
+      else:
+        out_file.write(''.join(
+            json.dumps(
+                {field: record.get(field) for field in Model.FIELDS},
+                ensure_ascii=False) + '\n'
+            for record in chunk))
+      count += len(chunk)
+    return count
+
+  def write(self, records):
+    """Writes the records.
+
+    Args:
+      records (Iterable[dict[str, Any]]): Records.
+
+    Returns:
+      int: Number of records written.
+    """
+    descriptor, temp_file = tempfile.mkstemp(
+        dir=path.dirname(path.abspath(self.__file)),
+        prefix=f'.{path.basename(self.__file)}.',
+        suffix='.tmp')
+    try:
+      if self.__format in ('csv', 'ndjson'):
+        with os.fdopen(
+                descriptor, 'w', encoding='utf-8', newline='') as out_file:
+          count = self.__write_text(out_file, records)
+      else:
+        os.close(descriptor)
+        count = self.__write_arrow(temp_file, records)
+      os.chmod(temp_file, 0o644)
+      os.replace(temp_file, self.__file)
+    except BaseException:
+      os.remove(temp_file)
+      raise
+    return count
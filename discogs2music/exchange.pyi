@@ -0,0 +1,12 @@
+from typing import Any, Final, Iterable, Iterator, Optional
+
+class RecordsFile:
+    CHUNK_SIZE: Final[int] = ...
+    EXTENSIONS: Final[dict[str, str]] = ...
+    FORMATS: Final[tuple[str, ...]] = ...
+    INTEGER_FIELDS: Final[tuple[str, ...]] = ...
+    def __init__(self, file: str, file_format: Optional[str] = ..., chunk_size: int = ...) -> None: ...
+    @property
+    def file_format(self) -> str: ...
+    def read(self) -> Iterator[dict[str, Any]]: ...
+    def write(self, records: Iterable[dict[str, Any]]) -> int: ...
@@ -0,0 +1,256 @@
+# -*- coding: UTF-8 -*-
+#
+# copyright: 2020-2022, Frederico Martins
+# author: Frederico Martins <http://github.com/fscm>
+# license: SPDX-License-Identifier: MIT
+
+"""Run journal module.
+
+This module checkpoints the progress of a run (the Discogs pages fetched
+and the Music app ratings written), so that an interrupted run can be
+resumed instead of started over.
+
+The following is a simple usage example::
+  from .journal import Journal
+  j = Journal('my_journal.jsonl')
+  j.begin({'songs': False}, resume=True)
+  if j.get_page('user', 0, 1) is None:
+    j.add_page('user', 0, 1, 10, releases)
+  j.finish()
+
+The module contains the following public classes:
+  - Journal -- The main entry point. As the example above shows, the
+    Journal() class can be used to checkpoint a run.
+
+All other classes in this module are considered implementation details.
+"""
+
+import json
+import os
+from threading import Lock
+from time import monotonic, time
+
+
+class Journal:
+  """Run journal.
+
+  The journal is an append-only JSON lines file: a header with the run
+  context, then one entry per fetched page and per rating written. Each
+  entry is flushed as soon as it is added (it survives the process) and
+  synced to disk at most every SYNC_INTERVAL seconds, so that the hot
+  loops do not wait for the disk. An entry cut short by a crash is
+  ignored when resuming.
+
+  A run resumes the journal of the interrupted run only if both were
+  started with the same context. The journal is removed once the run
+  finishes.
+
+  Args:
+    file (str): Journal file.
+    logger (logger.Logger, optional): Logger to use. Defaults to None.
+  """
+
+  SYNC_INTERVAL = 1.0
+
+  def __init__(self, file, logger=None):
+    self.__file = file
+    self.__handle = None
+    self.__lock = Lock()
+    self.__logger = logger
+    self.__pages = {}
+    self.__synced = 0
+    self.__writes = {}
+
+  @property
+  def file(self):
+    """str: journal file."""
+    return self.__file
+
+  @staticmethod
+  def __page_key(account, folder, page, since=None):
+    """Private method to build the key of a page.
+
+    Args:
+      account (str): Discogs user name.
+      folder (int): Folder ID.
+      page (int): Page number.
+      since (int, optional): Oldest release timestamp, on incremental
+        fetches. Defaults to None.
+
+    Returns:
+      str: Page key.
+    """
+    return json.dumps([account, folder, page, since])
+
+  def __load(self, context):
+    """Private method to load the entries of the interrupted run.
+
+    Args:
+      context (dict[str, Any]): Context of this run.
+
+    Returns:
+      int: Size, in bytes, of the complete entries or None if the
+        interrupted run had another context.
+    """
+    # As read back from the journal (e.g.: tuples as lists).
+    context = json.loads(json.dumps(context))
+    size = 0
+    try:
+      with open(self.__file, 'rb') as in_file:
+        lines = iter(in_file)
+        line = next(lines, b'null')
+        header = json.loads(line)
+        if not header or header.get('context') != context:
+          return None
+        size += len(line)
+        for line in lines:
+          if not line.endswith(b'\n'):
+            break
+          entry = json.loads(line)
+          if entry['type'] == 'page':
+            self.__pages[entry['key']] = (entry['pages'], entry['releases'])
+          elif entry['type'] == 'write':
+            self.__writes[entry['key']] = entry['rating']
+          size += len(line)
+    except FileNotFoundError:
+      return None
+    except ValueError:
+      # An entry was cut short, only the previous ones are kept.
+      if not size:
+        return None
+    return size
+
+  def __append(self, entry):
+    """Private method to append an entry to the journal.
+
+    Args:
+      entry (dict[str, Any]): Journal entry.
+    """
+    line = json.dumps(entry, ensure_ascii=False, separators=(',', ':'))
+    with self.__lock:
+      if self.__handle is None:
+        return
+      self.__handle.write(line + '\n')
+      self.__handle.flush()
+      now = monotonic()
+      if now - self.__synced >= self.SYNC_INTERVAL:
+        os.fsync(self.__handle.fileno())
+        self.__synced = now
+
+  def add_page(self, account, folder, page, pages, releases, since=None):
+    """Checkpoints a fetched page.
+
+    Args:
+      account (str): Discogs user name.
+      folder (int): Folder ID.
+      page (int): Page number.
+      pages (int): Total number of pages.
+      releases (list[tuple]): Releases of the page (see
+        discogs.Release).
+      since (int, optional): Oldest release timestamp, on incremental
+        fetches. Defaults to None.
+    """
+    self.__append({
+        'type': 'page',
+        'key': self.__page_key(account, folder, page, since),
+        'pages': pages,
+        'releases': [list(release) for release in releases]})
+
+  def add_write(self, target, rating):
+    """Checkpoints a rating written to the Music app.
+
+    Args:
+      target (tuple[str, ...]): Written album or track (e.g.: the field
+        and the track persistent ID).
+      rating (int): Rating written.
+    """
+    key = json.dumps(list(target))
+    with self.__lock:
+      self.__writes[key] = rating
+    self.__append({'type': 'write', 'key': key, 'rating': rating})
+
+  def begin(self, context, resume=False):
+    """Starts the journal of a run.
+
+    Args:
+      context (dict[str, Any]): Run context (options that change what
+        is fetched or written).
+      resume (bool, optional): Resume the journal of the interrupted
+        run. Defaults to False.
+
+    Returns:
+      bool: True if an interrupted run was resumed.
+    """
+    self.close()
+    with self.__lock:
+      self.__pages = {}
+      self.__writes = {}
+    size = self.__load(context) if resume else None
+    resumed = size is not None
+    if resume and not resumed and self.__logger:
+      self.__logger.info('No run to resume, starting a new one.')
+    if not resume and os.path.exists(self.__file) and self.__logger:
+      self.__logger.info(
+          'Starting over an interrupted run (use --resume to continue it).')
+    if resumed and self.__logger:
+      self.__logger.info(
+          'Resuming the interrupted run (%d pages, %d ratings written).',
+          len(self.__pages),
+          len(self.__writes))
+    with self.__lock:
+      self.__handle = open(
+          self.__file, 'a' if resumed else 'w', encoding='utf-8')
+      if resumed:
+        # Drops the entry cut short, if any.
+        self.__handle.truncate(size)
+    if not resumed:
+      self.__append({'type': 'run', 'context': context, 'started': time()})
+    return resumed
+
+  def close(self):
+    """Closes the journal, keeping it to resume the run."""
+    with self.__lock:
+      if self.__handle:
+        self.__handle.close()
+        self.__handle = None
+
+  def finish(self):
+    """Removes the journal of a finished run."""
+    self.close()
+    with self.__lock:
+      self.__pages = {}
+      self.__writes = {}
+    try:
+      os.remove(self.__file)
+    except FileNotFoundError:
+      pass
+
+  def get_page(self, account, folder, page, since=None):
+    """Gets a checkpointed page.
+
+    Args:
+      account (str): Discogs user name.
+      folder (int): Folder ID.
+      page (int): Page number.
+      since (int, optional): Oldest release timestamp, on incremental
+        fetches. Defaults to None.
+
+    Returns:
+      tuple[int, list[list[Any]]]: Total number of pages and releases
+        of the page, or None if not checkpointed.
+    """
+    with self.__lock:
+      return self.__pages.get(self.__page_key(account, folder, page, since))
+
+  def written(self, target, rating):
+    """Checks if a rating was already written to the Music app.
+
+    Args:
+      target (tuple[str, ...]): Album or track (see add_write()).
+      rating (int): Rating.
+
+    Returns:
+      bool: True if written.
+    """
+    with self.__lock:
+      return self.__writes.get(json.dumps(list(target))) == rating
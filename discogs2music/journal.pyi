@@ -0,0 +1,15 @@
+from typing import Any, Final, Optional
+from .logger import Logger
+
+class Journal:
+    SYNC_INTERVAL: Final[float] = ...
+    def __init__(self, file: str, logger: Optional[Logger] = ...) -> None: ...
+    @property
+    def file(self) -> str: ...
+    def add_page(self, account: str, folder: int, page: int, pages: int, releases: list[tuple[Any, ...]], since: Optional[int] = ...) -> None: ...
+    def add_write(self, target: tuple[str, ...], rating: int) -> None: ...
+    def begin(self, context: dict[str, Any], resume: bool = ...) -> bool: ...
+    def close(self) -> None: ...
+    def finish(self) -> None: ...
+    def get_page(self, account: str, folder: int, page: int, since: Optional[int] = ...) -> Optional[tuple[int, list[list[Any]]]]: ...
+    def written(self, target: tuple[str, ...], rating: int) -> bool: ...
@@ -10,8 +10,10 @@ This module is based on the logging library.
 
 The following is a simple usage example::
   from .logger import Logger
-  l = Logger(level=Logger.Level.DEBUG)
+  l = Logger(level=Logger.Level.DEBUG, queued=True)
   l.info('my log entry')
+  l.debug('Track "%s" not found.', name)
+  l.close()
 
 The module contains the following public classes:
   - Logger -- The main entry point for logging. As the example above
@@ -20,10 +22,92 @@ The module contains the following public classes:
 All other classes in this module are considered implementation details.
 """
 
+import json
 import logging
+import sys
 #from enum import Enum, unique
 from enum import IntEnum, unique
-from sys import stdout
+from logging.handlers import QueueHandler, QueueListener
+from queue import Queue
+from threading import Lock
+from time import monotonic
+
+
+class _JsonFormatter(logging.Formatter):
+  """JSON lines log formatter."""
+
+  def format(self, record):
+    entry = {
+        'time': self.formatTime(record),
+        'level': record.levelname,
+        'message': record.getMessage()}
+    if record.exc_info:
+      entry['exception'] = self.formatException(record.exc_info)
+    return json.dumps(entry, ensure_ascii=False)
+
+
+class _QueueHandler(QueueHandler):
+  """Queue log handler that leaves the formatting to the listener."""
+
+  def prepare(self, record):
+    return record
+
+
+class _RepeatFilter(logging.Filter):
+  """Repeated log messages filter.
+
+  Messages below WARNING are grouped by their (unformatted) template.
+  The first messages of each template are always kept, after those only
+  one every `sample` and no more than `rate` per second.
+
+  Args:
+    burst (int): Messages always kept, per template.
+    sample (int, optional): Keep one every `sample` messages. Defaults
+      to 1 (all).
+    rate (float, optional): Maximum messages per second, per template.
+      Defaults to None (no limit).
+  """
+
+  def __init__(self, burst, sample=1, rate=None):
+    super().__init__()
+    self.__burst = burst
+    self.__buckets = {}
+    self.__counts = {}
+    self.__lock = Lock()
+    self.__rate = rate
+    self.__sample = max(sample or 1, 1)
+    self.suppressed = 0
+
+  def __take(self, key):
+    """Private method to take a token from the bucket of a template.
+
+    Args:
+      key (tuple[int, str]): Message level and template.
+
+    Returns:
+      bool: True if a token was available.
+    """
+    now = monotonic()
+    tokens, last = self.__buckets.get(key, (self.__burst, now))
+    tokens = min(self.__burst, tokens + (now - last) * self.__rate)
+    allowed = tokens >= 1
+    self.__buckets[key] = (tokens - 1 if allowed else tokens, now)
+    return allowed
+
+  def filter(self, record):
+    if record.levelno >= logging.WARNING:
+      return True
+    key = (record.levelno, record.msg)
+    with self.__lock:
+      count = self.__counts[key] = self.__counts.get(key, 0) + 1
+      allowed = (
+          count <= self.__burst
+          or (count - self.__burst) % self.__sample == 0)
+      if allowed and self.__rate:
+        allowed = self.__take(key)
+      if not allowed:
+        self.suppressed += 1
+    return allowed
 
 
 class Logger:
@@ -31,11 +115,30 @@ class Logger:
 
   This class uses the logging.Logger class to manage the logs.
 
+  Messages are formatted lazily: 'msg % args' is only built for the
+  messages of an enabled level (see is_enabled()) that are not filtered.
+  Messages can be written from a background thread (queued) so that the
+  caller does not wait for the console or the log file.
+
+  Repeated messages below WARNING (e.g.: per track messages with the
+  same template) can be sampled and rate limited. The number of messages
+  dropped is logged when the logger is closed.
+
   Args:
     level (Level, optional): Logging level. Defaults to Level.INFO.
-    file (str, optional): Log file. Defaults to None.
+    file (str, optional): Log file. Messages are written as JSON lines
+      if the file extension is one of JSON_EXTENSIONS. Defaults to None.
+    queued (bool, optional): Write the messages from a background
+      thread. Defaults to False.
+    sample (int, optional): Keep one every `sample` repeated messages.
+      Defaults to None (all).
+    rate (float, optional): Maximum repeated messages per second.
+      Defaults to None (no limit).
   """
 
+  BURST = 10
+  JSON_EXTENSIONS = ('.jsonl', '.ndjson')
+
   @unique
   #class Level(Enum):
   class Level(IntEnum):
@@ -51,15 +154,39 @@ class Logger:
     CRITICAL = logging.CRITICAL
     NONE = logging.NOTSET
 
-  def __init__(self, level=Level.INFO, file=None):
+  def __init__(
+      self, level=Level.INFO, file=None, queued=False, sample=None,
+      rate=None):
     self.__file = file
     self.__level = level
+    self.__listener = None
+    self.__filter = None
     self.__formatter = logging.Formatter('[%(levelname)-8s] %(message)s')
-    self.__console = logging.StreamHandler(self.__file or stdout)
+    self.__console = logging.StreamHandler(sys.stdout)
     self.__console.setFormatter(self.__formatter)
+    self.__handlers = [self.__console]
+    if self.__file:
+      handler = logging.FileHandler(self.__file, encoding='utf-8')
+      if self.__file.lower().endswith(self.JSON_EXTENSIONS):
+        handler.setFormatter(_JsonFormatter())
+      else:
+        handler.setFormatter(logging.Formatter(
+            '%(asctime)s [%(levelname)-8s] %(message)s'))
+      self.__handlers.append(handler)
     self.__logger = logging.getLogger(f'{__package__}')
     self.__logger.setLevel(self.__level.value)
-    self.__logger.addHandler(self.__console)
+    if (sample or 1) > 1 or rate:
+      self.__filter = _RepeatFilter(self.BURST, sample=sample, rate=rate)
+      self.__logger.addFilter(self.__filter)
+    if queued:
+      records = Queue()
+      self.__listener = QueueListener(
+          records, *self.__handlers, respect_handler_level=True)
+      self.__listener.start()
+      self.__logger.addHandler(_QueueHandler(records))
+    else:
+      for handler in self.__handlers:
+        self.__logger.addHandler(handler)
 
   @property
   def file(self):
@@ -71,42 +198,80 @@ class Logger:
     """Level: log level option."""
     return self.__level
 
-  def critical(self, msg):
+  @property
+  def suppressed(self):
+    """int: number of repeated messages dropped."""
+    return self.__filter.suppressed if self.__filter else 0
+
+  def close(self):
+    """Writes the pending messages and closes the log handlers."""
+    if self.__filter and self.__filter in self.__logger.filters:
+      if self.__filter.suppressed:
+        self.__logger.info(
+            '%d repeated log messages suppressed.', self.__filter.suppressed)
+      self.__logger.removeFilter(self.__filter)
+    if self.__listener:
+      self.__listener.stop()
+      self.__listener = None
+    for handler in list(self.__logger.handlers):
+      self.__logger.removeHandler(handler)
+    for handler in self.__handlers:
+      handler.close()
+
+  def is_enabled(self, level):
+    """Checks if the messages of a level are logged.
+
+    Use it to skip building expensive log arguments.
+
+    Args:
+      level (Level): Message level.
+
+    Returns:
+      bool: True if the messages of the level are logged.
+    """
+    return self.__logger.isEnabledFor(level)
+
+  def critical(self, msg, *args):
     """Logs a 'msg % args' message with level 'CRITICAL' on this logger.
 
     Args:
       msg (str): Log message.
+      *args (Any): Log message arguments.
     """
-    self.__logger.critical(msg)
+    self.__logger.critical(msg, *args)
 
-  def debug(self, msg):
+  def debug(self, msg, *args):
     """Logs a 'msg % args' message with level 'DEBUG' on this logger.
 
     Args:
       msg (str): Log message.
+      *args (Any): Log message arguments.
     """
-    self.__logger.debug(msg)
+    self.__logger.debug(msg, *args)
 
-  def error(self, msg):
+  def error(self, msg, *args):
     """Logs a 'msg % args' message with level 'ERROR' on this logger.
 
     Args:
       msg (str): Log message.
+      *args (Any): Log message arguments.
     """
-    self.__logger.error(msg)
+    self.__logger.error(msg, *args)
 
-  def info(self, msg):
+  def info(self, msg, *args):
     """Logs a 'msg % args' message with level 'INFO' on this logger.
 
     Args:
       msg (str): Log message.
+      *args (Any): Log message arguments.
     """
-    self.__logger.info(msg)
+    self.__logger.info(msg, *args)
 
-  def warning(self, msg):
+  def warning(self, msg, *args):
     """Logs a 'msg % args' message with level 'WARNING' on this logger.
 
     Args:
       msg (str): Log message.
+      *args (Any): Log message arguments.
     """
-    self.__logger.warning(msg)
+    self.__logger.warning(msg, *args)
@@ -1,7 +1,9 @@
 from enum import IntEnum
-from typing import Any, Optional
+from typing import Any, Final, Optional
 
 class Logger:
+    BURST: Final[int] = ...
+    JSON_EXTENSIONS: Final[tuple[str, ...]] = ...
     class Level(IntEnum):
         DEBUG: int = ...
         INFO: int = ...
@@ -9,13 +11,17 @@ class Logger:
         ERROR: int = ...
         CRITICAL: int = ...
         NONE: int = ...
-    def __init__(self, level: Level = ..., file: Optional[str] = ...) -> None: ...
+    def __init__(self, level: Level = ..., file: Optional[str] = ..., queued: bool = ..., sample: Optional[int] = ..., rate: Optional[float] = ...) -> None: ...
     @property
     def file(self) -> str: ...
     @property
     def level(self) -> Level: ...
-    def critical(self, msg: str) -> None: ...
-    def debug(self, msg: str) -> None: ...
-    def error(self, msg: str) -> None: ...
-    def info(self, msg: str) -> None: ...
-    def warning(self, msg: str) -> None: ...
+    @property
+    def suppressed(self) -> int: ...
+    def close(self) -> None: ...
+    def is_enabled(self, level: Level) -> bool: ...
+    def critical(self, msg: str, *args: Any) -> None: ...
+    def debug(self, msg: str, *args: Any) -> None: ...
+    def error(self, msg: str, *args: Any) -> None: ...
+    def info(self, msg: str, *args: Any) -> None: ...
+    def warning(self, msg: str, *args: Any) -> None: ...
@@ -0,0 +1,387 @@
+# -*- coding: UTF-8 -*-
+#
+# copyright: 2020-2022, Frederico Martins
+# author: Frederico Martins <http://github.com/fscm>
+# license: SPDX-License-Identifier: MIT
+
+"""Matching module.
+
+This module matches the Music app artists and albums with the Discogs
+ones.
+
+The following is a simple usage example::
+  from .matcher import Matcher
+  m = Matcher({'The Beatles': {'Abbey Road': {'rating': 5}}})
+  artist = m.find_artist('Beatles, The')
+  album = m.find_album(artist, 'Abbey Road (Remastered)')
+  print(album['rating'])
+
+The module contains the following public classes:
+  - Matcher -- The main entry point. As the example above shows, the
+    Matcher() class can be used to find the Discogs ratings of an
+    artist album.
+
+All other classes in this module are considered implementation details.
+"""
+
+import re
+import unicodedata
+
+
+class Matcher:
+  """Artist and album matcher.
+
+  This class builds a lookup index, keyed by normalized artist and album
+  names, from the Discogs ratings. Normalization folds the case and the
+  diacritics, drops punctuation, articles, Discogs artist numbering
+  (e.g.: 'Artist (2)') and edition suffixes (e.g.: '(Remastered)') and
+  sorts the names of multi-artist releases.
+
+  Names that are not found on the index can, optionally, be matched to
+  the most similar name (by trigram similarity).
+
+  When the details of the releases are given (see releases.Enricher),
+  artists are also found by their Discogs name variations, albums by the
+  titles of their tracks and tracks can be checked against the release
+  tracklist, by title or by position.
+
+  Args:
+    ratings (dict[str, Any]): Discogs ratings.
+    fuzzy (bool, optional): Enable the fuzzy matching fallback. Defaults
+      to False.
+    threshold (float, optional): Minimum similarity, between 0 and 1,
+      for a fuzzy match. Defaults to 0.75.
+    details (dict[str, Any], optional): Release details, by artist and
+      album (as the ratings). Defaults to None.
+  """
+
+  ARTICLES = ('a', 'an', 'the')
+  ARTISTS_SEPARATOR = re.compile(
+      r'\s+(?:-|&|\+|/|and|feat\.?|ft\.?|featuring|vs\.?)\s+',
+      re.IGNORECASE)
+  DISCOGS_NUMBER = re.compile(r'\s*\(\d+\)')
+  EDITION_WORDS = (
+      r'(?:remaster(?:ed)?|deluxe|edition|expanded|anniversary|bonus|'
+      r'reissue|mono|stereo|version|special)')
+  EDITION_BRACKETS = re.compile(
+      r'\s*[\(\[][^\)\]]*\b' + EDITION_WORDS + r'\b[^\)\]]*[\)\]]',
+      re.IGNORECASE)
+  EDITION_DASH = re.compile(
+      r'\s+-\s+[^-]*\b' + EDITION_WORDS + r'\b.*$',
+      re.IGNORECASE)
+
+  def __init__(self, ratings, fuzzy=False, threshold=0.75, details=None):
+    self.__albums = {}
+    self.__albums_cache = {}
+    self.__aliases = {}
+    self.__artists_cache = {}
+    self.__fuzzy = fuzzy
+    self.__threshold = threshold
+    self.__tracklists = {}
+    self.__tracks = {}
+    self.__trigrams = {}
+    for artist, albums in ratings.items():
+      artist_key = self.normalize_artist(artist)
+      artist_albums = self.__albums.setdefault(artist_key, {})
+      for album, values in albums.items():
+        artist_albums.setdefault(self.normalize_album(album), values)
+    for artist, albums in (details or {}).items():
+      artist_key = self.normalize_artist(artist)
+      if artist_key in self.__albums:
+        for album, release in albums.items():
+          self.__add_details(artist_key, self.normalize_album(album), release)
+    if fuzzy:
+      for artist_key in self.__albums:
+        for trigram in self.__get_trigrams(artist_key):
+          self.__trigrams.setdefault(trigram, []).append(artist_key)
+
+  @property
+  def enriched(self):
+    """bool: release details in use."""
+    return bool(self.__tracklists)
+
+  def __add_details(self, artist_key, album_key, release):
+    """Private method to index the details of a release.
+
+    Args:
+      artist_key (str): Normalized artist name.
+      album_key (str): Normalized album title.
+      release (dict[str, Any]): Release details.
+    """
+    for artist in release.get('artists', ()):
+      for name in (artist.get('name'), artist.get('anv')):
+        if name:
+          self.__aliases.setdefault(self.normalize_artist(name), artist_key)
+    titles = set()
+    for track in release.get('tracklist', ()):
+      # Headings and index tracks are not tracks.
+      if track.get('type_', 'track') != 'track':
+        continue
+      track_key = self.normalize_album(track.get('title', ''))
+      titles.add(track_key)
+      self.__tracks.setdefault(artist_key, {}).setdefault(
+          track_key, set()).add(album_key)
+    self.__tracklists[(artist_key, album_key)] = (titles, len(titles))
+
+  @classmethod
+  def __normalize_text(cls, text):
+    """Private method to fold the case, diacritics and punctuation of a
+    text.
+
+    Args:
+      text (str): Text to normalize.
+
+    Returns:
+      str: Normalized text.
+    """
+    text = ''.join(
+        char for char in unicodedata.normalize('NFKD', text)
+        if not unicodedata.combining(char))
+    text = re.sub(r'[^\w\s]', ' ', text.casefold())
+    return ' '.join(text.split())
+
+  @classmethod
+  def __drop_article(cls, text):
+    """Private method to drop the leading article from a name.
+
+    Args:
+      text (str): Name.
+
+    Returns:
+      str: Name without the article.
+    """
+    words = text.split(' ')
+    if len(words) > 1 and words[0] in cls.ARTICLES:
+      return ' '.join(words[1:])
+    return text
+
+  @classmethod
+  def normalize_artist(cls, artist):
+    """Normalizes an artist name.
+
+    Args:
+      artist (str): Artist name.
+
+    Returns:
+      str: Normalized artist name.
+    """
+    artist = cls.DISCOGS_NUMBER.sub('', artist)
+    names = []
+    for name in cls.ARTISTS_SEPARATOR.split(artist):
+      # 'Beatles, The' -> 'The Beatles'
+      name = re.sub(
+          r'^(.*),\s*(' + '|'.join(cls.ARTICLES) + r')$',
+          r'\2 \1',
+          name.strip(),
+          flags=re.IGNORECASE)
+      name = cls.__drop_article(cls.__normalize_text(name))
+      if name:
+        names.append(name)
+    return ' '.join(sorted(names)) or cls.__normalize_text(artist)
+
+  @classmethod
+  def normalize_album(cls, album):
+    """Normalizes an album title.
+
+    Args:
+      album (str): Album title.
+
+    Returns:
+      str: Normalized album title.
+    """
+    title = cls.EDITION_BRACKETS.sub('', album)
+    title = cls.EDITION_DASH.sub('', title)
+    return cls.__normalize_text(title) or cls.__normalize_text(album)
+
+  @staticmethod
+  def __get_trigrams(text):
+    """Private method to get the trigrams of a text.
+
+    Args:
+      text (str): Text.
+
+    Returns:
+      set[str]: Trigrams.
+    """
+    text = f'  {text} '
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+  def __similarity(self, trigrams, text):
+    """Private method to compute the similarity of two texts.
+
+    Args:
+      trigrams (set[str]): Trigrams of the first text.
+      text (str): Second text.
+
+    Returns:
+      float: Jaccard similarity of the trigrams of both texts.
+    """
+    other = self.__get_trigrams(text)
+    common = len(trigrams & other)
+    return common / (len(trigrams) + len(other) - common)
+
+  def __find_similar_artist(self, artist_key):
+    """Private method to find the most similar indexed artist.
+
+    Args:
+      artist_key (str): Normalized artist name.
+
+    Returns:
+      str: Normalized name of the most similar artist or None if none
+        is similar enough.
+    """
+    trigrams = self.__get_trigrams(artist_key)
+    candidates = {}
+    for trigram in trigrams:
+      for candidate in self.__trigrams.get(trigram, ()):
+        candidates[candidate] = candidates.get(candidate, 0) + 1
+    best, best_score = None, self.__threshold
+    for candidate, common in candidates.items():
+      score = common / (
+          len(trigrams) + len(self.__get_trigrams(candidate)) - common)
+      if score >= best_score:
+        best, best_score = candidate, score
+    return best
+
+  def __find_similar_album(self, artist_key, album_key):
+    """Private method to find the most similar album of an artist.
+
+    Args:
+      artist_key (str): Normalized artist name.
+      album_key (str): Normalized album title.
+
+    Returns:
+      str: Normalized title of the most similar album or None if none
+        is similar enough.
+    """
+    trigrams = self.__get_trigrams(album_key)
+    best, best_score = None, self.__threshold
+    for candidate in self.__albums[artist_key]:
+      score = self.__similarity(trigrams, candidate)
+      if score >= best_score:
+        best, best_score = candidate, score
+    return best
+
+  def find_artist(self, artist):
+    """Finds an artist on the Discogs ratings.
+
+    Args:
+      artist (str): Artist name.
+
+    Returns:
+      str: Key of the artist on the index or None if not found.
+    """
+    try:
+      return self.__artists_cache[artist]
+    except KeyError:
+      pass
+    artist_key = self.normalize_artist(artist)
+    if artist_key not in self.__albums:
+      artist_key = self.__aliases.get(artist_key) or (
+          self.__find_similar_artist(artist_key) if self.__fuzzy else None)
+    self.__artists_cache[artist] = artist_key
+    return artist_key
+
+  def find_album(self, artist_key, album):
+    """Finds an album of an artist on the Discogs ratings.
+
+    Args:
+      artist_key (str): Key of the artist, as returned by find_artist().
+      album (str): Album title.
+
+    Returns:
+      dict[str, Any]: Album ratings or None if not found.
+    """
+    album_key = self.find_album_key(artist_key, album)
+    if album_key is None:
+      return None
+    return self.__albums[artist_key][album_key]
+
+  def find_album_key_by_track(self, artist_key, name):
+    """Finds the key of the album of an artist that has a track.
+
+    Only used with the release details. The track has to be on a single
+    album of the artist.
+
+    Args:
+      artist_key (str): Key of the artist, as returned by find_artist().
+      name (str): Track title.
+
+    Returns:
+      str: Key of the album on the index or None if not found.
+    """
+    album_keys = self.__tracks.get(artist_key, {}).get(
+        self.normalize_album(name), ())
+    if len(album_keys) != 1:
+      return None
+    return next(iter(album_keys))
+
+  def find_album_key(self, artist_key, album):
+    """Finds the key of an album of an artist on the Discogs ratings.
+
+    Args:
+      artist_key (str): Key of the artist, as returned by find_artist().
+      album (str): Album title.
+
+    Returns:
+      str: Key of the album on the index or None if not found.
+    """
+    try:
+      return self.__albums_cache[(artist_key, album)]
+    except KeyError:
+      pass
+    album_key = self.normalize_album(album)
+    if album_key not in self.__albums[artist_key]:
+      album_key = (
+          self.__find_similar_album(artist_key, album_key)
+          if self.__fuzzy else None)
+    self.__albums_cache[(artist_key, album)] = album_key
+    return album_key
+
+  def find_track(self, artist_key, album_key, name, number=0):
+    """Checks if a track is on the tracklist of an album.
+
+    The track is found by its title or, when the title is not found, by
+    its position (the track number, counting only the tracks of the
+    tracklist, not its headings).
+
+    Args:
+      artist_key (str): Key of the artist, as returned by find_artist().
+      album_key (str): Key of the album, as returned by
+        find_album_key().
+      name (str): Track title.
+      number (int, optional): Track number. Defaults to 0 (unknown).
+
+    Returns:
+      bool: True if found, False if not or None if the tracklist of the
+        album is not known.
+    """
+    tracklist = self.__tracklists.get((artist_key, album_key))
+    if tracklist is None:
+      return None
+    titles, size = tracklist
+    return self.normalize_album(name) in titles or 0 < number <= size
+
+  def get_album(self, artist_key, album_key):
+    """Gets an album of an artist on the Discogs ratings.
+
+    Args:
+      artist_key (str): Key of the artist, as returned by find_artist().
+      album_key (str): Key of the album, as returned by
+        find_album_key().
+
+    Returns:
+      dict[str, Any]: Album ratings.
+    """
+    return self.__albums[artist_key][album_key]
+
+  def iter_albums(self):
+    """Iterates over the indexed albums.
+
+    Yields:
+      tuple[str, str, dict[str, Any]]: Artist key, album key and album
+        ratings.
+    """
+    for artist_key, albums in self.__albums.items():
+      for album_key, values in albums.items():
+        yield artist_key, album_key, values
@@ -0,0 +1,23 @@
+from typing import Any, Final, Iterator, Optional, Pattern
+
+class Matcher:
+    ARTICLES: Final[tuple[str, ...]] = ...
+    ARTISTS_SEPARATOR: Final[Pattern[str]] = ...
+    DISCOGS_NUMBER: Final[Pattern[str]] = ...
+    EDITION_WORDS: Final[str] = ...
+    EDITION_BRACKETS: Final[Pattern[str]] = ...
+    EDITION_DASH: Final[Pattern[str]] = ...
+    def __init__(self, ratings: dict[str, Any], fuzzy: bool = ..., threshold: float = ..., details: Optional[dict[str, Any]] = ...) -> None: ...
+    @property
+    def enriched(self) -> bool: ...
+    @classmethod
+    def normalize_artist(cls, artist: str) -> str: ...
+    @classmethod
+    def normalize_album(cls, album: str) -> str: ...
+    def find_artist(self, artist: str) -> Optional[str]: ...
+    def find_album(self, artist_key: str, album: str) -> Optional[dict[str, Any]]: ...
+    def find_album_key(self, artist_key: str, album: str) -> Optional[str]: ...
+    def find_album_key_by_track(self, artist_key: str, name: str) -> Optional[str]: ...
+    def find_track(self, artist_key: str, album_key: str, name: str, number: int = ...) -> Optional[bool]: ...
+    def get_album(self, artist_key: str, album_key: str) -> dict[str, Any]: ...
+    def iter_albums(self) -> Iterator[tuple[str, str, dict[str, Any]]]: ...
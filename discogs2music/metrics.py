@@ -0,0 +1,199 @@
+# -*- coding: UTF-8 -*-
+#
+# copyright: 2020-2022, Frederico Martins
+# author: Frederico Martins <http://github.com/fscm>
+# license: SPDX-License-Identifier: MIT
+
+"""Metrics module.
+
+This module records counters and histograms of a run (time spent,
+requests, calls, ...) and writes them to a file.
+
+The following is a simple usage example::
+  from .metrics import Metrics
+  m = Metrics()
+  with m.timer('fetch_seconds'):
+    m.increment('requests_total')
+  m.write('my_metrics.prom')
+
+The module contains the following public classes:
+  - Metrics -- The main entry point. As the example above shows, the
+    Metrics() class can be shared by several threads to record metrics.
+
+All other classes in this module are considered implementation details.
+"""
+
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from os import path
+from threading import Lock
+from time import perf_counter
+
+
+class Metrics:
+  """Run metrics.
+
+  Counters are sums of values (e.g.: requests sent). Histograms keep the
+  count, sum, minimum and maximum of the observed values (e.g.: request
+  latencies), and how many fall into each one of the buckets.
+
+  Metrics are written as a json summary or as a Prometheus text file
+  (for the node exporter textfile collector), with every metric name
+  prefixed by PREFIX.
+
+  Args:
+    buckets (tuple[float, ...], optional): Upper bounds of the histogram
+      buckets. Defaults to BUCKETS.
+    clock (Callable[[], float], optional): Clock used by the timers.
+      Defaults to time.perf_counter.
+  """
+
+  BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+  FORMATS = ('json', 'prometheus')
+  PREFIX = 'discogs2music_'
+
+  def __init__(self, buckets=BUCKETS, clock=perf_counter):
+    self.__buckets = tuple(sorted(buckets))
+    self.__clock = clock
+    self.__counters = {}
+    self.__histograms = {}
+    self.__lock = Lock()
+
+  @property
+  def counters(self):
+    """dict[str, float]: counters values."""
+    with self.__lock:
+      return dict(self.__counters)
+
+  def increment(self, name, value=1):
+    """Increments a counter.
+
+    Args:
+      name (str): Counter name.
+      value (float, optional): Increment. Defaults to 1.
+    """
+    with self.__lock:
+      self.__counters[name] = self.__counters.get(name, 0) + value
+
+  def observe(self, name, value):
+    """Adds a value to a histogram.
+
+    Args:
+      name (str): Histogram name.
+      value (float): Observed value.
+    """
+    with self.__lock:
+      histogram = self.__histograms.get(name)
+      if histogram is None:
+        histogram = self.__histograms[name] = {
+            'count': 0,
+            'sum': 0,
+            'min': value,
+            'max': value,
+            'buckets': [0] * len(self.__buckets)}
+      histogram['count'] += 1
+      histogram['sum'] += value
+      histogram['min'] = min(histogram['min'], value)
+      histogram['max'] = max(histogram['max'], value)
+      for index, bound in enumerate(self.__buckets):
+        if value <= bound:
+          histogram['buckets'][index] += 1
+          break
+
+  def summary(self):
+    """Summarizes the metrics.
+
+    Returns:
+      dict[str, Any]: Counters and histograms (without the buckets).
+    """
+    with self.__lock:
+      return {
+          'counters': dict(self.__counters),
+          'histograms': {
+              name: {
+                  key: value for key, value in histogram.items()
+                  if key != 'buckets'}
+              for name, histogram in self.__histograms.items()}}
+
+  @contextmanager
+  def timer(self, name):
+    """Times a block of code, adding its duration (in seconds) to a
+    histogram.
+
+    Args:
+      name (str): Histogram name.
+
+    Yields:
+      None
+    """
+    start = self.__clock()
+    try:
+      yield
+    finally:
+      self.observe(name, self.__clock() - start)
+
+  def __prometheus(self):
+    """Private method to format the metrics for Prometheus.
+
+    Returns:
+      str: Metrics in the Prometheus text format.
+    """
+    lines = []
+    with self.__lock:
+      for name, value in sorted(self.__counters.items()):
+        lines.append(f'# TYPE {self.PREFIX}{name} counter')
+        lines.append(f'{self.PREFIX}{name} {value}')
+      for name, histogram in sorted(self.__histograms.items()):
+        lines.append(f'# TYPE {self.PREFIX}{name} histogram')
+        count = 0
+        for bound, bucket in zip(self.__buckets, histogram['buckets']):
+          count += bucket
+          lines.append(f'{self.PREFIX}{name}_bucket{{le="{bound}"}} {count}')
+        lines.append(
+            f'{self.PREFIX}{name}_bucket{{le="+Inf"}} {histogram["count"]}')
+        lines.append(f'{self.PREFIX}{name}_sum {histogram["sum"]}')
+        lines.append(f'{self.PREFIX}{name}_count {histogram["count"]}')
+    return '\n'.join(lines) + '\n'
+
+  def render(self, file_format='json'):
+    """Formats the metrics.
+
+    Args:
+      file_format (str, optional): Format, one of FORMATS. Defaults to
+        'json'.
+
+    Returns:
+      str: Formatted metrics.
+    """
+    if file_format == 'prometheus':
+      return self.__prometheus()
+    return json.dumps(self.summary(), indent=2)
+
+  def write(self, file, file_format=None):
+    """Writes the metrics to a file.
+
+    The file is replaced at once, so that collectors never read a
+    partial file.
+
+    Args:
+      file (str): Metrics file.
+      file_format (str, optional): Format, one of FORMATS. Defaults to
+        None (prometheus for '.prom' files, json otherwise).
+    """
+    if file_format is None:
+      file_format = 'prometheus' if file.endswith('.prom') else 'json'
+    content = self.render(file_format)
+    descriptor, temp_file = tempfile.mkstemp(
+        dir=path.dirname(path.abspath(file)),
+        prefix=f'.{path.basename(file)}.',
+        suffix='.tmp')
+    try:
+      with os.fdopen(descriptor, 'w', encoding='utf-8') as out_file:
+        out_file.write(content)
+      os.chmod(temp_file, 0o644)
+      os.replace(temp_file, file)
+    except BaseException:
+      os.remove(temp_file)
+      raise
@@ -0,0 +1,15 @@
+from typing import Any, Callable, ContextManager, Final, Optional
+
+class Metrics:
+    BUCKETS: Final[tuple[float, ...]] = ...
+    FORMATS: Final[tuple[str, ...]] = ...
+    PREFIX: Final[str] = ...
+    def __init__(self, buckets: tuple[float, ...] = ..., clock: Callable[[], float] = ...) -> None: ...
+    @property
+    def counters(self) -> dict[str, float]: ...
+    def increment(self, name: str, value: float = ...) -> None: ...
+    def observe(self, name: str, value: float) -> None: ...
+    def summary(self) -> dict[str, Any]: ...
+    def timer(self, name: str) -> ContextManager[None]: ...
+    def render(self, file_format: str = ...) -> str: ...
+    def write(self, file: str, file_format: Optional[str] = ...) -> None: ...
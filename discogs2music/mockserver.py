@@ -0,0 +1,443 @@
+# -*- coding: UTF-8 -*-
+#
+# copyright: 2020-2022, Frederico Martins
+# author: Frederico Martins <http://github.com/fscm>
+# license: SPDX-License-Identifier: MIT
+
+"""Mock Discogs API module.
+
+This module serves a fake Discogs collection, on the loopback interface,
+so that the Discogs client can be run anywhere (no Discogs account or
+network required).
+
+The following is a simple usage example::
+  from .mockserver import MockDiscogs
+  ratings = {'Artist': {'Album': {'rating': 5}}}
+  with MockDiscogs.from_ratings(ratings) as m:
+    d = Discogs('any_token', base_url=m.url)
+    print(d.get_ratings())
+
+Or, from the command-line (then sync with the --api-url option set to
+http://127.0.0.1:8080)::
+  python3 -m discogs2music.mockserver --port 8080 --size 10000
+
+The module contains the following public classes:
+  - MockDiscogs -- The main entry point. As the example above shows, the
+    MockDiscogs() class can be used to serve a fake Discogs collection.
+
+All other classes in this module are considered implementation details.
+"""
+
+import argparse
+import json
+import re
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from time import monotonic, sleep
+from urllib.parse import parse_qs, urlsplit
+
+
+class _MockServer(ThreadingMixIn, HTTPServer):
+  """Mock HTTP server."""
+
+  daemon_threads = True
+
+
+class MockDiscogs:
+  """Mock Discogs API server.
+
+  Serves the part of the Discogs API used by the Discogs class:
+    - GET /oauth/identity;
+    - GET /users/{username}/collection/folders/{folder};
+    - GET /users/{username}/collection/folders/{folder}/releases;
+    - GET /users/{username}/collection/releases/{release};
+    - POST /users/{username}/collection/folders/{folder}/releases/
+      {release}/instances/{instance} (rating changes);
+    - GET /releases/{release}.
+
+  Requests are counted against a rate limit (over a moving window) that
+  is reported on the X-Discogs-Ratelimit headers. Requests over the
+  limit are answered with a 429 status. Every answer can be delayed, to
+  simulate the round trip to the Discogs API.
+
+  Args:
+    releases (list[dict[str, Any]]): Collection releases, with the 'id',
+      'instance_id', 'folder_id', 'artist', 'title', 'rating' and
+      'added' (Unix timestamp) keys.
+    username (str, optional): User name. Defaults to 'mock'.
+    limit (int, optional): Requests allowed per window. Defaults to 60.
+    window (float, optional): Window length, in seconds. Defaults to 60.
+    port (int, optional): Server port. Defaults to 0 (any free port).
+    latency (float, optional): Delay, in seconds, of every answer.
+      Defaults to 0.
+  """
+
+  HOST = '127.0.0.1'
+
+  def __init__(
+          self, releases, username='mock', limit=60, window=60, port=0,
+          latency=0.0):
+    self.__latency = latency
+    self.__limit = limit
+    self.__lock = threading.Lock()
+    self.__port = port
+    self.__releases = {release['instance_id']: dict(release)
+                       for release in releases}
+    self.__requests = 0
+    self.__sent = deque()
+    self.__server = None
+    self.__username = username
+    self.__window = window
+    self.__writes = []
+
+  def __enter__(self):
+    self.start()
+    return self
+
+  def __exit__(self, *args):
+    self.stop()
+
+  @classmethod
+  def from_ratings(cls, ratings, **kwargs):
+    """Builds a mock server from some ratings.
+
+    Every album is a release, on folder 1, added one day after the
+    previous one.
+
+    Args:
+      ratings (dict[str, Any]): Ratings, by artist and album (e.g.: as
+        generated by backends.SimulatorBackend.discogs_ratings()).
+      **kwargs (Any): MockDiscogs() arguments.
+
+    Returns:
+      MockDiscogs: Mock server.
+    """
+    releases = []
+    for artist, albums in ratings.items():
+      for title, values in albums.items():
+        index = len(releases) + 1
+        releases.append({
+            'id': index,
+            'instance_id': 1000000 + index,
+            'folder_id': 1,
+            'artist': artist,
+            'title': title,
+            'rating': values['rating'],
+            'added': 1500000000 + index * 86400})
+    return cls(releases, **kwargs)
+
+  @property
+  def ratings(self):
+    """dict[int, int]: current ratings, by release ID."""
+    with self.__lock:
+      return {release['id']: release['rating']
+              for release in self.__releases.values()}
+
+  @property
+  def requests(self):
+    """int: number of requests served."""
+    with self.__lock:
+      return self.__requests
+
+  @property
+  def url(self):
+    """str: server URL."""
+    return f'http://{self.HOST}:{self.__port}'
+
+  @property
+  def writes(self):
+    """list[tuple[int, int]]: rating changes (release ID and rating), in
+    the order they were made."""
+    with self.__lock:
+      return list(self.__writes)
+
+  @staticmethod
+  def __release(release):
+    """Private method to build the collection entry of a release.
+
+    Args:
+      release (dict[str, Any]): Release.
+
+    Returns:
+      dict[str, Any]: Collection entry.
+    """
+    return {
+        'id': release['id'],
+        'instance_id': release['instance_id'],
+        'folder_id': release['folder_id'],
+        'rating': release['rating'],
+        'date_added': datetime.fromtimestamp(
+            release['added'], timezone.utc).strftime(
+                '%Y-%m-%dT%H:%M:%S+00:00'),
+        'basic_information': {
+            'id': release['id'],
+            'title': release['title'],
+            'artists': [{'name': release['artist']}]}}
+
+  def __acquire(self):
+    """Private method to count a request against the rate limit.
+
+    Returns:
+      tuple[bool, int]: Whether the request is allowed and the number of
+        requests used on the window.
+    """
+    now = monotonic()
+    with self.__lock:
+      while self.__sent and self.__sent[0] <= now - self.__window:
+        self.__sent.popleft()
+      if len(self.__sent) >= self.__limit:
+        return False, len(self.__sent)
+      self.__sent.append(now)
+      self.__requests += 1
+      return True, len(self.__sent)
+
+  def __folder(self, folder):
+    """Private method to get the releases of a folder.
+
+    Args:
+      folder (int): Folder ID (0 for all).
+
+    Returns:
+      list[dict[str, Any]]: Releases, oldest first.
+    """
+    with self.__lock:
+      return sorted(
+          (dict(release) for release in self.__releases.values()
+           if folder in (0, release['folder_id'])),
+          key=lambda release: (release['added'], release['id']))
+
+  def __get(self, path, params):
+    """Private method to answer a GET request.
+
+    Args:
+      path (str): Request path.
+      params (dict[str, str]): Request params.
+
+    Returns:
+      tuple[int, dict[str, Any]]: Status and content.
+    """
+    user = f'/users/{self.__username}'
+    if path == '/oauth/identity':
+      return 200, {
+          'username': self.__username,
+          'resource_url': f'{self.url}{user}'}
+    match = re.fullmatch(user + r'/collection/folders/(\d+)', path)
+    if match:
+      folder = int(match.group(1))
+      return 200, {'id': folder, 'count': len(self.__folder(folder))}
+    match = re.fullmatch(user + r'/collection/folders/(\d+)/releases', path)
+    if match:
+      releases = self.__folder(int(match.group(1)))
+      if params.get('sort_order') == 'desc':
+        releases.reverse()
+      per_page = max(1, int(params.get('per_page', 50)))
+      page = max(1, int(params.get('page', 1)))
+      return 200, {
+          'pagination': {
+              'page': page,
+              'pages': -(-len(releases) // per_page),
+              'items': len(releases),
+              'per_page': per_page},
+          'releases': [
+              self.__release(release) for release in
+              releases[(page - 1) * per_page:page * per_page]]}
+    match = re.fullmatch(user + r'/collection/releases/(\d+)', path)
+    if match:
+      release_id = int(match.group(1))
+      return 200, {'releases': [
+          self.__release(release) for release in self.__folder(0)
+          if release['id'] == release_id]}
+    match = re.fullmatch(r'/releases/(\d+)', path)
+    if match:
+      release_id = int(match.group(1))
+      for release in self.__folder(0):
+        if release['id'] == release_id:
+          return 200, {
+              'id': release_id,
+              'title': release['title'],
+              'artists': [{'name': release['artist'], 'anv': ''}],
+              'formats': [],
+              'tracklist': []}
+    return 404, {'message': 'The requested resource was not found.'}
+
+  def __post(self, path, payload):
+    """Private method to answer a POST (rating change) request.
+
+    Args:
+      path (str): Request path.
+      payload (dict[str, Any]): Request body.
+
+    Returns:
+      tuple[int, dict[str, Any]]: Status and content.
+    """
+    match = re.fullmatch(
+        f'/users/{self.__username}'
+        r'/collection/folders/(\d+)/releases/(\d+)/instances/(\d+)',
+        path)
+    if not match:
+      return 404, {'message': 'The requested resource was not found.'}
+    folder, release_id, instance_id = map(int, match.groups())
+    rating = payload.get('rating')
+    if not isinstance(rating, int) or not 0 <= rating <= 5:
+      return 400, {'message': 'Rating must be an integer from 0 to 5.'}
+    with self.__lock:
+      release = self.__releases.get(instance_id)
+      if release is None or release['id'] != release_id or (
+          release['folder_id'] != folder):
+        return 404, {'message': 'The requested resource was not found.'}
+      release['rating'] = rating
+      self.__writes.append((release_id, rating))
+    return 204, None
+
+  def __listen(self):
+    """Private method to create the HTTP server."""
+    # The handler has no access to the private methods of this class.
+    acquire, get, post = self.__acquire, self.__get, self.__post
+    latency, limit = self.__latency, self.__limit
+
+    class Handler(BaseHTTPRequestHandler):
+      """Mock request handler."""
+
+      def __answer(self, method):
+        """Answers a request.
+
+        Args:
+          method (str): HTTP method.
+        """
+        url = urlsplit(self.path)
+        params = {key: values[-1]
+                  for key, values in parse_qs(url.query).items()}
+        allowed, used = acquire()
+        if not allowed:
+          status, content = 429, {'message': 'You are making requests too '
+                                             'quickly.'}
+        elif 'token' not in params:
+          status, content = 401, {'message': 'You must authenticate.'}
+        elif method == 'POST':
+          length = int(self.headers.get('Content-Length') or 0)
+          try:
+            payload = json.loads(self.rfile.read(length) or b'{}')
+          except ValueError:
+            payload = {}
+          status, content = post(url.path, payload)
+        else:
+          status, content = get(url.path, params)
+        body = b'' if content is None else json.dumps(content).encode('utf-8')
+        if latency:
+          sleep(latency)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('X-Discogs-Ratelimit', str(limit))
+        self.send_header('X-Discogs-Ratelimit-Used', str(used))
+        self.send_header(
+            'X-Discogs-Ratelimit-Remaining',
+            str(max(0, limit - used)))
+        self.end_headers()
+        self.wfile.write(body)
+
+      def do_GET(self):  # pylint: disable=invalid-name
+        """Answers a GET request."""
+        self.__answer('GET')
+
+      def do_POST(self):  # pylint: disable=invalid-name
+        """Answers a POST request."""
+        self.__answer('POST')
+
+      # pylint: disable-next=redefined-builtin
+      def log_message(self, format, *args):
+        """Does not log the requests."""
+
+    self.__server = _MockServer((self.HOST, self.__port), Handler)
+    self.__port = self.__server.server_address[1]
+
+  def add(self, release):
+    """Adds a release to the collection.
+
+    Args:
+      release (dict[str, Any]): Release (see MockDiscogs()).
+    """
+    with self.__lock:
+      self.__releases[release['instance_id']] = dict(release)
+
+  def run(self):
+    """Serves the requests until interrupted."""
+    self.__listen()
+    try:
+      self.__server.serve_forever()
+    finally:
+      self.__server.server_close()
+
+  def start(self):
+    """Starts serving the requests on a background thread."""
+    self.__listen()
+    threading.Thread(
+        target=self.__server.serve_forever,
+        name='mock-discogs',
+        daemon=True).start()
+
+  def stop(self):
+    """Stops serving the requests."""
+    if self.__server:
+      self.__server.shutdown()
+      self.__server.server_close()
+      self.__server = None
+
+
+def main():
+  """Runs the mock server from the command-line."""
+  # pylint: disable=import-outside-toplevel
+  from .backends import SimulatorBackend
+  parser = argparse.ArgumentParser(
+      prog=f'{__package__}.mockserver',
+      formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+  parser.add_argument(
+      '--port',
+      action='store',
+      default=8080,
+      type=int,
+      help='server port')
+  parser.add_argument(
+      '--size',
+      action='store',
+      default=10000,
+      type=int,
+      help='number of simulated library tracks (see the benchmark)')
+  parser.add_argument(
+      '--seed',
+      action='store',
+      default=0,
+      type=int,
+      help='random seed')
+  parser.add_argument(
+      '--coverage',
+      action='store',
+      default=0.8,
+      type=float,
+      help='share of the simulated albums on the collection')
+  parser.add_argument(
+      '--limit',
+      action='store',
+      default=60,
+      type=int,
+      help='requests allowed per minute')
+  options = parser.parse_args()
+  ratings = SimulatorBackend(
+      size=options.size,
+      seed=options.seed).discogs_ratings(coverage=options.coverage)
+  mock = MockDiscogs.from_ratings(
+      ratings,
+      limit=options.limit,
+      port=options.port)
+  print(f'Serving a mock Discogs API on {mock.url}/')
+  try:
+    mock.run()
+  except KeyboardInterrupt:
+    pass
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,23 @@
+from typing import Any, Final
+
+class MockDiscogs:
+    HOST: Final[str] = ...
+    def __init__(self, releases: list[dict[str, Any]], username: str = ..., limit: int = ..., window: float = ..., port: int = ..., latency: float = ...) -> None: ...
+    def __enter__(self) -> MockDiscogs: ...
+    def __exit__(self, *args: Any) -> None: ...
+    @classmethod
+    def from_ratings(cls, ratings: dict[str, Any], **kwargs: Any) -> MockDiscogs: ...
+    @property
+    def ratings(self) -> dict[int, int]: ...
+    @property
+    def requests(self) -> int: ...
+    @property
+    def url(self) -> str: ...
+    @property
+    def writes(self) -> list[tuple[int, int]]: ...
+    def add(self, release: dict[str, Any]) -> None: ...
+    def run(self) -> None: ...
+    def start(self) -> None: ...
+    def stop(self) -> None: ...
+
+def main() -> None: ...
@@ -0,0 +1,220 @@
+# -*- coding: UTF-8 -*-
+#
+# copyright: 2020-2022, Frederico Martins
+# author: Frederico Martins <http://github.com/fscm>
+# license: SPDX-License-Identifier: MIT
+
+"""Data model module.
+
+This module defines how the Discogs ratings are kept: one record per
+release, keyed by the release ID, with the artist and album names as a
+secondary index.
+
+The following is a simple usage example::
+  from .model import Model
+  ratings = {'Artist': {'Album': {'rating': 5}}}
+  data = Model.upgrade({'ratings': ratings})
+  index = Model.index(data['releases'])
+  print(index['Artist']['Album']['rating'])
+
+The module contains the following public classes:
+  - Model -- The main entry point. As the example above shows, the
+    Model class can be used to upgrade, merge and index the data.
+
+All other classes in this module are considered implementation details.
+"""
+
+
+class Model:
+  """Ratings data model.
+
+  The data is a dict with the following keys:
+    - 'version' -- VERSION;
+    - 'releases' -- records, by key (see key());
+    - the state of the fetches ('last_added', 'last_full', ...).
+
+  Each record has the release 'id' and 'instance_id', the 'artist' and
+  'title' names, the 'rating', the date it was 'added' and the
+  'priority' of the account it was fetched from (see
+  accounts.Accounts), when fetched from more than one. Records migrated
+  from the names keyed data (version 1) have no IDs until the release
+  is fetched again.
+
+  The names index ({artist: {album: {'rating': int}}}) is not stored,
+  it is rebuilt from the records when needed.
+
+  Conflicts between records, of the same release or with the same names,
+  are settled by a conflict policy (see prefer()), one of POLICIES.
+  """
+
+  FIELDS = (
+      'id', 'instance_id', 'artist', 'title', 'rating', 'added', 'priority')
+  LEGACY_PREFIX = 'name:'
+  POLICIES = ('priority', 'max', 'latest')
+  SEPARATOR = '\x1f'
+  VERSION = 3
+
+  @staticmethod
+  def key(release_id):
+    """Builds the key of a release record.
+
+    Args:
+      release_id (int): Discogs release ID.
+
+    Returns:
+      str: Record key.
+    """
+    return str(release_id)
+
+  @classmethod
+  def legacy_key(cls, artist, title):
+    """Builds the key of a record without release ID.
+
+    Args:
+      artist (str): Artist name.
+      title (str): Album title.
+
+    Returns:
+      str: Record key.
+    """
+    return f'{cls.LEGACY_PREFIX}{artist}{cls.SEPARATOR}{title}'
+
+  @classmethod
+  def record_key(cls, record):
+    """Builds the key of a record.
+
+    Args:
+      record (dict[str, Any]): Release record.
+
+    Returns:
+      str: Record key (see key() and legacy_key()).
+    """
+    if record.get('id') is None:
+      return cls.legacy_key(record['artist'], record['title'])
+    return cls.key(record['id'])
+
+  @staticmethod
+  def record(release, priority=None):
+    """Builds the record of a release.
+
+    Args:
+      release (discogs.Release): Release.
+      priority (int, optional): Priority of the account the release was
+        fetched from. Defaults to None.
+
+    Returns:
+      dict[str, Any]: Release record.
+    """
+    return {
+        'id': release.id,
+        'instance_id': release.instance_id,
+        'artist': release.artist,
+        'title': release.title,
+        'rating': release.rating,
+        'added': release.added,
+        'priority': priority}
+
+  @staticmethod
+  def prefer(record, current, policy='priority'):
+    """Settles a conflict between two records by a conflict policy:
+      - 'priority' -- the record of the account with the highest
+        priority (the lowest value, records without one come last);
+      - 'max' -- the record with the highest rating;
+      - 'latest' -- the record of the most recently added release.
+
+    Ties are settled in favour of the current record.
+
+    Args:
+      record (dict[str, Any]): Release record.
+      current (dict[str, Any]): Release record it conflicts with.
+      policy (str, optional): Conflict policy, one of POLICIES. Defaults
+        to 'priority'.
+
+    Returns:
+      bool: True if the record is preferred over the current one.
+    """
+    if policy == 'max':
+      return record['rating'] > current['rating']
+    if policy == 'latest':
+      return (record['added'] or 0) > (current['added'] or 0)
+    if record['priority'] is None:
+      return False
+    return current['priority'] is None or (
+        record['priority'] < current['priority'])
+
+  @classmethod
+  def index(cls, releases, policy='priority'):
+    """Builds the names index of the records.
+
+    When more than one release has the same artist and album names, the
+    one to index is chosen by the conflict policy (see prefer()).
+
+    Args:
+      releases (dict[str, dict[str, Any]]): Records.
+      policy (str, optional): Conflict policy, one of POLICIES. Defaults
+        to 'priority'.
+
+    Returns:
+      dict[str, dict[str, dict[str, int]]]: Ratings by artist and album.
+    """
+    chosen = {}
+    for record in releases.values():
+      names = (record['artist'], record['title'])
+      current = chosen.get(names)
+      if current is None or cls.prefer(record, current, policy):
+        chosen[names] = record
+    index = {}
+    for (artist, title), record in chosen.items():
+      index.setdefault(artist, {})[title] = {'rating': record['rating']}
+    return index
+
+  @classmethod
+  def merge(cls, releases, fetched):
+    """Merges fetched records into the records.
+
+    Fetched records replace the stored ones with the same key and the
+    migrated records with the same names.
+
+    Args:
+      releases (dict[str, dict[str, Any]]): Records (updated).
+      fetched (dict[str, dict[str, Any]]): Fetched records.
+
+    Returns:
+      dict[str, dict[str, Any]]: Records.
+    """
+    for key, record in fetched.items():
+      releases.pop(cls.legacy_key(record['artist'], record['title']), None)
+      releases[key] = record
+    return releases
+
+  @classmethod
+  def upgrade(cls, data):
+    """Upgrades the data to the current version.
+
+    Names keyed data ({'last_updated', 'ratings'}) is converted to one
+    record per artist and album. Records of older versions get no
+    account priority.
+
+    Args:
+      data (dict[str, Any]): Data (updated).
+
+    Returns:
+      dict[str, Any]: Data.
+    """
+    if data.get('version') == cls.VERSION:
+      return data
+    releases = data.setdefault('releases', {})
+    for artist, albums in (data.pop('ratings', None) or {}).items():
+      for title, values in albums.items():
+        releases.setdefault(cls.legacy_key(artist, title), {
+            'id': None,
+            'instance_id': None,
+            'artist': artist,
+            'title': title,
+            'rating': values['rating'],
+            'added': None,
+            'priority': None})
+    for record in releases.values():
+      record.setdefault('priority', None)
+    data['version'] = cls.VERSION
+    return data
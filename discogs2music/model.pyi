@@ -0,0 +1,25 @@
+from typing import Any, Final, Optional
+from .discogs import Release
+
+class Model:
+    FIELDS: Final[tuple[str, ...]] = ...
+    LEGACY_PREFIX: Final[str] = ...
+    POLICIES: Final[tuple[str, ...]] = ...
+    SEPARATOR: Final[str] = ...
+    VERSION: Final[int] = ...
+    @staticmethod
+    def key(release_id: int) -> str: ...
+    @classmethod
+    def legacy_key(cls, artist: str, title: str) -> str: ...
+    @classmethod
+    def record_key(cls, record: dict[str, Any]) -> str: ...
+    @staticmethod
+    def record(release: Release, priority: Optional[int] = ...) -> dict[str, Any]: ...
+    @staticmethod
+    def prefer(record: dict[str, Any], current: dict[str, Any], policy: str = ...) -> bool: ...
+    @classmethod
+    def index(cls, releases: dict[str, dict[str, Any]], policy: str = ...) -> dict[str, dict[str, dict[str, int]]]: ...
+    @classmethod
+    def merge(cls, releases: dict[str, dict[str, Any]], fetched: dict[str, dict[str, Any]]) -> dict[str, dict[str, Any]]: ...
+    @classmethod
+    def upgrade(cls, data: dict[str, Any]) -> dict[str, Any]: ...
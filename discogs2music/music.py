@@ -11,18 +11,22 @@ This module handles the Music app metadata.
 The following is a simple usage example::
   from .music import Music
   m = Music()
-  #r = discogs.get_ratings()
+  m.set_ratings_from_discogs({'Artist': {'Album': {'rating': 5}}})
 
 The module contains the following public classes:
-  - ITunes -- The main entry point. As the example above shows, the
-    ITunes() class can be used to change metadata on the Music app.
+  - Music -- The main entry point. As the example above shows, the
+    Music() class can be used to change metadata on the Music app.
 
 All other classes in this module are considered implementation details.
 """
 
-from functools import reduce
-from progress.bar import Bar
-from appscript import app
+from collections import Counter
+from time import perf_counter
+from .backends import AppscriptBackend
+from .matcher import Matcher
+from .planner import Plan
+from .profiler import Profiler
+from .stats import Stats
 
 
 class Music:
@@ -30,139 +34,378 @@ class Music:
 
   This class manages the Music app metadata.
 
+  The library is read in bulk, one call per track property, and then
+  processed locally. Rating updates are planned first and then written
+  once per album whenever possible. With a snapshot of the previous run,
+  the tracks that did not change since then are skipped.
+
   Args:
     logger (logger.Logger, optional): Logger to use.  Defaults to None.
+    backend (backends.MusicBackend, optional): Library backend to use.
+      Defaults to the Music app (backends.AppscriptBackend).
+    metrics (metrics.Metrics, optional): Metrics to record the library
+      reads, writes and matches to. Defaults to None.
+    profiler (profiler.Profiler, optional): Profiler of the read, match
+      and write phases. Defaults to None (not profiled).
   """
 
   CONVERTION_RATIO = 20
 
-  def __init__(self, logger=None):
+  def __init__(self, logger=None, backend=None, metrics=None, profiler=None):
     self.__logger = logger
-    self.__app = app('Music')
-    self.__library = self.__app.library_playlists['Library']
-    self.__tracks = self.__library.tracks()
+    self.__metrics = metrics
+    self.__profiler = profiler or Profiler()
+    self.__backend = backend or AppscriptBackend()
+    start = perf_counter()
+    with self.__profiler.phase('read'):
+      self.__tracks = self.__backend.get_tracks()
+    if self.__metrics:
+      self.__metrics.observe('music_read_seconds', perf_counter() - start)
+
+  def __apply(self, plan, songs=False, journal=None):
+    """Private method to apply the planned rating updates.
+
+    Albums with all of their tracks to be updated to the same rating are
+    updated with a single write. The tracks of the other albums are
+    updated one by one. The Music app matches the album of a single
+    write ignoring the case, so the tracks of an album are counted
+    ignoring the case too (albums with names that differ only in case
+    are updated one track at a time).
+    With a run journal, every write is checkpointed and the writes
+    already done by the interrupted run are skipped.
+
+    Args:
+      plan (planner.Plan): Rating changes.
+      songs (bool): Update songs rating instead of album rating.
+        Defaults to False.
+      journal (journal.Journal, optional): Run journal. Defaults to
+        None.
+
+    Returns:
+      int: Number of writes.
+    """
+    album_tracks = Counter(
+        (track.artist.casefold(), track.album.casefold())
+        for track in self.__tracks)
+    field = 'rating' if songs else 'album_rating'
+    writes = 0
+    resumed = 0
+    for (artist, album, rating), update in plan.albums.items():
+      if len(update['refs']) == album_tracks[
+          (artist.casefold(), album.casefold())]:
+        target = ('album', field, artist, album)
+        if journal and journal.written(target, rating):
+          resumed += 1
+          continue
+        if self.__logger:
+          self.__logger.debug('Writing album "%s" ratings.', album)
+        self.__write(
+            self.__backend.set_rating_for if songs
+            else self.__backend.set_album_rating_for,
+            artist, album, rating)
+        if journal:
+          journal.add_write(target, rating)
+        writes += 1
+        continue
+      for ref, persistent_id in zip(update['refs'], update['ids']):
+        target = ('track', field, persistent_id)
+        if journal and journal.written(target, rating):
+          resumed += 1
+          continue
+        self.__write(
+            self.__backend.set_rating if songs
+            else self.__backend.set_album_rating,
+            ref, rating)
+        if journal:
+          journal.add_write(target, rating)
+        writes += 1
+    if resumed:
+      if self.__metrics:
+        self.__metrics.increment('music_writes_resumed_total', resumed)
+      if self.__logger:
+        self.__logger.info(
+            '%d writes skipped, done by the interrupted run.', resumed)
+    return writes
+
+  def __count(self, stats, plan, writes, songs=False):
+    """Private method to record and log the counts of an update.
+
+    Args:
+      stats (stats.Stats): Track events.
+      plan (planner.Plan): Rating changes.
+      writes (int): Number of writes.
+      songs (bool): Songs rating were updated instead of album rating.
+        Defaults to False.
+    """
+    if self.__metrics:
+      for name, value in stats.summary(songs=songs).items():
+        self.__metrics.increment(f'music_{name}_total', value)
+      self.__metrics.increment('music_calls_total', self.__backend.calls)
+      self.__metrics.increment('music_writes_total', writes)
+    if self.__logger and self.__logger.level > self.__logger.Level.NONE:
+      summary = stats.summary(songs=songs)
+      for event, samples in stats.samples.items():
+        for artist, album, name in samples:
+          self.__logger.debug(
+              'Sample %s: %s - %s - %s', event.value, artist, album, name)
+      self.__logger.info(
+          'Stats:\n'
+          '  %d band misses\n'
+          '  %d album misses\n'
+          '  %d albums updated\n'
+          '  %d albums not updated\n'
+          '  %d song misses\n'
+          '  %d songs not on the release\n'
+          '  %d songs updated\n'
+          '  %d songs not updated\n'
+          '  %d songs unchanged since the last run\n'
+          '  %d songs with planned changes\n'
+          '  %d Music app calls\n'
+          '  %d Music app writes\n',
+          summary['artists_miss'],
+          summary['albums_miss'],
+          summary['albums_updated'],
+          summary['albums_not_updated'],
+          summary['songs_miss'],
+          summary['songs_not_on_release'],
+          summary['songs_updated'],
+          summary['songs_not_updated'],
+          summary['songs_unchanged'],
+          len(plan),
+          self.__backend.calls,
+          writes)
+
+  @staticmethod
+  def __find(track, matcher, songs=False, debug=None):
+    """Private method to find the Discogs album of a track.
+
+    Args:
+      track (backends.Track): Track.
+      matcher (matcher.Matcher): Matching index of the ratings.
+      songs (bool): Also look for the song on the release tracklist.
+        Defaults to False.
+      debug (Callable[..., None], optional): Debug messages logger.
+        Defaults to None.
+
+    Returns:
+      tuple[str, str, stats.Stats.Event]: Artist and album keys, and
+        the miss event (None if found). The keys are None when not
+        found.
+    """
+    track_artist = track.artist.title()
+    track_album = track.album.title()
+    track_name = track.name.title()
+    artist_key = matcher.find_artist(track_artist)
+    if artist_key is None:
+      if debug:
+        debug('Artist "%s" not found on Discogs ratings.', track_artist)
+      return None, None, Stats.Event.ARTIST_MISS
+    album_key = matcher.find_album_key(artist_key, track_album)
+    if album_key is None and matcher.enriched:
+      album_key = matcher.find_album_key_by_track(artist_key, track_name)
+    if album_key is None:
+      if debug:
+        debug('Album "%s" not found on Discogs ratings.', track_album)
+      return artist_key, None, Stats.Event.ALBUM_MISS
+    if songs and matcher.find_track(
+            artist_key, album_key, track_name,
+            int(track.track_number or 0)) is False:
+      if debug:
+        debug('Song "%s" not found on the Discogs tracklist.', track_name)
+      return artist_key, album_key, Stats.Event.TRACK_MISS
+    return artist_key, album_key, None
+
+  def __plan(self, matcher, stats, songs=False, override=False,
+             snapshot=None):
+    """Private method to plan the rating updates of the library tracks.
+
+    Args:
+      matcher (matcher.Matcher): Matching index of the ratings.
+      stats (stats.Stats): Track events, to add to.
+      songs (bool): Update songs rating instead of album rating.
+        Defaults to False.
+      override (bool): Override existing ratings. Defaults to False.
+      snapshot (planner.Snapshot, optional): Snapshot of the previous
+        run, to skip the unchanged tracks and to record the tracks to.
+        Defaults to None.
+
+    Returns:
+      planner.Plan: Planned rating changes.
+    """
+    plan = Plan()
+    field = 'rating' if songs else 'album_rating'
+    debug = None
+    if self.__logger and self.__logger.is_enabled(self.__logger.Level.DEBUG):
+      debug = self.__logger.debug
+    for track in self.__progress():
+      if snapshot and snapshot.unchanged(track):
+        stats.add(Stats.Event.UNCHANGED, track)
+        continue
+      artist_key, album_key, miss = self.__find(
+          track, matcher, songs=songs, debug=debug)
+      if miss:
+        stats.add(miss, track)
+        if snapshot:
+          snapshot.record(
+              track,
+              album_key=None if album_key is None
+              else snapshot.key(artist_key, album_key))
+        continue
+      rating = matcher.get_album(artist_key, album_key)['rating'] * (
+          self.CONVERTION_RATIO)
+      updated = self.__updated(
+          track, rating, songs=songs, override=override, debug=debug)
+      if updated:
+        plan.add(track, field, rating)
+        stats.add(Stats.Event.UPDATED, track)
+      else:
+        stats.add(Stats.Event.NOT_UPDATED, track)
+      if snapshot:
+        snapshot.record(
+            track,
+            album_key=snapshot.key(artist_key, album_key),
+            **({field: rating} if updated else {}))
+    return plan
 
-  def set_ratings_from_discogs(self, ratings, songs=False, override=False):
+  def __progress(self):
+    """Private method to iterate over the library tracks, with a
+    progress bar unless the logger is more verbose than INFO.
+
+    Returns:
+      Iterable[backends.Track]: Library tracks.
+    """
+    if self.__logger and self.__logger.level < self.__logger.Level.INFO:
+      return self.__tracks
+    from progress.bar import Bar  # pylint: disable=import-outside-toplevel
+    return Bar('Processing').iter(self.__tracks)
+
+  @staticmethod
+  def __updated(track, rating, songs=False, override=False, debug=None):
+    """Private method to check if a track rating is to be updated.
+
+    Args:
+      track (backends.Track): Track.
+      rating (int): Discogs rating, on the Music app scale.
+      songs (bool): Check the song rating instead of the album rating.
+        Defaults to False.
+      override (bool): Override existing ratings. Defaults to False.
+      debug (Callable[..., None], optional): Debug messages logger.
+        Defaults to None.
+
+    Returns:
+      bool: True if the rating is to be updated.
+    """
+    if songs:
+      current = int(track.rating)
+      if (current == 0 or override) and current != rating:
+        if debug:
+          debug('Updating song "%s".', track.name.title())
+        return True
+      if debug:
+        debug('Song "%s" not updated.', track.name.title())
+      return False
+    current = int(track.album_rating)
+    if (current == 0 or override) and current != rating:
+      if debug:
+        debug('Updating album "%s".', track.album.title())
+      return True
+    if debug:
+      debug('Album "%s" not updated.', track.album.title())
+    return False
+
+  def __write(self, function, *args):
+    """Private method to send a write to the library.
+
+    Args:
+      function (Callable[..., None]): Backend write method.
+      *args (Any): Write arguments.
+    """
+    start = perf_counter()
+    function(*args)
+    if self.__metrics:
+      self.__metrics.observe('music_write_seconds', perf_counter() - start)
+
+  def get_album_ratings(self, songs=False):
+    """Gets the Music app album ratings, on the Discogs scale.
+
+    Args:
+      songs (bool, optional): Use the mean of the rated songs of each
+        album instead of the album rating. Defaults to False.
+
+    Returns:
+      dict[tuple[str, str], int]: Ratings, from 1 to 5, by artist and
+        album. Albums without rating are left out.
+    """
+    totals = {}
+    for track in self.__tracks:
+      rating = int(track.rating if songs else track.album_rating)
+      if rating > 0:
+        total = totals.setdefault((track.artist, track.album), [0, 0])
+        total[0] += rating
+        total[1] += 1
+    ratings = {}
+    for album, (total, count) in totals.items():
+      rating = round(total / count / self.CONVERTION_RATIO)
+      if rating > 0:
+        ratings[album] = min(rating, 5)
+    return ratings
+
+  def set_ratings_from_discogs(
+          self, ratings, songs=False, override=False, fuzzy=False,
+          snapshot=None, dry_run=False, report=None, matcher=None,
+          journal=None):
     """Update the ratings from the Discogs ratings.
 
+    Artists and albums are matched by their normalized names (see
+    matcher.Matcher). With the release details on the matcher, albums
+    are also found by the titles of their tracks and, when updating the
+    songs, only the songs on the release tracklist are updated.
+
     Args:
         ratings (dict): Discogs ratings.
         songs (bool): Update songs rating instead of album rating.
           Defaults to False.
         override (bool): Override existing ratings. Defaults to False.
+        fuzzy (bool): Match similar names when no exact match is found.
+          Defaults to False.
+        snapshot (planner.Snapshot, optional): Snapshot of the previous
+          run. Unchanged tracks are skipped and the snapshot is saved at
+          the end. Defaults to None.
+        dry_run (bool): Only plan the changes, nothing is written to the
+          Music app (nor to the snapshot). Defaults to False.
+        report (str, optional): File to write the artist and album
+          misses to (csv). Defaults to None.
+        matcher (matcher.Matcher, optional): Matching index of the
+          ratings, to reuse. Defaults to None (built from the ratings).
+        journal (journal.Journal, optional): Run journal to checkpoint
+          the writes to. Defaults to None.
+
+    Returns:
+      planner.Plan: Planned rating changes.
     """
     if self.__logger:
       self.__logger.info('Updating Music ratings.')
       if songs:
         self.__logger.info('Updating Songs instead of album ratings.')
-    results = {
-        'artists': {'miss': {}},
-        'albums': {
-            'miss': {},
-            'updated': {},
-            'not_updated': {}},
-        'songs': {
-            'miss': {},
-            'updated': {},
-            'not_updated': {}}}
-    show_progress = True
-    if self.__logger and self.__logger.level < self.__logger.Level.INFO:
-      show_progress = False
-    for track in Bar('Processing').iter(
-            self.__tracks) if show_progress else self.__tracks:
-      track_artist = track.artist().title()
-      track_album = track.album().title()
-      track_name = track.name().title()
-      track_album_rating = int(track.album_rating())
-      track_rating = int(track.rating())
-      discogs_artist = ratings.get(track_artist, None)
-      if discogs_artist is None:
-        if self.__logger:
-          self.__logger.debug(
-              f'Artist "{track_artist}" not found on Discogs ratings.')
-        results['artists']['miss'].setdefault(track_artist, 1)
-        continue
-      discogs_album = ratings[track_artist].get(track_album, None)
-      if discogs_album is None:
-        if self.__logger:
-          self.__logger.debug(
-              f'Album "{track_album}" not found on Discogs ratings.')
-        results['albums']['miss'].setdefault(track_artist, {})
-        results['albums']['miss'][track_artist].setdefault(track_album, 1)
-        results['songs']['miss'].setdefault(track_artist, {})
-        results['songs']['miss'][track_artist].setdefault(track_name, 0)
-        results['songs']['miss'][track_artist][track_name] += 1
-        continue
-      discogs_rating = discogs_album['rating'] * self.CONVERTION_RATIO
-      if songs:
-        if track_rating == 0 or override:
-          if self.__logger:
-            self.__logger.debug(f'Updating song "{track_name}".')
-          results['songs']['updated'].setdefault(track_artist, {})
-          results['songs']['updated'][track_artist].setdefault(
-              track_name, {'from': track_album_rating, 'to': discogs_rating})
-          track.rating.set(discogs_rating)
-        else:
-          if self.__logger:
-            self.__logger.debug(f'Song "{track_name}" not updated.')
-          results['songs']['not_updated'].setdefault(track_artist, {})
-          results['songs']['not_updated'][track_artist].setdefault(
-              track_name, {'from': track_album_rating, 'to': discogs_rating})
-      else:
-        if track_album_rating == 0 or override:
-          if self.__logger:
-            self.__logger.debug(f'Updating album "{track_album}".')
-          results['albums']['updated'].setdefault(track_artist, {})
-          results['albums']['updated'][track_artist].setdefault(
-              track_album, {'from': track_album_rating, 'to': discogs_rating})
-          track.album_rating.set(discogs_rating)
-        else:
-          if self.__logger:
-            self.__logger.debug(f'Album "{track_album}" not updated.')
-          results['albums']['not_updated'].setdefault(track_artist, {})
-          results['albums']['not_updated'][track_artist].setdefault(
-              track_album, {'from': track_album_rating, 'to': discogs_rating})
-    if self.__logger and self.__logger.level > self.__logger.Level.NONE:
-      self.__logger.debug('Calculating stats.')
-      artists_miss = reduce(
-          lambda x, y: x + y,
-          results['artists']['miss'].values() or [0])
-      albums_miss = reduce(
-          lambda x, y: x + y,
-          map(
-              lambda x: len(x.keys()),
-              results['albums']['miss'].values() or [{}]) or [0])
-      albums_updated = reduce(
-          lambda x, y: x + y,
-          map(
-              lambda x: len(x.keys()),
-              results['albums']['updated'].values() or [{}]) or [0])
-      albums_not_updated = reduce(
-          lambda x, y: x + y,
-          map(
-              lambda x: len(x.keys()),
-              results['albums']['not_updated'].values() or [{}]) or [0])
-      songs_miss = reduce(
-          lambda x, y: x + y,
-          map(
-              lambda x: len(x.keys()),
-              results['songs']['miss'].values() or [{}]) or [0])
-      songs_updated = reduce(
-          lambda x, y: x + y,
-          map(
-              lambda x: len(x.keys()),
-              results['songs']['updated'].values() or [{}]) or [0])
-      songs_not_updated = reduce(
-          lambda x, y: x + y,
-          map(
-              lambda x: len(x.keys()),
-              results['songs']['not_updated'].values() or [{}]) or [0])
-      self.__logger.info(
-          'Stats:\n'
-          f'  {artists_miss} band misses\n'
-          f'  {albums_miss} album misses\n'
-          f'  {albums_updated} albums updated\n'
-          f'  {albums_not_updated} albums not updated\n'
-          f'  {songs_miss} song misses\n'
-          f'  {songs_updated} songs updated\n'
-          f'  {songs_not_updated} songs not updated\n')
+    stats = Stats(report=report)
+    matcher = matcher or Matcher(ratings, fuzzy=fuzzy)
+    if snapshot:
+      snapshot.compare(matcher, songs=songs, override=override, fuzzy=fuzzy)
+    start = perf_counter()
+    with self.__profiler.phase('match'):
+      plan = self.__plan(
+          matcher, stats, songs=songs, override=override, snapshot=snapshot)
+    if self.__metrics:
+      self.__metrics.observe('music_match_seconds', perf_counter() - start)
+    writes = 0
+    if dry_run:
+      if self.__logger:
+        self.__logger.info('Dry run, the Music app ratings were not updated.')
+    else:
+      with self.__profiler.phase('write'):
+        writes = self.__apply(plan, songs=songs, journal=journal)
+      if snapshot:
+        snapshot.save()
+    stats.close()
+    self.__count(stats, plan, writes, songs=songs)
+    return plan
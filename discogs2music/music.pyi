@@ -1,7 +1,14 @@
 from typing import Any, Final, Optional
+from .backends import MusicBackend
+from .journal import Journal
 from .logger import Logger
+from .matcher import Matcher
+from .metrics import Metrics
+from .planner import Plan, Snapshot
+from .profiler import Profiler
 
 class Music:
     CONVERTION_RATIO: Final[int] = ...
-    def __init__(self, logger: Optional[Logger] = ...) -> None: ...
-    def set_ratings_from_discogs(self, ratings: dict[str,Any], songs: bool = ..., override: bool = ...) -> None: ...
+    def __init__(self, logger: Optional[Logger] = ..., backend: Optional[MusicBackend] = ..., metrics: Optional[Metrics] = ..., profiler: Optional[Profiler] = ...) -> None: ...
+    def get_album_ratings(self, songs: bool = ...) -> dict[tuple[str, str], int]: ...
+    def set_ratings_from_discogs(self, ratings: dict[str,Any], songs: bool = ..., override: bool = ..., fuzzy: bool = ..., snapshot: Optional[Snapshot] = ..., dry_run: bool = ..., report: Optional[str] = ..., matcher: Optional[Matcher] = ..., journal: Optional[Journal] = ...) -> Plan: ...
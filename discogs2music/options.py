@@ -25,6 +25,8 @@ All other classes in this module are considered implementation details.
 import argparse
 from os import getcwd
 from . import __version__
+from .discogs import Discogs
+from .model import Model
 
 
 class Options:
@@ -37,25 +39,89 @@ class Options:
   __default_file = f'{getcwd()}/discogs2music.json'
 
   def __init__(self):
+    # Only loaded when parsing, to keep this module cheap to import.
+    from .data import Data  # pylint: disable=import-outside-toplevel
+    # pylint: disable-next=import-outside-toplevel
+    from .storage import JsonStorage
     parser = argparse.ArgumentParser(
         prog=__package__,
         formatter_class=argparse.ArgumentDefaultsHelpFormatter,
         add_help=True,
         allow_abbrev=False)
     mutually_exclusive = parser.add_mutually_exclusive_group(required=False)
+    parser.add_argument(
+        '--api-url',
+        action='store',
+        default=Discogs.API_BASEURL,
+        metavar='URL',
+        type=str,
+        help='discogs api url (e.g.: of a local mock server)')
     parser.add_argument(
         '-a',
         '--apikey',
-        action='store',
-        nargs=1,
+        action='append',
         type=str,
         required=True,
-        help='discogs api key')
+        help='discogs api key (repeat for more accounts, by priority)')
+    parser.add_argument(
+        '-b',
+        '--backend',
+        action='store',
+        default='json',
+        choices=Data.BACKENDS,
+        type=str,
+        help='datafile storage backend')
+    parser.add_argument(
+        '-c',
+        '--cache',
+        action='store',
+        default=None,
+        metavar='CACHEFILE',
+        type=str,
+        help='path to the discogs responses cache file (disabled if unset)')
+    parser.add_argument(
+        '--cache-size',
+        action='store',
+        default=64,
+        metavar='MB',
+        type=int,
+        help='maximum size of the cached responses, in megabytes')
+    parser.add_argument(
+        '--cache-ttl',
+        action='store',
+        default=3600,
+        metavar='SECONDS',
+        type=int,
+        help='time a cached response is used without revalidation')
+    parser.add_argument(
+        '--compact',
+        action='store_true',
+        help='write the json datafile without whitespace')
+    parser.add_argument(
+        '--compress',
+        action='store',
+        default=None,
+        choices=JsonStorage.COMPRESSIONS,
+        type=str,
+        help='compress the json datafile')
+    parser.add_argument(
+        '--conflict',
+        action='store',
+        default='priority',
+        choices=Model.POLICIES,
+        type=str,
+        help='rating to keep when accounts disagree')
+    parser.add_argument(
+        '--daemon',
+        action='store',
+        default=None,
+        metavar='INTERVAL',
+        type=int,
+        help='keep running, syncing every INTERVAL seconds')
     parser.add_argument(
         '-d',
         '--datafile',
         action='store',
-        nargs=1,
         default=self.__default_file,
         type=str,
         help='path to the datafile')
@@ -63,38 +129,249 @@ class Options:
         '--debug',
         action='store_true',
         help='debug mode')
+    parser.add_argument(
+        '-n',
+        '--dry-run',
+        action='store_true',
+        help='only plan the music ratings changes (nothing is updated)')
+    parser.add_argument(
+        '--enrich',
+        action='store',
+        default=None,
+        metavar='RELEASESFILE',
+        type=str,
+        help='fetch the release tracklists into RELEASESFILE, to match tracks')
+    parser.add_argument(
+        '--export',
+        action='store',
+        default=None,
+        dest='export_file',
+        metavar='RATINGSFILE',
+        type=str,
+        help='export the ratings to a csv, ndjson, parquet or arrow file')
+    parser.add_argument(
+        '-f',
+        '--folder',
+        action='append',
+        default=None,
+        dest='folders',
+        metavar='FOLDER',
+        type=int,
+        help='discogs collection folder id to read (repeat for more)')
+    parser.add_argument(
+        '--full-every',
+        action='store',
+        default=None,
+        metavar='DAYS',
+        type=int,
+        help='on incremental mode, do a full sync every DAYS days')
+    parser.add_argument(
+        '--fuzzy',
+        action='store_true',
+        help='match similar artist and album names when no exact match')
+    parser.add_argument(
+        '--import',
+        action='store',
+        default=None,
+        dest='import_file',
+        metavar='RATINGSFILE',
+        type=str,
+        help='import the ratings from a csv, ndjson, parquet or arrow file')
+    parser.add_argument(
+        '-i',
+        '--incremental',
+        action='store_true',
+        help='only fetch the releases added since the last sync')
+    parser.add_argument(
+        '--journal',
+        action='store',
+        default=None,
+        metavar='JOURNALFILE',
+        type=str,
+        help='checkpoint the run progress to JOURNALFILE, to resume it')
     parser.add_argument(
         '-l',
         '--local',
         action='store_true',
         help='use local file only (does not query discogs for data)')
+    parser.add_argument(
+        '--log-file',
+        action='store',
+        default=None,
+        metavar='LOGFILE',
+        type=str,
+        help='also write the log to a text or json lines (.jsonl) file')
+    parser.add_argument(
+        '--log-rate',
+        action='store',
+        default=None,
+        metavar='N',
+        type=float,
+        help='log at most N repeated (per track) messages per second')
+    parser.add_argument(
+        '--log-sample',
+        action='store',
+        default=None,
+        metavar='N',
+        type=int,
+        help='log only one every N repeated (per track) messages')
+    parser.add_argument(
+        '--low-memory',
+        action='store_true',
+        help='only decode the needed fields of the discogs responses')
+    parser.add_argument(
+        '--metrics',
+        action='store',
+        default=None,
+        metavar='METRICSFILE',
+        type=str,
+        help='write the run metrics to a json or prometheus (.prom) file')
+    parser.add_argument(
+        '-m',
+        '--migrate',
+        action='store',
+        default=None,
+        metavar='JSONFILE',
+        type=str,
+        help='migrate the data from a json datafile into the datafile')
+    parser.add_argument(
+        '--misses',
+        action='store',
+        default=None,
+        metavar='REPORTFILE',
+        type=str,
+        help='write the artists and albums not found on discogs to a csv file')
     parser.add_argument(
         '-o',
         '--override',
         action='store_true',
         help='override local data')
+    parser.add_argument(
+        '-p',
+        '--plan',
+        action='store',
+        default=None,
+        metavar='REPORTFILE',
+        type=str,
+        help='write the planned changes to a json or csv (by extension) file')
+    parser.add_argument(
+        '--profile',
+        action='store',
+        default=None,
+        metavar='DIRECTORY',
+        type=str,
+        help='write a cprofile .pstats file per phase to DIRECTORY')
+    parser.add_argument(
+        '--profile-memory',
+        action='store',
+        default=0,
+        metavar='N',
+        type=int,
+        help='with --profile, report the top N allocating lines per phase')
+    parser.add_argument(
+        '--push',
+        action='store',
+        default=None,
+        metavar='QUEUEFILE',
+        type=str,
+        help='push the music ratings to discogs instead, queued on QUEUEFILE')
     mutually_exclusive.add_argument(
         '-q',
         '--quiet',
         action='store_true',
         help='quiet mode')
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='with --journal, continue the interrupted run')
     parser.add_argument(
         '-s',
         '--songs',
         action='store_true',
         help='update songs rating instead of album rating')
+    parser.add_argument(
+        '--snapshot',
+        action='store',
+        default=None,
+        metavar='SNAPSHOTFILE',
+        type=str,
+        help='path to the library snapshot file, to skip unchanged tracks')
+    parser.add_argument(
+        '--status-port',
+        action='store',
+        default=None,
+        metavar='PORT',
+        type=int,
+        help='with --daemon, serve the sync status on localhost PORT')
     parser.add_argument(
         '-v',
         '--version',
         action='version',
         version=__version__)
+    parser.add_argument(
+        '-w',
+        '--workers',
+        action='store',
+        default=Discogs.API_WORKERS,
+        type=int,
+        help='number of concurrent discogs requests')
     self.__options = parser.parse_args()
 
+  @property
+  def api_url(self):
+    """str: discogs api url option."""
+    return self.__options.api_url
+
   @property
   def apikey(self):
-    """str: apikey option."""
+    """str: apikey option (first account)."""
     return self.__options.apikey[0]
 
+  @property
+  def apikeys(self):
+    """list[str]: apikey options (all accounts)."""
+    return self.__options.apikey
+
+  @property
+  def backend(self):
+    """str: datafile storage backend option."""
+    return self.__options.backend
+
+  @property
+  def cache(self):
+    """str: cache file option."""
+    return self.__options.cache
+
+  @property
+  def cache_size(self):
+    """int: cache size, in megabytes, option."""
+    return self.__options.cache_size
+
+  @property
+  def cache_ttl(self):
+    """int: cache time to live, in seconds, option."""
+    return self.__options.cache_ttl
+
+  @property
+  def compact(self):
+    """bool: compact json datafile option."""
+    return self.__options.compact
+
+  @property
+  def compress(self):
+    """str: json datafile compression option."""
+    return self.__options.compress
+
+  @property
+  def conflict(self):
+    """str: accounts conflict policy option."""
+    return self.__options.conflict
+
+  @property
+  def daemon(self):
+    """int: daemon mode sync interval, in seconds, option."""
+    return self.__options.daemon
+
   @property
   def datafile(self):
     """str: data file option."""
@@ -105,11 +382,91 @@ class Options:
     """bool: debug option."""
     return self.__options.debug
 
+  @property
+  def dry_run(self):
+    """bool: dry run option."""
+    return self.__options.dry_run
+
+  @property
+  def enrich(self):
+    """str: release details store file option."""
+    return self.__options.enrich
+
+  @property
+  def export_file(self):
+    """str: ratings export file option."""
+    return self.__options.export_file
+
+  @property
+  def folders(self):
+    """list[int]: collection folders option."""
+    return self.__options.folders or [0]
+
+  @property
+  def full_every(self):
+    """int: full sync interval, in days, option."""
+    return self.__options.full_every
+
+  @property
+  def fuzzy(self):
+    """bool: fuzzy matching option."""
+    return self.__options.fuzzy
+
+  @property
+  def import_file(self):
+    """str: ratings import file option."""
+    return self.__options.import_file
+
+  @property
+  def incremental(self):
+    """bool: incremental sync option."""
+    return self.__options.incremental
+
+  @property
+  def journal(self):
+    """str: run journal file option."""
+    return self.__options.journal
+
   @property
   def local(self):
     """bool: local option."""
     return self.__options.local
 
+  @property
+  def log_file(self):
+    """str: log file option."""
+    return self.__options.log_file
+
+  @property
+  def log_rate(self):
+    """float: log rate option."""
+    return self.__options.log_rate
+
+  @property
+  def log_sample(self):
+    """int: log sample option."""
+    return self.__options.log_sample
+
+  @property
+  def low_memory(self):
+    """bool: low memory option."""
+    return self.__options.low_memory
+
+  @property
+  def metrics(self):
+    """str: metrics file option."""
+    return self.__options.metrics
+
+  @property
+  def migrate(self):
+    """str: json datafile to migrate from option."""
+    return self.__options.migrate
+
+  @property
+  def misses(self):
+    """str: misses report file option."""
+    return self.__options.misses
+
   @property
   def options(self):
     """dict: all options."""
@@ -127,12 +484,52 @@ class Options:
     """bool: override local data option."""
     return self.__options.override
 
+  @property
+  def plan(self):
+    """str: planned changes report file option."""
+    return self.__options.plan
+
+  @property
+  def profile(self):
+    """str: profiles directory option."""
+    return self.__options.profile
+
+  @property
+  def profile_memory(self):
+    """int: top allocating lines to report option."""
+    return self.__options.profile_memory
+
+  @property
+  def push(self):
+    """str: push queue file option."""
+    return self.__options.push
+
   @property
   def quiet(self):
     """bool: quiet option."""
     return self.__options.quiet
 
+  @property
+  def resume(self):
+    """bool: resume option."""
+    return self.__options.resume
+
+  @property
+  def snapshot(self):
+    """str: library snapshot file option."""
+    return self.__options.snapshot
+
   @property
   def songs(self):
     """bool: update songs instead option."""
     return self.__options.songs
+
+  @property
+  def status_port(self):
+    """int: daemon mode status server port option."""
+    return self.__options.status_port
+
+  @property
+  def workers(self):
+    """int: concurrent discogs requests option."""
+    return self.__options.workers
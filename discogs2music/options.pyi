@@ -1,20 +1,88 @@
-from typing import Any
+from typing import Any, Optional
 
 class Options:
     def __init__(self) -> None: ...
     @property
+    def api_url(self) -> str: ...
+    @property
     def apikey(self) -> str: ...
     @property
+    def apikeys(self) -> list[str]: ...
+    @property
+    def backend(self) -> str: ...
+    @property
+    def cache(self) -> Optional[str]: ...
+    @property
+    def cache_size(self) -> int: ...
+    @property
+    def cache_ttl(self) -> int: ...
+    @property
+    def compact(self) -> bool: ...
+    @property
+    def compress(self) -> Optional[str]: ...
+    @property
+    def conflict(self) -> str: ...
+    @property
+    def daemon(self) -> Optional[int]: ...
+    @property
     def datafile(self) -> str: ...
     @property
     def debug(self) -> bool: ...
     @property
+    def dry_run(self) -> bool: ...
+    @property
+    def enrich(self) -> Optional[str]: ...
+    @property
+    def export_file(self) -> Optional[str]: ...
+    @property
+    def folders(self) -> list[int]: ...
+    @property
+    def full_every(self) -> Optional[int]: ...
+    @property
+    def fuzzy(self) -> bool: ...
+    @property
+    def import_file(self) -> Optional[str]: ...
+    @property
+    def incremental(self) -> bool: ...
+    @property
+    def journal(self) -> Optional[str]: ...
+    @property
     def local(self) -> bool: ...
     @property
+    def log_file(self) -> Optional[str]: ...
+    @property
+    def log_rate(self) -> Optional[float]: ...
+    @property
+    def log_sample(self) -> Optional[int]: ...
+    @property
+    def low_memory(self) -> bool: ...
+    @property
+    def metrics(self) -> Optional[str]: ...
+    @property
+    def migrate(self) -> Optional[str]: ...
+    @property
+    def misses(self) -> Optional[str]: ...
+    @property
     def options(self) -> dict[str,Any]: ...
     @property
     def override(self) -> bool: ...
     @property
+    def plan(self) -> Optional[str]: ...
+    @property
+    def profile(self) -> Optional[str]: ...
+    @property
+    def profile_memory(self) -> int: ...
+    @property
+    def push(self) -> Optional[str]: ...
+    @property
     def quiet(self) -> bool: ...
     @property
+    def resume(self) -> bool: ...
+    @property
+    def snapshot(self) -> Optional[str]: ...
+    @property
     def songs(self) -> bool: ...
+    @property
+    def status_port(self) -> Optional[int]: ...
+    @property
+    def workers(self) -> int: ...
@@ -0,0 +1,253 @@
+# -*- coding: UTF-8 -*-
+#
+# copyright: 2020-2022, Frederico Martins
+# author: Frederico Martins <http://github.com/fscm>
+# license: SPDX-License-Identifier: MIT
+
+"""Update planning module.
+
+This module keeps the state of the library tracks between runs and
+collects the rating changes to apply to the Music app.
+
+The following is a simple usage example::
+  from .planner import Plan, Snapshot
+  s = Snapshot('my_snapshot.json')
+  s.compare(matcher)
+  p = Plan()
+  for track in tracks:
+    if not s.unchanged(track):
+      p.add(track, 'album_rating', 80)
+  p.write('my_plan.csv')
+
+The module contains the following public classes:
+  - Change -- A planned rating change of a track.
+  - Plan -- Rating changes to apply, by track and by album.
+  - Snapshot -- State of the library tracks, and of the Discogs ratings
+    they were matched to, on the previous run.
+
+All other classes in this module are considered implementation details.
+"""
+
+import csv
+import json
+from collections import namedtuple
+from .storage import JsonStorage
+
+
+Change = namedtuple(
+    'Change',
+    ['persistent_id', 'artist', 'album', 'name', 'field', 'old', 'new'])
+
+
+class Plan:
+  """Rating changes.
+
+  This class collects the rating changes of the tracks, grouped by
+  album and rating so that they can be written once per album. The
+  tracks of an album that were matched to Discogs albums with different
+  ratings end up on different groups.
+  """
+
+  FORMATS = ('csv', 'json')
+
+  def __init__(self):
+    self.__albums = {}
+    self.__changes = []
+
+  def __len__(self):
+    return len(self.__changes)
+
+  @property
+  def albums(self):
+    """dict[tuple[str, str, int], dict[str, list[Any]]]: track
+    references and track persistent IDs to update, by artist, album and
+    rating."""
+    return self.__albums
+
+  @property
+  def changes(self):
+    """list[Change]: planned changes."""
+    return self.__changes
+
+  def add(self, track, field, rating):
+    """Adds a rating change.
+
+    Args:
+      track (backends.Track): Track to update.
+      field (str): Rating to update ('album_rating' or 'rating').
+      rating (int): New rating (0 to 100).
+    """
+    album = self.__albums.setdefault(
+        (track.artist, track.album, rating),
+        {'refs': [], 'ids': []})
+    album['refs'].append(track.ref)
+    album['ids'].append(track.persistent_id)
+    self.__changes.append(Change(
+        persistent_id=track.persistent_id,
+        artist=track.artist,
+        album=track.album,
+        name=track.name,
+        field=field,
+        old=int(getattr(track, field)),
+        new=rating))
+
+  def write(self, file, file_format=None):
+    """Writes the planned changes to a report file.
+
+    Args:
+      file (str): Report file.
+      file_format (str, optional): Report format, one of FORMATS.
+        Defaults to None (from the file extension, json if unknown).
+    """
+    if file_format is None:
+      file_format = 'csv' if file.lower().endswith('.csv') else 'json'
+    with open(file, 'w', encoding='utf-8', newline='') as out_file:
+      if file_format == 'csv':
+        writer = csv.writer(out_file)
+        writer.writerow(Change._fields)
+        writer.writerows(self.__changes)
+      else:
+        json.dump(
+            [change._asdict() for change in self.__changes],
+            out_file,
+            ensure_ascii=False,
+            indent=2)
+
+
+class Snapshot:
+  """Library snapshot.
+
+  This class records, for every track, its names and ratings and the
+  Discogs album it was matched to, as they were at the end of the
+  previous run. It also records the Discogs ratings of that run.
+
+  A track is unchanged when its names and ratings are the same as on
+  the snapshot and the Discogs album it was matched to (or, for the
+  tracks that were not matched, the set of Discogs albums) did not
+  change either. Such a track would get the same result as on the
+  previous run, so it does not have to be processed again.
+
+  The snapshot is discarded when the update options change.
+
+  Args:
+    file (str): Snapshot file.
+    logger (logger.Logger, optional): Logger to use. Defaults to None.
+  """
+
+  SEPARATOR = '\x1f'
+
+  def __init__(self, file, logger=None):
+    self.__added = False
+    self.__albums = {}
+    self.__changed = set()
+    self.__logger = logger
+    self.__next = {}
+    self.__options = {}
+    self.__storage = JsonStorage(file=file, logger=logger, compact=True)
+    self.__tracks = {}
+
+  def compare(self, matcher, songs=False, override=False, fuzzy=False):
+    """Compares the Discogs ratings with the ones of the snapshot.
+
+    Args:
+      matcher (matcher.Matcher): Discogs ratings index.
+      songs (bool, optional): Update songs rating instead of album
+        rating. Defaults to False.
+      override (bool, optional): Override existing ratings. Defaults to
+        False.
+      fuzzy (bool, optional): Match similar names. Defaults to False.
+    """
+    self.__options = {'songs': songs, 'override': override, 'fuzzy': fuzzy}
+    if matcher.enriched:
+      self.__options['enriched'] = True
+    self.__albums = {
+        self.key(artist_key, album_key): values['rating']
+        for artist_key, album_key, values in matcher.iter_albums()}
+    self.__next = {}
+    data = self.__storage.load() or {}
+    if data.get('options') != self.__options:
+      if data and self.__logger:
+        self.__logger.info('Update options changed, ignoring the snapshot.')
+      self.__tracks = {}
+      return
+    self.__tracks = data.get('tracks', {})
+    previous = data.get('albums', {})
+    self.__changed = {
+        key for key, rating in previous.items()
+        if self.__albums.get(key) != rating}
+    self.__added = any(key not in previous for key in self.__albums)
+    if self.__logger:
+      self.__logger.debug(
+          '%d Discogs albums changed since the last run%s.',
+          len(self.__changed),
+          ', new albums found' if self.__added else '')
+
+  @classmethod
+  def key(cls, artist_key, album_key):
+    """Builds the snapshot key of a Discogs album.
+
+    Args:
+      artist_key (str): Normalized artist name.
+      album_key (str): Normalized album title.
+
+    Returns:
+      str: Album key.
+    """
+    return f'{artist_key}{cls.SEPARATOR}{album_key}'
+
+  def record(self, track, album_key=None, album_rating=None, rating=None):
+    """Records the state of a track at the end of this run.
+
+    Args:
+      track (backends.Track): Track.
+      album_key (str, optional): Key of the Discogs album it was matched
+        to (see key()). Defaults to None (not matched).
+      album_rating (int, optional): Album rating after the update.
+        Defaults to None (not updated).
+      rating (int, optional): Rating after the update. Defaults to None
+        (not updated).
+    """
+    self.__next[track.persistent_id] = [
+        track.artist,
+        track.album,
+        int(track.album_rating if album_rating is None else album_rating),
+        int(track.rating if rating is None else rating),
+        album_key]
+
+  def save(self):
+    """Saves the snapshot.
+
+    Only the tracks recorded, or found unchanged, on this run are kept.
+    """
+    self.__storage.save({
+        'options': self.__options,
+        'albums': self.__albums,
+        'tracks': self.__next})
+
+  def unchanged(self, track):
+    """Checks if a track, and its Discogs album, are unchanged since the
+    previous run.
+
+    Unchanged tracks are kept on the snapshot as they are.
+
+    Args:
+      track (backends.Track): Track.
+
+    Returns:
+      bool: True if the track is unchanged.
+    """
+    entry = self.__tracks.get(track.persistent_id)
+    if entry is None or entry[:4] != [
+            track.artist, track.album,
+            int(track.album_rating), int(track.rating)]:
+      return False
+    album_key = entry[4]
+    # New albums may change the fuzzy and the track title matches.
+    rematch = self.__options['fuzzy'] or self.__options.get('enriched')
+    if album_key is None or rematch:
+      if self.__added:
+        return False
+    if album_key is not None and album_key in self.__changed:
+      return False
+    self.__next[track.persistent_id] = entry
+    return True
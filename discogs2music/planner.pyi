@@ -0,0 +1,34 @@
+from typing import Any, Final, NamedTuple, Optional
+from .backends import Track
+from .logger import Logger
+from .matcher import Matcher
+
+class Change(NamedTuple):
+    persistent_id: str
+    artist: str
+    album: str
+    name: str
+    field: str
+    old: int
+    new: int
+
+class Plan:
+    FORMATS: Final[tuple[str, ...]] = ...
+    def __init__(self) -> None: ...
+    def __len__(self) -> int: ...
+    @property
+    def albums(self) -> dict[tuple[str, str, int], dict[str, list[Any]]]: ...
+    @property
+    def changes(self) -> list[Change]: ...
+    def add(self, track: Track, field: str, rating: int) -> None: ...
+    def write(self, file: str, file_format: Optional[str] = ...) -> None: ...
+
+class Snapshot:
+    SEPARATOR: Final[str] = ...
+    def __init__(self, file: str, logger: Optional[Logger] = ...) -> None: ...
+    def compare(self, matcher: Matcher, songs: bool = ..., override: bool = ..., fuzzy: bool = ...) -> None: ...
+    @classmethod
+    def key(cls, artist_key: str, album_key: str) -> str: ...
+    def record(self, track: Track, album_key: Optional[str] = ..., album_rating: Optional[int] = ..., rating: Optional[int] = ...) -> None: ...
+    def save(self) -> None: ...
+    def unchanged(self, track: Track) -> bool: ...
@@ -0,0 +1,141 @@
+# -*- coding: UTF-8 -*-
+#
+# copyright: 2020-2022, Frederico Martins
+# author: Frederico Martins <http://github.com/fscm>
+# license: SPDX-License-Identifier: MIT
+
+"""Profiling module.
+
+This module profiles the phases of a run with cProfile and, optionally,
+tracemalloc.
+
+The following is a simple usage example::
+  from .profiler import Profiler
+  p = Profiler(directory='profiles', memory=10)
+  with p.phase('fetch'):
+    fetch()
+
+The module contains the following public classes:
+  - Profiler -- The main entry point. As the example above shows, the
+    Profiler() class can be used to profile the phases of a run.
+
+All other classes in this module are considered implementation details.
+"""
+
+import cProfile
+import os
+import tracemalloc
+from contextlib import contextmanager
+from os import path
+
+
+class Profiler:
+  """Phases profiler.
+
+  Every phase is profiled with cProfile and the statistics are written
+  to '<directory>/<phase>.pstats' (to be read with the pstats module or
+  tools such as snakeviz). With `memory`, the memory allocations are
+  also traced and the top allocating lines are written to
+  '<directory>/<phase>.memory.txt'.
+
+  Only the thread that starts a phase is profiled. Phases can not be
+  nested. When no directory is given nothing is profiled and starting or
+  stopping a phase does nothing.
+
+  Args:
+    directory (str, optional): Directory to write the profiles to.
+      Defaults to None (disabled).
+    memory (int, optional): Number of top allocating lines to report.
+      Defaults to 0 (memory not traced).
+    logger (logger.Logger, optional): Logger to use. Defaults to None.
+  """
+
+  def __init__(self, directory=None, memory=0, logger=None):
+    self.__directory = directory
+    self.__logger = logger
+    self.__memory = memory if directory else 0
+    self.__phase = None
+    self.__profile = None
+    self.__tracing = False
+    if directory:
+      os.makedirs(directory, exist_ok=True)
+
+  @property
+  def enabled(self):
+    """bool: profiling enabled."""
+    return bool(self.__directory)
+
+  @contextmanager
+  def phase(self, name):
+    """Profiles a block of code.
+
+    Args:
+      name (str): Phase name.
+
+    Yields:
+      None
+    """
+    self.start(name)
+    try:
+      yield
+    finally:
+      self.stop()
+
+  def start(self, name):
+    """Starts profiling a phase.
+
+    Args:
+      name (str): Phase name.
+    """
+    if not self.__directory:
+      return
+    self.__phase = name
+    if self.__memory:
+      self.__tracing = not tracemalloc.is_tracing()
+      if self.__tracing:
+        tracemalloc.start()
+      elif hasattr(tracemalloc, 'reset_peak'):
+        # Only available from Python 3.9 on.
+        tracemalloc.reset_peak()
+    self.__profile = cProfile.Profile()
+    self.__profile.enable()
+
+  def stop(self):
+    """Stops profiling the current phase and writes its reports."""
+    if not self.__directory or self.__profile is None:
+      return
+    self.__profile.disable()
+    file = path.join(self.__directory, f'{self.__phase}.pstats')
+    self.__profile.dump_stats(file)
+    self.__profile = None
+    if self.__logger:
+      self.__logger.debug('Profile written to "%s"', file)
+    if self.__memory:
+      snapshot = tracemalloc.take_snapshot()
+      peak = tracemalloc.get_traced_memory()[1]
+      if self.__tracing:
+        tracemalloc.stop()
+      self.__write_memory(snapshot, peak)
+
+  def __write_memory(self, snapshot, peak):
+    """Private method to write the top allocating lines of a phase.
+
+    Args:
+      snapshot (tracemalloc.Snapshot): Allocations.
+      peak (int): Peak traced memory, in bytes.
+    """
+    file = path.join(self.__directory, f'{self.__phase}.memory.txt')
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, cProfile.__file__)))
+    with open(file, 'w', encoding='utf-8') as out_file:
+      out_file.write(f'Phase: {self.__phase}\n')
+      out_file.write(f'Peak: {peak / 1024:.1f} KiB\n')
+      for index, stat in enumerate(
+              snapshot.statistics('lineno')[:self.__memory], 1):
+        frame = stat.traceback[0]
+        out_file.write(
+            f'#{index}: {frame.filename}:{frame.lineno}: '
+            f'{stat.size / 1024:.1f} KiB in {stat.count} blocks\n')
+    if self.__logger:
+      self.__logger.debug('Memory report written to "%s"', file)
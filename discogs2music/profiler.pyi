@@ -0,0 +1,10 @@
+from typing import ContextManager, Optional
+from .logger import Logger
+
+class Profiler:
+    def __init__(self, directory: Optional[str] = ..., memory: int = ..., logger: Optional[Logger] = ...) -> None: ...
+    @property
+    def enabled(self) -> bool: ...
+    def phase(self, name: str) -> ContextManager[None]: ...
+    def start(self, name: str) -> None: ...
+    def stop(self) -> None: ...
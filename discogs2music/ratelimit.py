@@ -0,0 +1,191 @@
+# -*- coding: UTF-8 -*-
+#
+# copyright: 2020-2022, Frederico Martins
+# author: Frederico Martins <http://github.com/fscm>
+# license: SPDX-License-Identifier: MIT
+
+"""Rate limit module.
+
+This module keeps requests to the Discogs API within the allowed quota.
+
+The following is a simple usage example::
+  from .ratelimit import RateLimiter
+  r = RateLimiter(limit=60, window=61)
+  r.acquire()
+  # perform the request
+  r.update(limit=60, used=1, remaining=59)
+
+The module contains the following public classes:
+  - RateLimiter -- The main entry point. As the example above shows, the
+    RateLimiter() class can be shared by several threads to pace their
+    requests.
+
+All other classes in this module are considered implementation details.
+"""
+
+import random
+from collections import deque
+from threading import Lock
+from time import monotonic, sleep
+
+
+class RateLimiter:
+  """Adaptive request scheduler.
+
+  Requests are spread evenly across the rate limit window instead of
+  being sent in bursts. The spacing between requests is the window
+  length divided by the part of the quota available to this scheduler,
+  that is the limit minus the requests used by other clients (the used
+  requests reported by the server that were not sent by this
+  scheduler). The pace slows down when the quota is shared and the
+  limit is never reached.
+
+  It also provides jittered exponential backoff delays for the requests
+  that have to be retried.
+
+  Args:
+    limit (int, optional): Requests allowed per window. Defaults to 60.
+    window (float, optional): Window length, in seconds. Defaults to
+      60.
+    backoff_base (float, optional): First backoff delay, in seconds.
+      Defaults to 1.
+    backoff_cap (float, optional): Maximum backoff delay, in seconds.
+      Defaults to 60.
+    clock (Callable[[], float], optional): Monotonic clock. Defaults to
+      time.monotonic.
+    sleep (Callable[[float], None], optional): Sleep function. Defaults
+      to time.sleep.
+    rng (random.Random, optional): Random generator for the backoff
+      jitter. Defaults to the random module.
+  """
+
+  def __init__(
+          self, limit=60, window=60, backoff_base=1, backoff_cap=60,
+          clock=monotonic, sleep=sleep, rng=random):
+    self.__backoff_base = backoff_base
+    self.__backoff_cap = backoff_cap
+    self.__clock = clock
+    self.__external = 0
+    self.__limit = limit
+    self.__lock = Lock()
+    self.__next = clock()
+    self.__remaining = limit
+    self.__rng = rng
+    self.__sent = deque()
+    self.__sleep = sleep
+    self.__used = 0
+    self.__window = window
+
+  @property
+  def external(self):
+    """int: requests used by other clients in the current window."""
+    return self.__external
+
+  @property
+  def interval(self):
+    """float: current spacing between requests, in seconds."""
+    with self.__lock:
+      return self.__interval()
+
+  @property
+  def limit(self):
+    """int: requests allowed per window."""
+    return self.__limit
+
+  @property
+  def remaining(self):
+    """int: requests available, as last reported by the server."""
+    return self.__remaining
+
+  @property
+  def used(self):
+    """int: requests used, as last reported by the server."""
+    return self.__used
+
+  def __interval(self):
+    """Private method to compute the spacing between requests.
+
+    Must be called with the lock held.
+
+    Returns:
+      float: Spacing between requests, in seconds.
+    """
+    return self.__window / max(1, self.__limit - self.__external)
+
+  def acquire(self):
+    """Waits for the next request slot.
+
+    Returns:
+      float: Time spent waiting, in seconds.
+    """
+    with self.__lock:
+      now = self.__clock()
+      slot = max(now, self.__next)
+      self.__next = slot + self.__interval()
+      self.__sent.append(slot)
+    wait = slot - now
+    if wait > 0:
+      self.__sleep(wait)
+    return wait
+
+  def backoff(self, attempt):
+    """Computes the delay before retrying a failed request.
+
+    The delay doubles with every attempt, up to `backoff_cap`, and is
+    randomized between half and the full value so that concurrent
+    retries do not happen all at once.
+
+    Args:
+      attempt (int): Number of previous attempts (starting at 0).
+
+    Returns:
+      float: Delay, in seconds.
+    """
+    delay = min(self.__backoff_cap, self.__backoff_base * (2 ** attempt))
+    return self.__rng.uniform(delay / 2, delay)
+
+  def pause(self, delay):
+    """Holds back every request for some time.
+
+    Used when the server refuses a request for exceeding the quota.
+
+    Args:
+      delay (float): Time, in seconds, to hold back the requests.
+    """
+    with self.__lock:
+      self.__next = max(self.__next, self.__clock() + delay)
+
+  def update(self, limit=None, used=None, remaining=None):
+    """Updates the pace with the quota reported by the server.
+
+    Args:
+      limit (int, optional): Requests allowed per window. Defaults to
+        None.
+      used (int, optional): Requests used in the current window.
+        Defaults to None.
+      remaining (int, optional): Requests still available in the
+        current window. Defaults to None.
+    """
+    with self.__lock:
+      if limit:
+        self.__limit = limit
+      if used is None and remaining is not None:
+        used = self.__limit - remaining
+      if used is None:
+        return
+      self.__used = used
+      self.__remaining = (
+          remaining if remaining is not None else self.__limit - used)
+      now = self.__clock()
+      while self.__sent and self.__sent[0] <= now - self.__window:
+        self.__sent.popleft()
+      own = sum(1 for slot in self.__sent if slot <= now)
+      self.__external = max(0, used - own)
+
+  def wait(self, delay):
+    """Sleeps for some time.
+
+    Args:
+      delay (float): Time to sleep, in seconds.
+    """
+    self.__sleep(delay)
@@ -0,0 +1,20 @@
+import random
+from typing import Callable, Optional
+
+class RateLimiter:
+    def __init__(self, limit: int = ..., window: float = ..., backoff_base: float = ..., backoff_cap: float = ..., clock: Callable[[], float] = ..., sleep: Callable[[float], None] = ..., rng: random.Random = ...) -> None: ...
+    @property
+    def external(self) -> int: ...
+    @property
+    def interval(self) -> float: ...
+    @property
+    def limit(self) -> int: ...
+    @property
+    def remaining(self) -> int: ...
+    @property
+    def used(self) -> int: ...
+    def acquire(self) -> float: ...
+    def backoff(self, attempt: int) -> float: ...
+    def pause(self, delay: float) -> None: ...
+    def update(self, limit: Optional[int] = ..., used: Optional[int] = ..., remaining: Optional[int] = ...) -> None: ...
+    def wait(self, delay: float) -> None: ...
@@ -0,0 +1,238 @@
+# -*- coding: UTF-8 -*-
+#
+# copyright: 2020-2022, Frederico Martins
+# author: Frederico Martins <http://github.com/fscm>
+# license: SPDX-License-Identifier: MIT
+
+"""Release details module.
+
+This module fetches the details of the collection releases (tracklists,
+artist name variations and formats) and keeps them on disk, so that
+every release is only fetched once.
+
+The following is a simple usage example::
+  from .releases import Enricher, ReleaseStore
+  store = ReleaseStore('my_releases.db')
+  e = Enricher(clients=[Discogs('my_token')], store=store)
+  details = e.enrich(data['releases'])
+  print(details['Artist']['Album']['tracklist'])
+  store.close()
+
+The module contains the following public classes:
+  - Enricher -- The main entry point. As the example above shows, the
+    Enricher() class can be used to get the details of the releases.
+  - ReleaseStore -- Stores the details of the releases.
+
+All other classes in this module are considered implementation details.
+"""
+
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha256
+from threading import Lock
+
+
+class ReleaseStore:
+  """Release details store.
+
+  This class stores the details of the releases on a SQLite database.
+  The details are content addressed: each distinct content is stored
+  once, by its digest, and every release points to the digest of its
+  details. Releases with the same details (e.g.: the pressings of an
+  album) share their content.
+
+  Details do not expire: a stored release is never fetched again.
+
+  Args:
+    file (str): Store file.
+    logger (logger.Logger, optional): Logger to use. Defaults to None.
+  """
+
+  BATCH_SIZE = 500
+
+  def __init__(self, file, logger=None):
+    self.__file = file
+    self.__lock = Lock()
+    self.__logger = logger
+    self.__connection = sqlite3.connect(file, check_same_thread=False)
+    self.__connection.execute(
+        'CREATE TABLE IF NOT EXISTS contents ('
+        'digest TEXT PRIMARY KEY, '
+        'content BLOB NOT NULL)')
+    self.__connection.execute(
+        'CREATE TABLE IF NOT EXISTS releases ('
+        'id INTEGER PRIMARY KEY, '
+        'digest TEXT NOT NULL)')
+    self.__connection.commit()
+
+  @property
+  def file(self):
+    """str: store file."""
+    return self.__file
+
+  @staticmethod
+  def digest(content):
+    """Computes the digest of a content.
+
+    Args:
+      content (bytes): Content.
+
+    Returns:
+      str: Content digest.
+    """
+    return sha256(content).hexdigest()
+
+  def close(self):
+    """Closes the store."""
+    with self.__lock:
+      self.__connection.close()
+
+  def get(self, release_ids):
+    """Gets the stored details of some releases.
+
+    Args:
+      release_ids (Iterable[int]): Discogs release IDs.
+
+    Returns:
+      dict[int, dict[str, Any]]: Details, by release ID, of the releases
+        found.
+    """
+    release_ids = list(release_ids)
+    details = {}
+    with self.__lock:
+      for index in range(0, len(release_ids), self.BATCH_SIZE):
+        batch = release_ids[index:index + self.BATCH_SIZE]
+        details.update(
+            (release_id, json.loads(content))
+            for release_id, content in self.__connection.execute(
+                'SELECT releases.id, contents.content '
+                'FROM releases JOIN contents USING (digest) '
+                f'WHERE releases.id IN ({", ".join("?" * len(batch))})',
+                batch))
+    return details
+
+  def put(self, release_id, details):
+    """Stores the details of a release.
+
+    Args:
+      release_id (int): Discogs release ID.
+      details (dict[str, Any]): Release details.
+    """
+    content = json.dumps(
+        details,
+        ensure_ascii=False,
+        separators=(',', ':'),
+        sort_keys=True).encode('utf-8')
+    digest = self.digest(content)
+    with self.__lock:
+      try:
+        with self.__connection:
+          self.__connection.execute(
+              'INSERT OR IGNORE INTO contents (digest, content) VALUES (?, ?)',
+              (digest, content))
+          self.__connection.execute(
+              'INSERT OR REPLACE INTO releases (id, digest) VALUES (?, ?)',
+              (release_id, digest))
+      except sqlite3.Error as err:
+        if self.__logger:
+          self.__logger.warning(
+              'Unable to store the details of release %s.', release_id)
+          self.__logger.debug(str(err))
+
+
+class Enricher:
+  """Release details fetcher.
+
+  The details of the releases that are not on the store are fetched
+  concurrently, spread over all the Discogs clients (each one within its
+  own rate limit), and stored as they arrive. Without clients only the
+  stored details are used.
+
+  Args:
+    clients (list[discogs.Discogs]): Discogs clients.
+    store (ReleaseStore): Release details store.
+    logger (logger.Logger, optional): Logger to use. Defaults to None.
+    metrics (metrics.Metrics, optional): Metrics to record the store
+      hits and the fetches to. Defaults to None.
+  """
+
+  def __init__(self, clients, store, logger=None, metrics=None):
+    self.__clients = list(clients)
+    self.__logger = logger
+    self.__metrics = metrics
+    self.__store = store
+
+  def __fetch(self, client, release_ids):
+    """Private method to fetch and store the details of some releases.
+
+    Args:
+      client (discogs.Discogs): Discogs client.
+      release_ids (list[int]): Discogs release IDs.
+
+    Returns:
+      dict[int, dict[str, Any]]: Details, by release ID, of the releases
+        fetched.
+    """
+    fetched = {}
+    try:
+      for release_id, details in client.iter_release_details(release_ids):
+        if details is not None:
+          self.__store.put(release_id, details)
+          fetched[release_id] = details
+    except Exception as err:  # pylint: disable=broad-except
+      if self.__logger:
+        self.__logger.warning('Unable to fetch the release details.')
+        self.__logger.debug(str(err))
+    return fetched
+
+  def enrich(self, releases):
+    """Gets the details of the releases.
+
+    Args:
+      releases (dict[str, dict[str, Any]]): Records (see model.Model).
+
+    Returns:
+      dict[str, dict[str, dict[str, Any]]]: Details by artist and album
+        (as on the names index).
+    """
+    release_ids = {
+        record['id'] for record in releases.values()
+        if record.get('id') is not None}
+    details = self.__store.get(release_ids)
+    hits = len(details)
+    missing = sorted(release_ids - details.keys())
+    if missing and self.__clients:
+      if self.__logger:
+        self.__logger.info(
+            'Fetching the details of %d releases.', len(missing))
+      clients = self.__clients[:len(missing)]
+      with ThreadPoolExecutor(max_workers=len(clients)) as executor:
+        for fetched in executor.map(
+            lambda args: self.__fetch(*args),
+            [(client, missing[index::len(clients)])
+             for index, client in enumerate(clients)]):
+          details.update(fetched)
+    fetched = len(details) - hits
+    failed = len(missing) - fetched if self.__clients else 0
+    if self.__metrics:
+      self.__metrics.increment('releases_store_hits_total', hits)
+      self.__metrics.increment('releases_fetched_total', fetched)
+      self.__metrics.increment('releases_failed_total', failed)
+    if self.__logger:
+      self.__logger.info(
+          'Release details:\n'
+          '  %d stored (%.0f%% hits)\n'
+          '  %d fetched\n'
+          '  %d not fetched\n',
+          hits,
+          hits / (len(release_ids) or 1) * 100,
+          fetched,
+          failed)
+    index = {}
+    for record in releases.values():
+      if record.get('id') in details:
+        index.setdefault(record['artist'], {}).setdefault(
+            record['title'],
+            details[record['id']])
+    return index
@@ -0,0 +1,19 @@
+from typing import Any, Final, Iterable, Optional
+from .discogs import Discogs
+from .logger import Logger
+from .metrics import Metrics
+
+class ReleaseStore:
+    BATCH_SIZE: Final[int] = ...
+    def __init__(self, file: str, logger: Optional[Logger] = ...) -> None: ...
+    @property
+    def file(self) -> str: ...
+    @staticmethod
+    def digest(content: bytes) -> str: ...
+    def close(self) -> None: ...
+    def get(self, release_ids: Iterable[int]) -> dict[int, dict[str, Any]]: ...
+    def put(self, release_id: int, details: dict[str, Any]) -> None: ...
+
+class Enricher:
+    def __init__(self, clients: list[Discogs], store: ReleaseStore, logger: Optional[Logger] = ..., metrics: Optional[Metrics] = ...) -> None: ...
+    def enrich(self, releases: dict[str, dict[str, Any]]) -> dict[str, dict[str, dict[str, Any]]]: ...
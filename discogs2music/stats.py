@@ -0,0 +1,131 @@
+# -*- coding: UTF-8 -*-
+#
+# copyright: 2020-2022, Frederico Martins
+# author: Frederico Martins <http://github.com/fscm>
+# license: SPDX-License-Identifier: MIT
+
+"""Update statistics module.
+
+This module counts the outcome of the Music ratings update as the
+tracks are processed.
+
+The following is a simple usage example::
+  from .stats import Stats
+  s = Stats(report='my_misses.csv')
+  for track in tracks:
+    s.add(Stats.Event.ALBUM_MISS, track)
+  print(s.summary())
+  s.close()
+
+The module contains the following public classes:
+  - Stats -- The main entry point. As the example above shows, the
+    Stats() class can be used to count the tracks by outcome.
+
+All other classes in this module are considered implementation details.
+"""
+
+import csv
+from collections import Counter
+from enum import Enum, unique
+
+
+class Stats:
+  """Update statistics.
+
+  This class keeps counters, updated on every track, instead of the
+  names of the tracks. Artist misses are counted once per artist,
+  album outcomes once per album and song outcomes once per track.
+
+  Only the first few misses are kept, as samples. The full list of
+  misses can be streamed to a csv report file as the tracks are
+  processed.
+
+  Args:
+    samples (int, optional): Number of misses to keep, per event.
+      Defaults to SAMPLES.
+    report (str, optional): Misses report file. Defaults to None.
+  """
+
+  @unique
+  class Event(Enum):
+    """Track outcomes."""
+    ARTIST_MISS = 'artist_miss'
+    ALBUM_MISS = 'album_miss'
+    TRACK_MISS = 'track_miss'
+    UPDATED = 'updated'
+    NOT_UPDATED = 'not_updated'
+    UNCHANGED = 'unchanged'
+
+  MISSES = (Event.ARTIST_MISS, Event.ALBUM_MISS, Event.TRACK_MISS)
+  SAMPLES = 10
+
+  def __init__(self, samples=SAMPLES, report=None):
+    self.__albums = {
+        event: set() for event in (
+            self.Event.ALBUM_MISS, self.Event.UPDATED, self.Event.NOT_UPDATED)}
+    self.__artists = set()
+    self.__report = None
+    self.__samples = {event: [] for event in self.MISSES}
+    self.__samples_size = samples
+    self.__tracks = Counter()
+    self.__writer = None
+    if report:
+      self.__report = open(report, 'w', encoding='utf-8', newline='')
+      self.__writer = csv.writer(self.__report)
+      self.__writer.writerow(('event', 'artist', 'album', 'name'))
+
+  @property
+  def samples(self):
+    """dict[Event, list[tuple[str, str, str]]]: first misses (artist,
+    album and name), per event."""
+    return self.__samples
+
+  def add(self, event, track):
+    """Counts a track outcome.
+
+    Args:
+      event (Event): Track outcome.
+      track (backends.Track): Track.
+    """
+    self.__tracks[event] += 1
+    if event is self.Event.ARTIST_MISS:
+      self.__artists.add(track.artist)
+    elif event in self.__albums:
+      # The track strings are shared, only the tuples are new.
+      self.__albums[event].add((track.artist, track.album))
+    if event in self.__samples:
+      if len(self.__samples[event]) < self.__samples_size:
+        self.__samples[event].append((track.artist, track.album, track.name))
+      if self.__writer:
+        self.__writer.writerow(
+            (event.value, track.artist, track.album, track.name))
+
+  def close(self):
+    """Closes the misses report file."""
+    if self.__report:
+      self.__report.close()
+      self.__report = None
+      self.__writer = None
+
+  def summary(self, songs=False):
+    """Summarizes the counters.
+
+    Args:
+      songs (bool, optional): Songs, instead of albums, were updated.
+        Defaults to False.
+
+    Returns:
+      dict[str, int]: Counters.
+    """
+    updated = self.Event.UPDATED
+    not_updated = self.Event.NOT_UPDATED
+    return {
+        'artists_miss': len(self.__artists),
+        'albums_miss': len(self.__albums[self.Event.ALBUM_MISS]),
+        'albums_updated': 0 if songs else len(self.__albums[updated]),
+        'albums_not_updated': 0 if songs else len(self.__albums[not_updated]),
+        'songs_miss': self.__tracks[self.Event.ALBUM_MISS],
+        'songs_not_on_release': self.__tracks[self.Event.TRACK_MISS],
+        'songs_updated': self.__tracks[updated] if songs else 0,
+        'songs_not_updated': self.__tracks[not_updated] if songs else 0,
+        'songs_unchanged': self.__tracks[self.Event.UNCHANGED]}
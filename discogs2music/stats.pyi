@@ -0,0 +1,19 @@
+from enum import Enum
+from typing import Final, Optional
+from .backends import Track
+
+class Stats:
+    class Event(Enum):
+        ARTIST_MISS: str = ...
+        ALBUM_MISS: str = ...
+        UPDATED: str = ...
+        NOT_UPDATED: str = ...
+        UNCHANGED: str = ...
+    MISSES: Final[tuple[Event, ...]] = ...
+    SAMPLES: Final[int] = ...
+    def __init__(self, samples: int = ..., report: Optional[str] = ...) -> None: ...
+    @property
+    def samples(self) -> dict[Event, list[tuple[str, str, str]]]: ...
+    def add(self, event: Event, track: Track) -> None: ...
+    def close(self) -> None: ...
+    def summary(self, songs: bool = ...) -> dict[str, int]: ...
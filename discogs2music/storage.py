@@ -0,0 +1,386 @@
+# -*- coding: UTF-8 -*-
+#
+# copyright: 2020-2022, Frederico Martins
+# author: Frederico Martins <http://github.com/fscm>
+# license: SPDX-License-Identifier: MIT
+
+"""Storage backends module.
+
+This module provides the storage backends used by the Data class.
+
+The following is a simple usage example::
+  from .storage import SqliteStorage
+  s = SqliteStorage('my_file.db')
+  data = s.load()
+  s.save(data)
+
+The module contains the following public classes:
+  - JsonStorage -- Stores the data on a json file.
+  - SqliteStorage -- Stores the data on a SQLite database, one row per
+    release.
+
+All other classes in this module are considered implementation details.
+"""
+
+import gzip
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import unicodedata
+from os import path
+
+try:
+  import orjson
+except ImportError:
+  orjson = None
+
+try:
+  import zstandard
+except ImportError:
+  zstandard = None
+
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+
+class JsonStorage:
+  """Json storage backend.
+
+  This class loads and saves the data from and to a json file.
+
+  Writes go to a temporary file that is synced to disk and then renamed
+  over the data file, so the data file is never left truncated. The
+  output can be compact and compressed (gzip or, when the zstandard
+  module is installed, zstd). Compressed files are detected on load.
+  The orjson module, when installed, is used to speed up both loads and
+  saves.
+
+  Args:
+    file (str): Data file.
+    logger (logger.Logger, optional): Logger to use. Defaults to None.
+    compact (bool, optional): Write the json without whitespace.
+      Defaults to False.
+    compression (str, optional): Compression to use, one of
+      COMPRESSIONS. Defaults to None (no compression).
+  """
+
+  COMPRESSIONS = ('gzip', 'zstd')
+
+  def __init__(self, file, logger=None, compact=False, compression=None):
+    self.__compact = compact
+    self.__compression = compression
+    self.__file = file
+    self.__logger = logger
+    if compression == 'zstd' and zstandard is None:
+      if self.__logger:
+        self.__logger.warning(
+            'zstandard module not found, writing uncompressed data.')
+      self.__compression = None
+
+  def __dumps(self, data):
+    """Private method to serialize and compress the data.
+
+    Args:
+      data (dict[str, Any]): Data to serialize.
+
+    Returns:
+      bytes: Serialized data.
+    """
+    if orjson:
+      content = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    else:
+      content = json.dumps(
+          data,
+          check_circular=False,
+          ensure_ascii=False,
+          separators=(',', ':') if self.__compact else None,
+          skipkeys=True).encode('utf-8')
+    if self.__compression == 'gzip':
+      return gzip.compress(content)
+    if self.__compression == 'zstd':
+      return zstandard.ZstdCompressor().compress(content)
+    return content
+
+  @staticmethod
+  def __loads(content):
+    """Private method to decompress and deserialize the data.
+
+    Args:
+      content (bytes): Serialized data.
+
+    Returns:
+      dict[str, Any]: Data.
+    """
+    if content.startswith(GZIP_MAGIC):
+      content = gzip.decompress(content)
+    elif content.startswith(ZSTD_MAGIC):
+      if zstandard is None:
+        raise ValueError('zstandard module required to load the data')
+      content = zstandard.ZstdDecompressor().decompress(content)
+    if orjson:
+      return orjson.loads(content)
+    return json.loads(content.decode('utf-8'))
+
+  @staticmethod
+  def __remove(file):
+    """Private method to remove a file, if it exists.
+
+    Args:
+      file (str): File to remove.
+    """
+    try:
+      os.remove(file)
+    except OSError:
+      pass
+
+  @staticmethod
+  def __sync_directory(directory):
+    """Private method to sync a directory, so that a rename is durable.
+
+    Args:
+      directory (str): Directory to sync.
+    """
+    try:
+      descriptor = os.open(directory, os.O_RDONLY)
+    except OSError:
+      return
+    try:
+      os.fsync(descriptor)
+    except OSError:
+      pass
+    finally:
+      os.close(descriptor)
+
+  def load(self):
+    """Loads the data from the data file.
+
+    Returns:
+      dict[str, Any]: The data or None if the file can not be loaded.
+    """
+    data = None
+    if path.isfile(self.__file):
+      try:
+        with open(self.__file, 'rb') as in_file:
+          data = self.__loads(in_file.read())
+      except (OSError, ValueError) as err:
+        if self.__logger:
+          self.__logger.error('Error loading data from "%s"', self.__file)
+          self.__logger.debug(str(err))
+    else:
+      if self.__logger:
+        self.__logger.warning('Data file not found (%s)', self.__file)
+    return data
+
+  def save(self, data):
+    """Saves the data to the data file.
+
+    Args:
+      data (dict[str, Any]): Data to save.
+    """
+    directory = path.dirname(path.abspath(self.__file))
+    descriptor, temp_file = tempfile.mkstemp(
+        dir=directory,
+        prefix=f'.{path.basename(self.__file)}.',
+        suffix='.tmp')
+    try:
+      with os.fdopen(descriptor, 'wb') as out_file:
+        out_file.write(self.__dumps(data))
+        out_file.flush()
+        os.fsync(out_file.fileno())
+      if path.isfile(self.__file):
+        os.chmod(temp_file, os.stat(self.__file).st_mode & 0o777)
+      else:
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(temp_file, 0o666 & ~umask)
+      os.replace(temp_file, self.__file)
+    except (OSError, TypeError, ValueError) as err:
+      if self.__logger:
+        self.__logger.error('Unable to write to "%s"', self.__file)
+        self.__logger.debug(str(err))
+      self.__remove(temp_file)
+      return
+    except BaseException:
+      self.__remove(temp_file)
+      raise
+    self.__sync_directory(directory)
+
+
+class SqliteStorage:
+  """SQLite storage backend.
+
+  This class loads and saves the data from and to a SQLite database.
+  Each release record is stored on its own row, keyed by the record key
+  and indexed by the normalized artist and album names. Only the rows
+  that changed since the data was loaded are written, within a single
+  transaction.
+
+  Databases with the older, names keyed, ratings table are loaded as
+  names keyed data and the table is dropped on the first save. Releases
+  tables without the account priority column are given one.
+
+  Args:
+    file (str): Database file.
+    logger (logger.Logger, optional): Logger to use. Defaults to None.
+  """
+
+  COLUMNS = (
+      'id', 'instance_id', 'artist', 'title', 'rating', 'added', 'priority')
+
+  def __init__(self, file, logger=None):
+    self.__file = file
+    self.__legacy = False
+    self.__logger = logger
+    self.__rows = {}
+
+  @staticmethod
+  def normalize(name):
+    """Normalizes an artist or album name for indexing.
+
+    Args:
+      name (str): Artist or album name.
+
+    Returns:
+      str: Normalized name.
+    """
+    name = unicodedata.normalize('NFKC', name).casefold()
+    return re.sub(r'\s+', ' ', name).strip()
+
+  def __connect(self):
+    """Private method to open the database, creating the schema if
+    needed.
+
+    Returns:
+      sqlite3.Connection: Database connection.
+    """
+    connection = sqlite3.connect(self.__file)
+    with connection:
+      connection.execute(
+          'CREATE TABLE IF NOT EXISTS meta ('
+          'key TEXT PRIMARY KEY, '
+          'value TEXT NOT NULL)')
+      connection.execute(
+          'CREATE TABLE IF NOT EXISTS releases ('
+          'key TEXT PRIMARY KEY, '
+          'id INTEGER, '
+          'instance_id INTEGER, '
+          'artist TEXT NOT NULL, '
+          'title TEXT NOT NULL, '
+          'rating INTEGER NOT NULL, '
+          'added INTEGER, '
+          'artist_key TEXT NOT NULL, '
+          'album_key TEXT NOT NULL, '
+          'priority INTEGER)')
+      columns = {
+          row[1] for row in connection.execute('PRAGMA table_info(releases)')}
+      if 'priority' not in columns:
+        connection.execute('ALTER TABLE releases ADD COLUMN priority INTEGER')
+      connection.execute(
+          'CREATE INDEX IF NOT EXISTS releases_names '
+          'ON releases (artist_key, album_key)')
+    return connection
+
+  @staticmethod
+  def __has_table(connection, table):
+    """Private method to check if a table exists.
+
+    Args:
+      connection (sqlite3.Connection): Database connection.
+      table (str): Table name.
+
+    Returns:
+      bool: True if the table exists.
+    """
+    return connection.execute(
+        'SELECT 1 FROM sqlite_master WHERE type = ? AND name = ?',
+        ('table', table)).fetchone() is not None
+
+  def load(self):
+    """Loads the data from the database.
+
+    Returns:
+      dict[str, Any]: The data or None if the file can not be loaded.
+    """
+    if not path.isfile(self.__file):
+      if self.__logger:
+        self.__logger.warning('Data file not found (%s)', self.__file)
+      return None
+    try:
+      connection = self.__connect()
+    except sqlite3.DatabaseError as err:
+      if self.__logger:
+        self.__logger.error('Error loading data from "%s"', self.__file)
+        self.__logger.debug(str(err))
+      return None
+    try:
+      data = {
+          key: json.loads(value) for key, value in connection.execute(
+              'SELECT key, value FROM meta')}
+      self.__rows = {
+          key: row for key, *row in connection.execute(
+              f'SELECT key, {", ".join(self.COLUMNS)} FROM releases')}
+      data['releases'] = {
+          key: dict(zip(self.COLUMNS, row))
+          for key, row in self.__rows.items()}
+      self.__legacy = self.__has_table(connection, 'ratings')
+      if self.__legacy:
+        ratings = {}
+        for artist, album, rating in connection.execute(
+                'SELECT artist, album, rating FROM ratings'):
+          ratings.setdefault(artist, {})[album] = {'rating': rating}
+        data['ratings'] = ratings
+        data.pop('version', None)
+    finally:
+      connection.close()
+    return data
+
+  def save(self, data):
+    """Saves the data to the database.
+
+    Args:
+      data (dict[str, Any]): Data to save.
+    """
+    rows = {
+        key: [record[column] for column in self.COLUMNS]
+        for key, record in data.get('releases', {}).items()}
+    changed = [
+        (key, *row, self.normalize(row[2]), self.normalize(row[3]))
+        for key, row in rows.items()
+        if self.__rows.get(key) != row]
+    removed = [(key,) for key in self.__rows if key not in rows]
+    meta = [
+        (key, json.dumps(value))
+        for key, value in data.items() if key not in ('ratings', 'releases')]
+    connection = None
+    try:
+      connection = self.__connect()
+      with connection:
+        connection.executemany(
+            'INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+            meta)
+        connection.executemany(
+            'INSERT OR REPLACE INTO releases '
+            f'(key, {", ".join(self.COLUMNS)}, artist_key, album_key) '
+            f'VALUES ({", ".join("?" * (len(self.COLUMNS) + 3))})',
+            changed)
+        connection.executemany(
+            'DELETE FROM releases WHERE key = ?',
+            removed)
+        if self.__legacy:
+          connection.execute('DROP TABLE IF EXISTS ratings')
+    except sqlite3.Error as err:
+      if self.__logger:
+        self.__logger.error('Unable to write to "%s"', self.__file)
+        self.__logger.debug(str(err))
+      return
+    finally:
+      if connection:
+        connection.close()
+    if self.__logger:
+      self.__logger.debug(
+          '%d rows updated, %d rows removed.', len(changed), len(removed))
+    self.__legacy = False
+    self.__rows = rows
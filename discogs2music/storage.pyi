@@ -0,0 +1,19 @@
+from typing import Any, Final, Optional
+from .logger import Logger
+
+GZIP_MAGIC: Final[bytes] = ...
+ZSTD_MAGIC: Final[bytes] = ...
+
+class JsonStorage:
+    COMPRESSIONS: Final[tuple[str, ...]] = ...
+    def __init__(self, file: str, logger: Optional[Logger] = ..., compact: bool = ..., compression: Optional[str] = ...) -> None: ...
+    def load(self) -> Optional[dict[str, Any]]: ...
+    def save(self, data: dict[str, Any]) -> None: ...
+
+class SqliteStorage:
+    COLUMNS: Final[tuple[str, ...]] = ...
+    def __init__(self, file: str, logger: Optional[Logger] = ...) -> None: ...
+    @staticmethod
+    def normalize(name: str) -> str: ...
+    def load(self) -> Optional[dict[str, Any]]: ...
+    def save(self, data: dict[str, Any]) -> None: ...
@@ -0,0 +1,398 @@
+# -*- coding: UTF-8 -*-
+#
+# copyright: 2020-2022, Frederico Martins
+# author: Frederico Martins <http://github.com/fscm>
+# license: SPDX-License-Identifier: MIT
+
+"""Sync module.
+
+This module runs the sync: fetches the Discogs ratings, saves them and
+updates the Music app ratings (or, the other way around, pushes the
+Music app ratings to Discogs). The Music library is read while the
+Discogs ratings are fetched, and the ratings are saved while the Music
+app ratings are updated.
+
+The following is a simple usage example::
+  from .sync import Sync
+  s = Sync(options=Options(), logger=Logger())
+  s.run()
+  s.close()
+
+The module contains the following public classes:
+  - Sync -- The main entry point. As the example above shows, the Sync()
+    class can be used to run one or more syncs.
+
+All other classes in this module are considered implementation details.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from .data import Data
+from .matcher import Matcher
+from .metrics import Metrics
+from .model import Model
+from .music import Music
+from .planner import Snapshot
+from .profiler import Profiler
+
+
+class Sync:
+  """Sync runner.
+
+  This class keeps what can be reused from one run to the next: the data
+  is only loaded on the first run, the Discogs clients (their HTTP
+  sessions and identities) are only created once, and the matching
+  index is only rebuilt when the ratings change.
+
+  The phases that use unrelated resources run concurrently: the Music
+  library is read (Music app) while the Discogs ratings are fetched
+  (network), and the ratings are saved (disk) while they are matched
+  and written to the Music app. A run then takes about the longest of
+  the fetch and the read, instead of their sum. When profiling, the
+  phases run one after the other (see profiler.Profiler).
+
+  With a run journal (see journal.Journal), the fetched pages and the
+  Music app writes are checkpointed as they complete, and an interrupted
+  run can be resumed from them.
+
+  When pushing, the Music app ratings are not updated: the changed ones
+  are queued and pushed to the first Discogs account (see
+  writeback.Pusher), and the ratings are saved once pushed.
+
+  Args:
+    options (options.Options): Command-line options.
+    logger (logger.Logger): Logger to use.
+    metrics (metrics.Metrics, optional): Metrics to record the runs to.
+      Defaults to a new one.
+    backend (backends.MusicBackend, optional): Music library backend, or
+      a function that returns one (called on every run). Defaults to
+      the Music app (backends.AppscriptBackend).
+  """
+
+  def __init__(self, options, logger, metrics=None, backend=None):
+    self.__accounts = None
+    self.__backend = backend
+    self.__cache = None
+    self.__cache_stats = {}
+    self.__details = None
+    self.__index = None
+    self.__journal = None
+    self.__loaded = False
+    self.__logger = logger
+    self.__matcher = None
+    self.__metrics = metrics or Metrics()
+    self.__options = options
+    self.__queue = None
+    self.__ratings = None
+    self.__resume = options.resume
+    self.__store = None
+    self.__profiler = Profiler(
+        directory=options.profile,
+        memory=options.profile_memory,
+        logger=logger)
+    self.__data = Data(
+        file=options.datafile,
+        logger=logger,
+        backend=options.backend,
+        compact=options.compact,
+        compression=options.compress,
+        metrics=self.__metrics,
+        policy=options.conflict)
+    if options.migrate:
+      self.__data.migrate(options.migrate)
+    if options.import_file:
+      self.__data.import_from(options.import_file)
+    if options.cache and not options.local:
+      from .cache import Cache  # pylint: disable=import-outside-toplevel
+      self.__cache = Cache(
+          file=options.cache,
+          ttl=options.cache_ttl,
+          max_size=options.cache_size * 1024 * 1024,
+          logger=logger)
+    if options.enrich:
+      # pylint: disable-next=import-outside-toplevel
+      from .releases import ReleaseStore
+      self.__store = ReleaseStore(file=options.enrich, logger=logger)
+    if options.journal:
+      from .journal import Journal  # pylint: disable=import-outside-toplevel
+      self.__journal = Journal(file=options.journal, logger=logger)
+    if options.push:
+      # pylint: disable-next=import-outside-toplevel
+      from .writeback import WriteQueue
+      self.__queue = WriteQueue(file=options.push, logger=logger)
+
+  @property
+  def metrics(self):
+    """metrics.Metrics: runs metrics."""
+    return self.__metrics
+
+  def __enrich(self, releases):
+    """Private method to get the details of the releases.
+
+    Args:
+      releases (dict[str, dict[str, Any]]): Records (see model.Model).
+
+    Returns:
+      dict[str, Any]: Release details, by artist and album.
+    """
+    from .releases import Enricher  # pylint: disable=import-outside-toplevel
+    enricher = Enricher(
+        clients=self.__accounts.clients if self.__accounts else [],
+        store=self.__store,
+        logger=self.__logger,
+        metrics=self.__metrics)
+    return enricher.enrich(releases)
+
+  def __fetch(self, incremental):
+    """Private method to fetch the Discogs ratings.
+
+    Args:
+      incremental (bool): Only fetch the newly added releases.
+
+    Returns:
+      dict[str, Any]: Ratings data.
+    """
+    options = self.__options
+    if self.__accounts is None:
+      # Local runs do not need the Discogs client or its dependencies.
+      from .accounts import Accounts  # pylint: disable=import-outside-toplevel
+      self.__accounts = Accounts(
+          keys=options.apikeys,
+          folders=options.folders,
+          policy=options.conflict,
+          logger=self.__logger,
+          cache=self.__cache,
+          workers=options.workers,
+          low_memory=options.low_memory,
+          metrics=self.__metrics,
+          base_url=options.api_url,
+          journal=self.__journal)
+    return self.__accounts.get_ratings(
+        ratings=self.__ratings,
+        incremental=incremental,
+        full_interval=(
+            options.full_every * 86400 if options.full_every else None))
+
+  def __get_music(self):
+    """Private method to read the Music library.
+
+    Returns:
+      music.Music: Music library.
+    """
+    backend = self.__backend
+    if callable(backend):
+      backend = backend()
+    return Music(
+        logger=self.__logger,
+        backend=backend,
+        metrics=self.__metrics,
+        profiler=self.__profiler)
+
+  def __get_matcher(self, index, details=None):
+    """Private method to get the matching index of the ratings.
+
+    Args:
+      index (dict[str, Any]): Ratings, by artist and album.
+      details (dict[str, Any], optional): Release details, by artist and
+        album. Defaults to None.
+
+    Returns:
+      matcher.Matcher: Matching index.
+    """
+    if self.__matcher is None or index != self.__index or (
+        details != self.__details):
+      if self.__logger:
+        self.__logger.debug('Building the matching index.')
+      self.__matcher = Matcher(
+          index,
+          fuzzy=self.__options.fuzzy,
+          details=details)
+      self.__index = index
+      self.__details = details
+    return self.__matcher
+
+  def __push(self, music, data):
+    """Private method to push the changed Music app ratings to Discogs.
+
+    Args:
+      music (music.Music): Music library.
+      data (dict[str, Any]): Ratings data.
+
+    Returns:
+      dict[str, Any]: Ratings data, with the pushed ratings.
+    """
+    from .writeback import Pusher  # pylint: disable=import-outside-toplevel
+    options = self.__options
+    writes = Pusher.diff(
+        music.get_album_ratings(songs=options.songs),
+        data['releases'],
+        override=options.override,
+        fuzzy=options.fuzzy)
+    if options.dry_run:
+      self.__logger.info(
+          'Dry run, %d rating changes were not pushed.', len(writes))
+      return data
+    self.__queue.put(writes)
+    pusher = Pusher(
+        queue=self.__queue,
+        client=self.__accounts.clients[0] if self.__accounts else None,
+        logger=self.__logger,
+        metrics=self.__metrics)
+    pushed = pusher.push()
+    if not pushed:
+      return data
+    # The cached collection pages still have the old ratings.
+    self.__accounts.clients[0].expire_collection()
+    releases = dict(data['releases'])
+    for write in pushed:
+      key = Model.key(write.release_id)
+      if key in releases:
+        releases[key] = {**releases[key], 'rating': write.rating}
+    return {
+        **data,
+        'releases': releases,
+        'ratings': Model.index(releases, options.conflict)}
+
+  def __log_cache_stats(self):
+    """Private method to log and record the cache stats of the run."""
+    cache_stats = self.__cache.stats
+    for name, value in cache_stats.items():
+      self.__metrics.increment(
+          f'cache_{name}_total',
+          value - self.__cache_stats.get(name, 0))
+    self.__cache_stats = cache_stats
+    self.__logger.info(
+        'Cache stats:\n'
+        '  %d hits\n'
+        '  %d misses\n'
+        '  %d revalidations\n',
+        cache_stats['hits'],
+        cache_stats['misses'],
+        cache_stats['revalidations'])
+
+  def __persist(self, data):
+    """Private method to save the ratings (and export them).
+
+    Args:
+      data (dict[str, Any]): Ratings data.
+    """
+    with self.__metrics.timer('phase_save_seconds'), \
+        self.__profiler.phase('persist'):
+      self.__data.save(data)
+    if self.__options.export_file:
+      self.__data.export_to(self.__options.export_file, data=data)
+
+  def close(self):
+    """Releases the resources kept between runs."""
+    if self.__cache:
+      self.__cache.close()
+      self.__cache = None
+    if self.__store:
+      self.__store.close()
+      self.__store = None
+    if self.__queue:
+      self.__queue.close()
+      self.__queue = None
+    if self.__journal:
+      self.__journal.close()
+
+  def __run(self, incremental):
+    """Private method to run a sync.
+
+    Args:
+      incremental (bool): Only fetch the newly added releases.
+    """
+    options = self.__options
+    metrics = self.__metrics
+    profiler = self.__profiler
+    with metrics.timer('run_seconds'):
+      if not self.__loaded:
+        with metrics.timer('phase_load_seconds'), profiler.phase('load'):
+          self.__ratings = self.__data.load()
+        self.__loaded = True
+      pipelined = not profiler.enabled
+      with ThreadPoolExecutor(max_workers=2) as executor:
+        if pipelined:
+          reading = executor.submit(self.__get_music)
+        new_ratings = self.__ratings
+        if not options.local:
+          with metrics.timer('phase_fetch_seconds'), profiler.phase('fetch'):
+            new_ratings = self.__fetch(incremental)
+        self.__ratings = new_ratings
+        details = None
+        if self.__store:
+          with metrics.timer('phase_enrich_seconds'), \
+              profiler.phase('enrich'):
+            details = self.__enrich(new_ratings['releases'])
+        persisting = None
+        if not options.push:
+          if pipelined:
+            persisting = executor.submit(self.__persist, new_ratings)
+          else:
+            self.__persist(new_ratings)
+        if pipelined:
+          with metrics.timer('phase_read_wait_seconds'):
+            music = reading.result()
+        else:
+          music = self.__get_music()
+        plan = None
+        if options.push:
+          with metrics.timer('phase_push_seconds'), profiler.phase('push'):
+            new_ratings = self.__push(music, new_ratings)
+          # Saved once pushed, with the pushed ratings.
+          self.__ratings = new_ratings
+          self.__persist(new_ratings)
+        else:
+          with metrics.timer('phase_music_seconds'):
+            plan = music.set_ratings_from_discogs(
+                ratings=new_ratings['ratings'],
+                songs=options.songs,
+                override=options.override,
+                fuzzy=options.fuzzy,
+                snapshot=(
+                    Snapshot(file=options.snapshot, logger=self.__logger)
+                    if options.snapshot else None),
+                dry_run=options.dry_run,
+                report=options.misses,
+                matcher=self.__get_matcher(new_ratings['ratings'], details),
+                journal=self.__journal)
+        if persisting:
+          persisting.result()
+      if options.plan and plan is not None:
+        self.__logger.info('Writing planned changes to "%s"', options.plan)
+        plan.write(options.plan)
+      if self.__cache:
+        self.__log_cache_stats()
+
+  def run(self, incremental=None):
+    """Runs a sync.
+
+    With a run journal, the progress of the run is checkpointed. The
+    journal is kept if the run is interrupted (to be resumed by the
+    next run, on resume mode) and removed once it finishes.
+
+    Args:
+      incremental (bool, optional): Only fetch the newly added releases.
+        Defaults to None (the incremental option).
+    """
+    options = self.__options
+    if incremental is None:
+      incremental = options.incremental
+    journal = self.__journal
+    if journal is None:
+      self.__run(incremental)
+      return
+    journal.begin(
+        {'folders': options.folders,
+         'push': bool(options.push),
+         'songs': options.songs},
+        resume=self.__resume)
+    # Only the first run resumes.
+    self.__resume = False
+    try:
+      self.__run(incremental)
+    except BaseException:
+      journal.close()
+      # On resume mode, the next run (on daemon mode) resumes this one.
+      self.__resume = options.resume
+      raise
+    journal.finish()
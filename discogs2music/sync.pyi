@@ -0,0 +1,12 @@
+from typing import Callable, Optional, Union
+from .backends import MusicBackend
+from .logger import Logger
+from .metrics import Metrics
+from .options import Options
+
+class Sync:
+    def __init__(self, options: Options, logger: Logger, metrics: Optional[Metrics] = ..., backend: Optional[Union[MusicBackend, Callable[[], MusicBackend]]] = ...) -> None: ...
+    @property
+    def metrics(self) -> Metrics: ...
+    def close(self) -> None: ...
+    def run(self, incremental: Optional[bool] = ...) -> None: ...
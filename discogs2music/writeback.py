@@ -0,0 +1,346 @@
+# -*- coding: UTF-8 -*-
+#
+# copyright: 2020-2022, Frederico Martins
+# author: Frederico Martins <http://github.com/fscm>
+# license: SPDX-License-Identifier: MIT
+
+"""Write back module.
+
+This module pushes the Music app ratings back to the Discogs collection.
+
+The following is a simple usage example::
+  from .writeback import Pusher, WriteQueue
+  queue = WriteQueue('my_writes.db')
+  queue.put(Pusher.diff(music.get_album_ratings(), data['releases']))
+  p = Pusher(client=Discogs('my_token'), queue=queue)
+  p.push()
+  queue.close()
+
+The module contains the following public classes:
+  - Pusher -- The main entry point. As the example above shows, the
+    Pusher() class can be used to push the rating changes to Discogs.
+  - Write -- Rating change, as kept by WriteQueue.
+  - WriteQueue -- Durable queue of rating changes.
+
+All other classes in this module are considered implementation details.
+"""
+
+import sqlite3
+from collections import namedtuple
+from threading import Lock
+from time import time
+from .matcher import Matcher
+from .model import Model
+
+
+Write = namedtuple(
+    'Write',
+    ['release_id', 'instance_id', 'rating', 'folder_id', 'attempts'])
+
+
+class WriteQueue:
+  """Durable rating changes queue.
+
+  This class keeps the rating changes on a SQLite database until they
+  are pushed, so that an interrupted push is resumed on the next run.
+  There is at most one change per release: a new change to a queued
+  release replaces it, only its last rating is pushed. Queueing the
+  same change again keeps its place on the queue and its failed
+  attempts.
+
+  Args:
+    file (str): Queue file.
+    logger (logger.Logger, optional): Logger to use. Defaults to None.
+  """
+
+  def __init__(self, file, logger=None):
+    self.__file = file
+    self.__lock = Lock()
+    self.__logger = logger
+    self.__connection = sqlite3.connect(file, check_same_thread=False)
+    self.__connection.execute(
+        'CREATE TABLE IF NOT EXISTS writes ('
+        'release_id INTEGER PRIMARY KEY, '
+        'instance_id INTEGER NOT NULL, '
+        'rating INTEGER NOT NULL, '
+        'folder_id INTEGER, '
+        'attempts INTEGER NOT NULL DEFAULT 0, '
+        'queued REAL NOT NULL)')
+    self.__connection.commit()
+
+  def __len__(self):
+    with self.__lock:
+      return self.__connection.execute(
+          'SELECT COUNT(*) FROM writes').fetchone()[0]
+
+  @property
+  def file(self):
+    """str: queue file."""
+    return self.__file
+
+  def close(self):
+    """Closes the queue."""
+    with self.__lock:
+      self.__connection.close()
+
+  def done(self, write):
+    """Removes a change from the queue.
+
+    The change is kept if its release was changed again since it was
+    read from the queue.
+
+    Args:
+      write (Write): Rating change.
+    """
+    with self.__lock, self.__connection:
+      self.__connection.execute(
+          'DELETE FROM writes WHERE release_id = ? AND rating = ?',
+          (write.release_id, write.rating))
+
+  def failed(self, write):
+    """Records a failed push of a change.
+
+    Args:
+      write (Write): Rating change.
+    """
+    with self.__lock, self.__connection:
+      self.__connection.execute(
+          'UPDATE writes SET attempts = attempts + 1 WHERE release_id = ?',
+          (write.release_id,))
+
+  def pending(self, max_attempts=None):
+    """Gets the queued changes, in the order they were queued.
+
+    Args:
+      max_attempts (int, optional): Leave out the changes that failed
+        this many times. Defaults to None (all).
+
+    Returns:
+      list[Write]: Rating changes.
+    """
+    query = (
+        'SELECT release_id, instance_id, rating, folder_id, attempts '
+        'FROM writes')
+    params = ()
+    if max_attempts is not None:
+      query += ' WHERE attempts < ?'
+      params = (max_attempts,)
+    with self.__lock:
+      return [
+          Write(*row) for row in self.__connection.execute(
+              f'{query} ORDER BY queued, release_id',
+              params)]
+
+  def put(self, writes):
+    """Queues some changes, replacing the queued changes of the same
+    releases.
+
+    Args:
+      writes (Iterable[Write]): Rating changes.
+    """
+    queued = time()
+    with self.__lock:
+      try:
+        with self.__connection:
+          # A change to the same instance keeps its (known) folder and,
+          # if the rating is the same, its attempts and its place.
+          self.__connection.executemany(
+              'INSERT INTO writes '
+              '(release_id, instance_id, rating, folder_id, attempts, queued) '
+              'VALUES (?, ?, ?, ?, 0, ?) '
+              'ON CONFLICT(release_id) DO UPDATE SET '
+              'folder_id = CASE WHEN instance_id = excluded.instance_id '
+              'THEN COALESCE(excluded.folder_id, folder_id) '
+              'ELSE excluded.folder_id END, '
+              'attempts = CASE WHEN instance_id = excluded.instance_id '
+              'AND rating = excluded.rating THEN attempts ELSE 0 END, '
+              'queued = CASE WHEN instance_id = excluded.instance_id '
+              'AND rating = excluded.rating THEN queued '
+              'ELSE excluded.queued END, '
+              'instance_id = excluded.instance_id, '
+              'rating = excluded.rating',
+              [(write.release_id, write.instance_id, write.rating,
+                write.folder_id, queued)
+               for write in writes])
+      except sqlite3.Error as err:
+        if self.__logger:
+          self.__logger.warning('Unable to queue the rating changes.')
+          self.__logger.debug(str(err))
+
+  def set_folder(self, write, folder_id):
+    """Records the folder of the instance of a change.
+
+    Args:
+      write (Write): Rating change.
+      folder_id (int): Folder ID.
+    """
+    with self.__lock, self.__connection:
+      self.__connection.execute(
+          'UPDATE writes SET folder_id = ? '
+          'WHERE release_id = ? AND instance_id = ?',
+          (folder_id, write.release_id, write.instance_id))
+
+
+class Pusher:
+  """Rating changes pusher.
+
+  The queued changes are pushed one at a time, in the order they were
+  queued, through the request scheduler of the client (they share the
+  rate limit of the reads). Each change is removed from the queue as
+  soon as it is pushed. Pushing a change twice is harmless, so a push
+  interrupted between the request and the removal is safe to resume.
+
+  Changes rejected by Discogs (e.g.: for a release removed from the
+  collection) are dropped. A change that fails is kept for the next
+  push and skipped, so that it does not hold back the others, and is
+  no longer pushed after MAX_ATTEMPTS failures (until its rating
+  changes). Errors that would fail every change (no connection,
+  invalid credentials or rate limited, see BLOCKING_STATUS) stop the
+  push, without counting as an attempt.
+
+  Args:
+    queue (WriteQueue): Rating changes queue.
+    client (discogs.Discogs, optional): Discogs client. Defaults to None
+      (the changes are only queued).
+    logger (logger.Logger, optional): Logger to use. Defaults to None.
+    metrics (metrics.Metrics, optional): Metrics to record the pushes
+      to. Defaults to None.
+  """
+
+  BLOCKING_STATUS = frozenset((401, 403, 429))
+  MAX_ATTEMPTS = 5
+
+  def __init__(self, queue, client=None, logger=None, metrics=None):
+    self.__client = client
+    self.__logger = logger
+    self.__metrics = metrics
+    self.__queue = queue
+
+  @staticmethod
+  def diff(ratings, releases, override=False, fuzzy=False):
+    """Computes the rating changes to push.
+
+    Only the releases with a collection instance on the first account
+    (the one the changes are pushed to) are changed and, unless
+    overriding, only the ones without a Discogs rating.
+
+    Args:
+      ratings (dict[tuple[str, str], int]): Music app ratings, by artist
+        and album (see music.Music.get_album_ratings()).
+      releases (dict[str, dict[str, Any]]): Records (see model.Model).
+      override (bool, optional): Override the Discogs ratings. Defaults
+        to False.
+      fuzzy (bool, optional): Enable fuzzy matching. Defaults to False.
+
+    Returns:
+      list[Write]: Rating changes.
+    """
+    index = {}
+    for record in releases.values():
+      if record.get('id') is not None and (
+          record.get('instance_id') is not None) and (
+          record.get('priority') in (None, 0)):
+        index.setdefault(record['artist'], {}).setdefault(
+            record['title'],
+            record)
+    matcher = Matcher(index, fuzzy=fuzzy)
+    writes = {}
+    for (artist, album), rating in ratings.items():
+      artist_key = matcher.find_artist(artist)
+      if artist_key is None:
+        continue
+      record = matcher.find_album(artist_key, album)
+      if record is None or record['rating'] == rating or (
+          record['rating'] and not override):
+        continue
+      writes.setdefault(Model.record_key(record), Write(
+          release_id=record['id'],
+          instance_id=record['instance_id'],
+          rating=rating,
+          folder_id=None,
+          attempts=0))
+    return list(writes.values())
+
+  def __push(self, write):
+    """Private method to push a change.
+
+    Args:
+      write (Write): Rating change.
+
+    Returns:
+      bool: True if pushed or False if rejected.
+    """
+    folder_id = write.folder_id
+    if folder_id is None:
+      folder_id = self.__client.get_instance_folder(
+          write.release_id,
+          write.instance_id)
+      if folder_id is None:
+        return False
+      self.__queue.set_folder(write, folder_id)
+    return self.__client.set_rating(
+        write.release_id,
+        write.instance_id,
+        write.rating,
+        folder_id)
+
+  def push(self):
+    """Pushes the queued rating changes.
+
+    Returns:
+      list[Write]: Rating changes pushed.
+    """
+    pending = self.__queue.pending(self.MAX_ATTEMPTS)
+    if not pending:
+      return []
+    if self.__client is None:
+      if self.__logger:
+        self.__logger.info(
+            '%d rating changes queued for the next push.', len(pending))
+      return []
+    if self.__logger:
+      self.__logger.info('Pushing %d rating changes to Discogs.', len(pending))
+    pushed = []
+    rejected = 0
+    failed = 0
+    for write in pending:
+      try:
+        if self.__push(write):
+          pushed.append(write)
+        else:
+          rejected += 1
+          if self.__logger:
+            self.__logger.warning(
+                'Rating change of release %d rejected.', write.release_id)
+        self.__queue.done(write)
+      except Exception as err:  # pylint: disable=broad-except
+        failed += 1
+        response = getattr(err, 'response', None)
+        status = getattr(response, 'status_code', None)
+        if status is None or status in self.BLOCKING_STATUS:
+          if self.__logger:
+            self.__logger.warning(
+                'Unable to push the rating changes, the remaining ones '
+                'are kept for the next push.')
+            self.__logger.debug(str(err))
+          break
+        self.__queue.failed(write)
+        if self.__logger:
+          self.__logger.warning(
+              'Unable to push the rating change of release %d, it is kept '
+              'for the next push.', write.release_id)
+          self.__logger.debug(str(err))
+    if self.__metrics:
+      self.__metrics.increment('discogs_writes_total', len(pushed))
+      self.__metrics.increment('discogs_writes_rejected_total', rejected)
+      self.__metrics.increment('discogs_writes_failed_total', failed)
+    if self.__logger:
+      self.__logger.info(
+          'Rating changes:\n'
+          '  %d pushed\n'
+          '  %d rejected\n'
+          '  %d pending\n',
+          len(pushed),
+          rejected,
+          len(self.__queue.pending(self.MAX_ATTEMPTS)))
+    return pushed
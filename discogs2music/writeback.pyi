@@ -0,0 +1,31 @@
+from typing import Any, Final, Iterable, NamedTuple, Optional
+from .discogs import Discogs
+from .logger import Logger
+from .metrics import Metrics
+
+class Write(NamedTuple):
+    release_id: int
+    instance_id: int
+    rating: int
+    folder_id: Optional[int]
+    attempts: int
+
+class WriteQueue:
+    def __init__(self, file: str, logger: Optional[Logger] = ...) -> None: ...
+    def __len__(self) -> int: ...
+    @property
+    def file(self) -> str: ...
+    def close(self) -> None: ...
+    def done(self, write: Write) -> None: ...
+    def failed(self, write: Write) -> None: ...
+    def pending(self, max_attempts: Optional[int] = ...) -> list[Write]: ...
+    def put(self, writes: Iterable[Write]) -> None: ...
+    def set_folder(self, write: Write, folder_id: int) -> None: ...
+
+class Pusher:
+    BLOCKING_STATUS: Final[frozenset[int]] = ...
+    MAX_ATTEMPTS: Final[int] = ...
+    def __init__(self, queue: WriteQueue, client: Optional[Discogs] = ..., logger: Optional[Logger] = ..., metrics: Optional[Metrics] = ...) -> None: ...
+    @staticmethod
+    def diff(ratings: dict[tuple[str, str], int], releases: dict[str, dict[str, Any]], override: bool = ..., fuzzy: bool = ...) -> list[Write]: ...
+    def push(self) -> list[Write]: ...
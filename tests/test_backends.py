@@ -0,0 +1,91 @@
+# -*- coding: UTF-8 -*-
+#
+# copyright: 2020-2022, Frederico Martins
+# author: Frederico Martins <http://github.com/fscm>
+# license: SPDX-License-Identifier: MIT
+
+"""Music library backends tests."""
+
+import unittest
+from discogs2music.backends import MemoryBackend, MusicBackend
+from discogs2music.music import Music
+
+
+def library(albums, tracks_per_album=10):
+  """Builds a library of unrated albums, one per artist.
+
+  Args:
+    albums (int): Number of albums.
+    tracks_per_album (int, optional): Tracks per album. Defaults to 10.
+
+  Returns:
+    list[dict[str, Any]]: Library tracks.
+  """
+  return [
+      {
+          'artist': f'Artist {album}',
+          'album': f'Album {album}',
+          'name': f'Song {number}',
+          'track_number': number}
+      for album in range(albums)
+      for number in range(1, tracks_per_album + 1)]
+
+
+class MusicBackendTest(unittest.TestCase):
+  """MusicBackend interface tests."""
+
+  def test_abstract(self):
+    """Backends must implement every method of the interface."""
+
+    # pylint: disable-next=abstract-method
+    class Partial(MusicBackend):
+      """Backend that can only be read."""
+
+      @property
+      def calls(self):
+        """int: calls made to the library."""
+        return 0
+
+      def get_tracks(self):
+        """Reads the library tracks.
+
+        Returns:
+          list[Track]: Library tracks.
+        """
+        return []
+
+    with self.assertRaises(TypeError):
+      MusicBackend()  # pylint: disable=abstract-class-instantiated
+    with self.assertRaises(TypeError):
+      Partial()  # pylint: disable=abstract-class-instantiated
+
+
+class RoundTripsTest(unittest.TestCase):
+  """Music library round trips, on the memory backend."""
+
+  def test_read(self):
+    """The library is read once, with one call per track property, and
+    then processed locally."""
+    for albums in (1, 100):
+      backend = MemoryBackend(library(albums))
+      music = Music(backend=backend)
+      music.get_album_ratings()
+      self.assertEqual(backend.calls, 1 + len(MusicBackend.PROPERTIES))
+
+  def test_update(self):
+    """Albums are updated with one call each, whatever their size."""
+    for tracks_per_album in (1, 20):
+      backend = MemoryBackend(library(50, tracks_per_album))
+      music = Music(backend=backend)
+      reads = backend.calls
+      music.set_ratings_from_discogs({
+          f'Artist {album}': {f'Album {album}': {'rating': 3}}
+          for album in range(50)})
+      self.assertEqual(backend.calls - reads, 50)
+      self.assertEqual(
+          {track['album_rating'] for track in backend.tracks},
+          {60})
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,34 @@
+# -*- coding: UTF-8 -*-
+#
+# copyright: 2020-2022, Frederico Martins
+# author: Frederico Martins <http://github.com/fscm>
+# license: SPDX-License-Identifier: MIT
+
+"""Import time budget tests."""
+
+import unittest
+from discogs2music.benchmark import ImportBenchmark
+
+
+class ImportBenchmarkTest(unittest.TestCase):
+  """Command-line entry point import time tests."""
+
+  BUDGET = 50
+
+  @classmethod
+  def setUpClass(cls):
+    """Measures the import time of the command-line entry point."""
+    cls.results = ImportBenchmark(runs=3).run()
+
+  def test_budget(self):
+    """The entry point is imported within the budget (milliseconds)."""
+    self.assertGreater(self.results['milliseconds'], 0)
+    self.assertLessEqual(self.results['milliseconds'], self.BUDGET)
+
+  def test_heavy_modules(self):
+    """No heavy dependency is imported by the entry point."""
+    self.assertEqual(self.results['heavy_modules'], [])
+
+
+if __name__ == '__main__':
+  unittest.main()
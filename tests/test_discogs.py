@@ -0,0 +1,214 @@
+# -*- coding: UTF-8 -*-
+#
+# copyright: 2020-2022, Frederico Martins
+# author: Frederico Martins <http://github.com/fscm>
+# license: SPDX-License-Identifier: MIT
+
+"""Discogs client tests."""
+
+import json
+import unittest
+import requests
+from discogs2music.discogs import Discogs
+from discogs2music.mockserver import MockDiscogs
+from discogs2music.ratelimit import RateLimiter
+from test_ratelimit import FakeClock, UpperBound
+
+
+def release(index, rating):
+  """Builds a mock server release.
+
+  Args:
+    index (int): Release index, also sets the date it was added.
+    rating (int): Rating.
+
+  Returns:
+    dict[str, Any]: Release.
+  """
+  return {
+      'id': index,
+      'instance_id': 1000 + index,
+      'folder_id': 1,
+      'artist': f'Artist {index}',
+      'title': f'Album {index}',
+      'rating': rating,
+      'added': 1500000000 + index * 86400}
+
+
+class StubSession:
+  """Stubbed transport, answering with queued responses.
+
+  The identity request is always answered.
+
+  Args:
+    responses (list[tuple[int, dict[str, str], Any]]): Status, headers
+      and content of the responses, in order.
+  """
+
+  def __init__(self, responses):
+    self.requests = 0
+    self.__responses = list(responses)
+
+  def request(self, method, url, params=None, headers=None, json=None):
+    """Answers a request.
+
+    Args:
+      method (str): HTTP method.
+      url (str): Request URL.
+      params (dict[str, Any], optional): Request params. Defaults to
+        None.
+      headers (dict[str, str], optional): Request headers. Defaults to
+        None.
+      json (dict[str, Any], optional): JSON body. Defaults to None.
+
+    Returns:
+      requests.Response: Response.
+    """
+    # pylint: disable=redefined-outer-name,unused-argument
+    if url.endswith('/oauth/identity'):
+      status, headers, content = 200, {}, {
+          'username': 'stub',
+          'resource_url': 'https://stub/users/stub'}
+    else:
+      self.requests += 1
+      status, headers, content = self.__responses.pop(0)
+    return response(status, headers, content)
+
+
+def response(status, headers, content):
+  """Builds a response.
+
+  Args:
+    status (int): Status.
+    headers (dict[str, str]): Headers.
+    content (Any): JSON content.
+
+  Returns:
+    requests.Response: Response.
+  """
+  result = requests.Response()
+  result.status_code = status
+  result.headers.update(headers)
+  # pylint: disable-next=protected-access
+  result._content = json.dumps(content).encode('utf-8')
+  result.url = 'https://stub/'
+  return result
+
+
+class TransportTest(unittest.TestCase):
+  """Discogs client tests, on a stubbed transport and a fake clock."""
+
+  def client(self, responses):
+    """Builds a client on a stubbed transport.
+
+    Args:
+      responses (list[tuple[int, dict[str, str], Any]]): Responses (see
+        StubSession).
+
+    Returns:
+      tuple[Discogs, StubSession, FakeClock]: Client, transport and
+        clock.
+    """
+    clock = FakeClock()
+    session = StubSession(responses)
+    client = Discogs(
+        'token',
+        session=session,
+        limiter=RateLimiter(
+            limit=60,
+            window=60,
+            backoff_base=1,
+            backoff_cap=60,
+            clock=clock,
+            sleep=clock.sleep,
+            rng=UpperBound()),
+        progress=False)
+    return client, session, clock
+
+  def test_retry_after(self):
+    """Rate limited requests wait for the Retry-After time."""
+    client, session, clock = self.client([
+        (429, {'Retry-After': '7'}, {'message': 'Slow down.'}),
+        (200, {}, {'id': 1, 'title': 'Album', 'tracklist': []})])
+    self.assertEqual(client.get_release_details(1)['title'], 'Album')
+    self.assertEqual(session.requests, 2)
+    self.assertEqual(clock.sleeps, [1.0, 7.0])
+
+  def test_rate_limited(self):
+    """Rate limited requests back off and give up after the retries."""
+    client, session, clock = self.client(
+        [(429, {}, {'message': 'Slow down.'})] * (Discogs.API_RETRIES + 1))
+    with self.assertRaises(requests.HTTPError):
+      client.get_release_details(1)
+    self.assertEqual(session.requests, Discogs.API_RETRIES + 1)
+    self.assertEqual(clock.sleeps, [1.0, 1.0, 2.0, 4.0, 8.0, 16.0])
+
+  def test_server_error(self):
+    """Server errors are retried and then raised, not decoded."""
+    client, session, _ = self.client(
+        [(500, {}, 'Internal error')] * (Discogs.API_RETRIES + 1))
+    with self.assertRaises(requests.HTTPError):
+      client.get_release_details(1)
+    self.assertEqual(session.requests, Discogs.API_RETRIES + 1)
+
+  def test_not_found(self):
+    """Missing releases have no details."""
+    client, _, _ = self.client([(404, {}, {'message': 'Not found.'})])
+    self.assertIsNone(client.get_release_details(1))
+
+  def test_client_error(self):
+    """Client errors are raised."""
+    client, session, _ = self.client([(401, {}, {'message': 'No.'})])
+    with self.assertRaises(requests.HTTPError):
+      client.get_release_details(1)
+    self.assertEqual(session.requests, 1)
+
+
+class DiscogsTest(unittest.TestCase):
+  """Discogs client tests, against the mock Discogs server."""
+
+  def setUp(self):
+    """Starts the mock server with 250 releases (three pages)."""
+    self.mock = MockDiscogs(
+        [release(index, index % 6) for index in range(1, 251)],
+        limit=1000,
+        window=1)
+    self.mock.start()
+    self.addCleanup(self.mock.stop)
+    self.client = Discogs(
+        'token',
+        base_url=self.mock.url,
+        limiter=RateLimiter(limit=1000, window=1),
+        progress=False)
+
+  def test_full(self):
+    """A full fetch reads every release."""
+    data = self.client.get_ratings()
+    self.assertEqual(len(data['releases']), 250)
+    self.assertEqual(data['ratings']['Artist 7']['Album 7'], {'rating': 1})
+
+  def test_incremental(self):
+    """An incremental fetch only reads the recently added releases."""
+    data = self.client.get_ratings(incremental=True)
+    self.mock.add(release(251, 5))
+    self.mock.add(release(1, 4))
+    before = self.mock.requests
+    data = self.client.get_ratings(ratings=data, incremental=True)
+    self.assertEqual(self.mock.requests - before, 1)
+    self.assertEqual(len(data['releases']), 251)
+    self.assertEqual(data['releases']['251']['rating'], 5)
+    self.assertEqual(data['releases']['1']['rating'], 1)
+
+  def test_full_interval(self):
+    """An incremental fetch is a full one once the interval expires."""
+    data = self.client.get_ratings(incremental=True)
+    self.mock.add(release(1, 4))
+    data = self.client.get_ratings(
+        ratings=data,
+        incremental=True,
+        full_interval=0)
+    self.assertEqual(data['releases']['1']['rating'], 4)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,183 @@
+# -*- coding: UTF-8 -*-
+#
+# copyright: 2020-2022, Frederico Martins
+# author: Frederico Martins <http://github.com/fscm>
+# license: SPDX-License-Identifier: MIT
+
+"""Music ratings update tests."""
+
+import unittest
+from discogs2music.backends import MemoryBackend
+from discogs2music.metrics import Metrics
+from discogs2music.music import Music
+
+
+RATINGS = {
+    'Artist One': {
+        'First Album': {'rating': 4},
+        'Second Album': {'rating': 2}},
+    'Artist Two': {
+        'Third Album': {'rating': 5}}}
+
+
+def library():
+  """Builds a library with:
+    - 'First Album', three unrated tracks (one album write);
+    - 'Second Album', two unrated tracks and a rated one (two track
+      writes);
+    - 'Third Album', one track already with the Discogs rating;
+    - 'Fourth Album', by an artist not on Discogs.
+
+  Returns:
+    list[dict[str, Any]]: Library tracks.
+  """
+  tracks = []
+  for number in range(1, 4):
+    tracks.append({
+        'artist': 'artist one',
+        'album': 'First Album',
+        'name': f'Song {number}',
+        'track_number': number})
+  for number in range(1, 4):
+    rating = 60 if number == 1 else 0
+    tracks.append({
+        'artist': 'artist one',
+        'album': 'Second Album',
+        'name': f'Song {number}',
+        'track_number': number,
+        'album_rating': rating,
+        'rating': rating})
+  tracks.append({
+      'artist': 'Artist Two',
+      'album': 'Third Album',
+      'name': 'Song 1',
+      'album_rating': 100,
+      'rating': 100})
+  tracks.append({
+      'artist': 'Artist Three',
+      'album': 'Fourth Album',
+      'name': 'Song 1'})
+  return tracks
+
+
+class MusicTest(unittest.TestCase):
+  """Music.set_ratings_from_discogs() tests, on the memory backend."""
+
+  def update(self, songs, dry_run=False):
+    """Updates the ratings of a new library.
+
+    Args:
+      songs (bool): Update songs rating instead of album rating.
+      dry_run (bool, optional): Only plan the changes. Defaults to
+        False.
+
+    Returns:
+      tuple[MemoryBackend, planner.Plan, int, int]: Backend, planned
+        changes, calls made by the update and writes recorded.
+    """
+    backend = MemoryBackend(library())
+    metrics = Metrics()
+    music = Music(backend=backend, metrics=metrics)
+    reads = backend.calls
+    plan = music.set_ratings_from_discogs(
+        RATINGS,
+        songs=songs,
+        dry_run=dry_run)
+    return (
+        backend,
+        plan,
+        backend.calls - reads,
+        metrics.counters.get('music_writes_total', 0))
+
+  def ratings(self, backend, field):
+    """Gets a rating of every track.
+
+    Args:
+      backend (MemoryBackend): Backend.
+      field (str): Rating field.
+
+    Returns:
+      dict[tuple[str, str], int]: Rating, by album and song name.
+    """
+    return {
+        (track['album'], track['name']): track[field]
+        for track in backend.tracks}
+
+  def test_albums(self):
+    """Unrated albums are written once per album, partly rated ones
+    once per track, and the song ratings are left as they are."""
+    backend, plan, calls, writes = self.update(songs=False)
+    self.assertEqual(len(plan), 5)
+    self.assertEqual(calls, 3)
+    self.assertEqual(writes, 3)
+    self.assertEqual(self.ratings(backend, 'album_rating'), {
+        ('First Album', 'Song 1'): 80,
+        ('First Album', 'Song 2'): 80,
+        ('First Album', 'Song 3'): 80,
+        ('Second Album', 'Song 1'): 60,
+        ('Second Album', 'Song 2'): 40,
+        ('Second Album', 'Song 3'): 40,
+        ('Third Album', 'Song 1'): 100,
+        ('Fourth Album', 'Song 1'): 0})
+    self.assertEqual(
+        set(self.ratings(backend, 'rating').values()),
+        {0, 60, 100})
+
+  def test_songs(self):
+    """Unrated songs are written once per album, or once per track,
+    and the album ratings are left as they are."""
+    backend, plan, calls, writes = self.update(songs=True)
+    self.assertEqual(len(plan), 5)
+    self.assertEqual(calls, 3)
+    self.assertEqual(writes, 3)
+    self.assertEqual(self.ratings(backend, 'rating'), {
+        ('First Album', 'Song 1'): 80,
+        ('First Album', 'Song 2'): 80,
+        ('First Album', 'Song 3'): 80,
+        ('Second Album', 'Song 1'): 60,
+        ('Second Album', 'Song 2'): 40,
+        ('Second Album', 'Song 3'): 40,
+        ('Third Album', 'Song 1'): 100,
+        ('Fourth Album', 'Song 1'): 0})
+    self.assertEqual(
+        set(self.ratings(backend, 'album_rating').values()),
+        {0, 60, 100})
+
+  def test_album_case(self):
+    """Albums that differ only in case are updated one track at a time,
+    as album writes ignore the case."""
+    tracks = library()
+    tracks.append({
+        'artist': 'artist one',
+        'album': 'FIRST ALBUM',
+        'name': 'Song 4',
+        'album_rating': 40,
+        'rating': 40})
+    backend = MemoryBackend(tracks)
+    metrics = Metrics()
+    Music(backend=backend, metrics=metrics).set_ratings_from_discogs(
+        RATINGS)
+    self.assertEqual(metrics.counters['music_writes_total'], 5)
+    self.assertEqual(
+        {(track['album'], track['name']): track['album_rating']
+         for track in backend.tracks
+         if track['album'].casefold() == 'first album'},
+        {
+            ('First Album', 'Song 1'): 80,
+            ('First Album', 'Song 2'): 80,
+            ('First Album', 'Song 3'): 80,
+            ('FIRST ALBUM', 'Song 4'): 40})
+
+  def test_dry_run(self):
+    """Changes are planned but nothing is written to the library."""
+    backend, plan, calls, writes = self.update(songs=False, dry_run=True)
+    self.assertEqual(len(plan), 5)
+    self.assertEqual(calls, 0)
+    self.assertEqual(writes, 0)
+    self.assertEqual(
+        self.ratings(backend, 'album_rating'),
+        self.ratings(MemoryBackend(library()), 'album_rating'))
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,132 @@
+# -*- coding: UTF-8 -*-
+#
+# copyright: 2020-2022, Frederico Martins
+# author: Frederico Martins <http://github.com/fscm>
+# license: SPDX-License-Identifier: MIT
+
+"""Request scheduler tests, on a fake clock."""
+
+import unittest
+from discogs2music.ratelimit import RateLimiter
+
+
+class FakeClock:
+  """Fake clock, only moved by the sleeps.
+
+  Args:
+    now (float, optional): Starting time. Defaults to 0.
+  """
+
+  def __init__(self, now=0.0):
+    self.now = now
+    self.sleeps = []
+
+  def __call__(self):
+    return self.now
+
+  def sleep(self, delay):
+    """Moves the clock forward.
+
+    Args:
+      delay (float): Time, in seconds.
+    """
+    self.sleeps.append(delay)
+    self.now += delay
+
+
+class UpperBound:
+  """Random generator stub that always returns the upper bound."""
+
+  @staticmethod
+  def uniform(_, upper):
+    """Returns the upper bound.
+
+    Args:
+      upper (float): Upper bound.
+
+    Returns:
+      float: The upper bound.
+    """
+    return upper
+
+
+class RateLimiterTest(unittest.TestCase):
+  """RateLimiter tests."""
+
+  def limiter(self, **kwargs):
+    """Builds a scheduler on a new fake clock.
+
+    Args:
+      **kwargs (Any): RateLimiter() arguments.
+
+    Returns:
+      tuple[RateLimiter, FakeClock]: Scheduler and its clock.
+    """
+    clock = FakeClock()
+    limiter = RateLimiter(
+        clock=clock,
+        sleep=clock.sleep,
+        rng=UpperBound(),
+        **kwargs)
+    return limiter, clock
+
+  def test_spacing(self):
+    """Requests are spread evenly across the window."""
+    limiter, clock = self.limiter(limit=60, window=60)
+    waits = [limiter.acquire() for _ in range(4)]
+    self.assertEqual(waits, [0, 1.0, 1.0, 1.0])
+    self.assertEqual(clock.sleeps, [1.0, 1.0, 1.0])
+    self.assertEqual(clock.now, 3.0)
+
+  def test_idle(self):
+    """Requests after an idle time are not delayed."""
+    limiter, clock = self.limiter(limit=60, window=60)
+    limiter.acquire()
+    clock.now = 10.0
+    self.assertEqual(limiter.acquire(), 0)
+    self.assertEqual(clock.sleeps, [])
+
+  def test_shared_quota(self):
+    """The pace slows down with the requests of other clients."""
+    limiter, _ = self.limiter(limit=60, window=60)
+    limiter.acquire()
+    limiter.update(limit=60, used=31, remaining=29)
+    self.assertEqual(limiter.external, 30)
+    self.assertEqual(limiter.interval, 2.0)
+    self.assertEqual(limiter.acquire(), 1.0)
+    self.assertEqual(limiter.acquire(), 2.0)
+
+  def test_update_remaining(self):
+    """The used requests are derived from the remaining ones."""
+    limiter, _ = self.limiter(limit=60, window=60)
+    limiter.update(limit=30, remaining=20)
+    self.assertEqual(limiter.limit, 30)
+    self.assertEqual(limiter.used, 10)
+    self.assertEqual(limiter.remaining, 20)
+    self.assertEqual(limiter.external, 10)
+    self.assertEqual(limiter.interval, 3.0)
+
+  def test_pause(self):
+    """A pause holds back the next request."""
+    limiter, clock = self.limiter(limit=60, window=60)
+    limiter.acquire()
+    limiter.pause(7.5)
+    self.assertEqual(limiter.acquire(), 7.5)
+    self.assertEqual(clock.now, 7.5)
+
+  def test_backoff(self):
+    """The backoff delay doubles up to the cap."""
+    limiter, _ = self.limiter(backoff_base=1, backoff_cap=10)
+    self.assertEqual(
+        [limiter.backoff(attempt) for attempt in range(6)],
+        [1, 2, 4, 8, 10, 10])
+
+  def test_wait(self):
+    """Waits use the injected sleep."""
+    limiter, clock = self.limiter()
+    limiter.wait(2.5)
+    self.assertEqual(clock.sleeps, [2.5])
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,108 @@
+# -*- coding: UTF-8 -*-
+#
+# copyright: 2020-2022, Frederico Martins
+# author: Frederico Martins <http://github.com/fscm>
+# license: SPDX-License-Identifier: MIT
+
+"""Sync tests, against the mock Discogs server."""
+
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from discogs2music.backends import MemoryBackend
+from discogs2music.metrics import Metrics
+from discogs2music.mockserver import MockDiscogs
+from discogs2music.options import Options
+from discogs2music.sync import Sync
+
+
+RATINGS = {
+    'Artist One': {
+        'First Album': {'rating': 4},
+        'Second Album': {'rating': 0}},
+    'Artist Two': {
+        'Third Album': {'rating': 5}}}
+
+
+def library():
+  """Builds a library with two unrated tracks of every album.
+
+  Returns:
+    list[dict[str, Any]]: Library tracks.
+  """
+  return [
+      {
+          'artist': artist,
+          'album': album,
+          'name': f'Song {number}',
+          'track_number': number}
+      for artist, albums in RATINGS.items()
+      for album in albums
+      for number in (1, 2)]
+
+
+class SyncTest(unittest.TestCase):
+  """Sync tests, against the mock Discogs server."""
+
+  def setUp(self):
+    """Starts the mock server and parses the options of a sync."""
+    self.mock = MockDiscogs.from_ratings(RATINGS, limit=1000, window=1)
+    self.mock.start()
+    self.addCleanup(self.mock.stop)
+    directory = tempfile.TemporaryDirectory()
+    self.addCleanup(directory.cleanup)
+    self.datafile = os.path.join(directory.name, 'data.json')
+    argv = [
+        'discogs2music',
+        '--apikey', 'token',
+        '--api-url', self.mock.url,
+        '--datafile', self.datafile]
+    with mock.patch('sys.argv', argv):
+      self.options = Options()
+
+  def test_pipelined(self):
+    """The library is read while the ratings are fetched."""
+    backends = []
+    threads = []
+
+    def backend():
+      threads.append(threading.current_thread())
+      backends.append(MemoryBackend(library()))
+      return backends[-1]
+
+    metrics = Metrics()
+    sync = Sync(self.options, None, metrics=metrics, backend=backend)
+    self.addCleanup(sync.close)
+    sync.run()
+    self.assertEqual(len(backends), 1)
+    self.assertIsNot(threads[0], threading.main_thread())
+    self.assertEqual(
+        {(track['album'], track['album_rating'])
+         for track in backends[0].tracks},
+        {('First Album', 80), ('Second Album', 0), ('Third Album', 100)})
+    self.assertEqual(metrics.counters['music_writes_total'], 2)
+    with open(self.datafile, 'r', encoding='utf-8') as file:
+      self.assertEqual(len(json.load(file)['releases']), 3)
+    sync.run()
+    self.assertEqual(len(backends), 2)
+    self.assertEqual(metrics.counters['music_writes_total'], 4)
+
+  def test_backend(self):
+    """A backend is read again on every run, with the new ratings."""
+    backend = MemoryBackend(library())
+    metrics = Metrics()
+    sync = Sync(self.options, None, metrics=metrics, backend=backend)
+    self.addCleanup(sync.close)
+    sync.run()
+    self.assertEqual(metrics.counters['music_writes_total'], 2)
+    calls = backend.calls
+    sync.run()
+    self.assertGreater(backend.calls, calls)
+    self.assertEqual(metrics.counters['music_writes_total'], 2)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,82 @@
+# -*- coding: UTF-8 -*-
+#
+# copyright: 2020-2022, Frederico Martins
+# author: Frederico Martins <http://github.com/fscm>
+# license: SPDX-License-Identifier: MIT
+
+"""Rating changes push tests, against the mock Discogs server."""
+
+import os
+import tempfile
+import unittest
+from discogs2music.discogs import Discogs
+from discogs2music.mockserver import MockDiscogs
+from discogs2music.ratelimit import RateLimiter
+from discogs2music.writeback import Pusher, Write, WriteQueue
+
+
+RATINGS = {
+    'Artist One': {
+        'First Album': {'rating': 0},
+        'Second Album': {'rating': 3}},
+    'Artist Two': {
+        'Third Album': {'rating': 0}}}
+
+
+class PusherTest(unittest.TestCase):
+  """Pusher tests, against the mock Discogs server."""
+
+  def setUp(self):
+    """Starts the mock server and opens a new queue."""
+    self.mock = MockDiscogs.from_ratings(RATINGS, limit=1000, window=1)
+    self.mock.start()
+    self.addCleanup(self.mock.stop)
+    self.client = Discogs(
+        'token',
+        base_url=self.mock.url,
+        limiter=RateLimiter(limit=1000, window=1),
+        progress=False)
+    directory = tempfile.TemporaryDirectory()
+    self.addCleanup(directory.cleanup)
+    self.queue = WriteQueue(os.path.join(directory.name, 'queue.db'))
+    self.addCleanup(self.queue.close)
+
+  def test_push(self):
+    """Only the unrated releases are changed, and the queue emptied."""
+    releases = self.client.get_ratings()['releases']
+    writes = Pusher.diff(
+        {
+            ('Artist One', 'First Album'): 4,
+            ('Artist One', 'Second Album'): 5,
+            ('Artist Two', 'Third Album'): 2},
+        releases)
+    self.queue.put(writes)
+    pushed = Pusher(self.queue, client=self.client).push()
+    self.assertEqual(len(pushed), 2)
+    self.assertEqual(sorted(self.mock.writes), [(1, 4), (3, 2)])
+    self.assertEqual(self.mock.ratings, {1: 4, 2: 3, 3: 2})
+    self.assertEqual(self.queue.pending(), [])
+
+  def test_rejected(self):
+    """Changes of releases no longer on the collection are dropped."""
+    self.queue.put([Write(
+        release_id=99,
+        instance_id=99,
+        rating=5,
+        folder_id=1,
+        attempts=0)])
+    self.assertEqual(Pusher(self.queue, client=self.client).push(), [])
+    self.assertEqual(self.mock.writes, [])
+    self.assertEqual(self.queue.pending(), [])
+
+  def test_secondary_accounts(self):
+    """Releases of the other accounts are not changed."""
+    releases = self.client.get_ratings()['releases']
+    for record in releases.values():
+      record['priority'] = 1
+    writes = Pusher.diff({('Artist One', 'First Album'): 4}, releases)
+    self.assertEqual(writes, [])
+
+
+if __name__ == '__main__':
+  unittest.main()